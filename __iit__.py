@@ -1,4 +0,0 @@
-# Import celery app when Django starts
-from .celery import app as celery_app
-
-__all__ = ['celery_app']
\ No newline at end of file
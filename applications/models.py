@@ -1,5 +1,6 @@
 # applications/models.py
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
@@ -134,14 +135,33 @@ class BusinessApplication(models.Model):
     def __str__(self):
         return f"{self.business_name} - {self.application_number}"
 
+    @staticmethod
+    def _number_sequence(year):
+        prefix = f"BP-{year}-"
+
+        def seed():
+            # Continue after the numbers given out before the sequence existed
+            numbers = BusinessApplication.objects.filter(
+                application_number__startswith=prefix
+            ).values_list('application_number', flat=True)
+            return max((int(number[len(prefix):]) for number in numbers if number[len(prefix):].isdigit()), default=0)
+
+        return f'application:{year}', prefix, seed
+
+    @classmethod
+    def allocate_application_numbers(cls, applications):
+        """Give unnumbered applications, e.g. before bulk_create, numbers from one reserved block"""
+        unnumbered = [application for application in applications if not application.application_number]
+        if not unnumbered:
+            return
+        key, prefix, seed = cls._number_sequence(timezone.now().year)
+        for application, number in zip(unnumbered, NumberSequence.reserve(key, len(unnumbered), seed)):
+            application.application_number = f"{prefix}{number:05d}"
+
     def save(self, *args, **kwargs):
         # Generate application number if not exists
         if not self.application_number:
-            year = timezone.now().year
-            count = BusinessApplication.objects.filter(
-                created_at__year=year
-            ).count() + 1
-            self.application_number = f"BP-{year}-{count:05d}"
+            BusinessApplication.allocate_application_numbers([self])
 
         # Generate tracking number if not exists
         if not self.tracking_number:
@@ -253,4 +273,37 @@ class ApplicationActivity(models.Model):
         verbose_name_plural = 'Application activities'
 
     def __str__(self):
-        return f"{self.get_activity_type_display()} - {self.application.application_number}"
\ No newline at end of file
+        return f"{self.get_activity_type_display()} - {self.application.application_number}"
+
+class NumberSequence(models.Model):
+    """
+    Last number handed out under each key, e.g. 'application:2025' or
+    'queue:payment:2025-04-01'. Numbers come from an F() increment of
+    one row, so they are O(1) to allocate and unique under concurrent
+    inserts, unlike counting the existing rows.
+    """
+
+    key = models.CharField(max_length=100, primary_key=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.last_value}"
+
+    @classmethod
+    def reserve(cls, key, count=1, seed=None):
+        """
+        Reserve the next count numbers under key and return them as a
+        range. seed() gives the last number already in use when the key
+        is first seen. Inside a transaction the row stays locked until
+        it ends, so an insert that is rolled back gives its number back.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(key=key).update(last_value=F('last_value') + count):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(key=key, last_value=(seed() if seed else 0) + count)
+                except IntegrityError:
+                    # Created by a concurrent first use
+                    cls.objects.filter(key=key).update(last_value=F('last_value') + count)
+            last_value = cls.objects.filter(key=key).values_list('last_value', flat=True).get()
+        return range(last_value - count + 1, last_value + 1)
@@ -17,8 +17,10 @@ import logging
 from django.db.models import Q
 from django.utils import timezone
 from django.views.decorators.http import require_POST
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
-from documents.utils.document_validator import DocumentValidator
+from documents.tasks import validate_requirement_document
+from documents.utils.uploads import SniffingUploadHandler
 from .models import (
     BusinessApplication, ApplicationRequirement,
     ApplicationRevision, ApplicationAssessment, ApplicationActivity
@@ -609,8 +611,16 @@ def application_detail(request, application_id):
 
 
 @login_required
+@csrf_exempt
 def requirement_upload(request, application_id, requirement_id):
     """Handle requirement document upload with AI analysis."""
+    # Handlers must be in place before the body is read, so CSRF is checked after
+    request.upload_handlers = [SniffingUploadHandler(request)]
+    return _requirement_upload(request, application_id, requirement_id)
+
+
+@csrf_protect
+def _requirement_upload(request, application_id, requirement_id):
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
@@ -619,20 +629,13 @@ def requirement_upload(request, application_id, requirement_id):
 
     try:
         if 'document' not in request.FILES:
-            return JsonResponse({'success': False, 'error': 'No document provided'})
+            # Type and size were checked while streaming; a rejected file never arrives
+            error = request.upload_errors.get('document', 'No document provided')
+            return JsonResponse({'success': False, 'error': error})
 
         document_file = request.FILES['document']
 
-        # Validate file size and type
-        if document_file.size > 10 * 1024 * 1024:
-            return JsonResponse({'success': False, 'error': 'File size must not exceed 10MB'})
-
-        allowed_types = ['application/pdf', 'image/jpeg', 'image/png', 'image/gif']
-        content_type = document_file.content_type.lower()
-        if content_type not in allowed_types:
-            return JsonResponse({'success': False, 'error': 'Invalid file type. Only PDF and images are allowed.'})
-
-        # Save document to requirement
+        # Save document to requirement; this is the only copy written
         requirement.document = document_file
         requirement.remarks = request.POST.get('remarks', '')
         requirement.is_submitted = True
@@ -647,69 +650,51 @@ def requirement_upload(request, application_id, requirement_id):
             description=f'Document uploaded for {requirement.requirement_name}'
         )
 
-        # Create Document record for AI analysis
-        document = Document.objects.create(
+        # Create Document record for AI analysis under a name of its own, so
+        # deleting the requirement's file leaves it intact. The storage links
+        # the name to the stored bytes by their hash instead of copying them.
+        document = Document(
             application=application,
+            user=request.user,
             document_type=requirement.requirement_name.lower().replace(' ', '_'),
-            file=document_file,
-            filename=document_file.name,
-            content_type=content_type,
-            file_size=document_file.size,
-            uploaded_by=request.user
+            filename=os.path.basename(requirement.document.name),
+            original_filename=document_file.name,
+            content_hash=document_file.content_hash
         )
-
-        # Run AI analysis asynchronously
-        from django.core.files.base import ContentFile
-        document_bytes = document_file.read()
-
-        # Initialize validator
-        validator = DocumentValidator()
-
-        # Run validation
-        validation_results = validator.validate_document(document_bytes)
-
-        # Store validation results
-        VerificationResult.objects.create(
-            document=document,
-            is_authentic=not validation_results.get('fraud_detection_results', {}).get('tampering_detected', False),
-            fraud_score=validation_results.get('fraud_detection_results', {}).get('confidence_score', 0.0),
-            extracted_text=validation_results.get('ocr_results', {}).get('full_text', ''),
-            extracted_data=validation_results.get('validation_results', {}),
-            verification_details=validation_results
+        requirement.document.content_hash = document_file.content_hash
+        document.file.save(document.filename, requirement.document)
+
+        # Queue AI analysis off the request path; the worker notifies the
+        # applicant if the document is flagged
+        queued = DocumentWorkflowService.queue_verification(
+            document.id,
+            task=validate_requirement_document
         )
 
-        # If potential fraud detected, flag document
-        fraud_detected = validation_results.get('fraud_detection_results', {}).get('tampering_detected', False)
-        if fraud_detected:
-            document.verification_status = 'quarantined'
-            document.quarantine_reason = 'tampering'
-            document.quarantine_date = timezone.now()
-            document.is_quarantined = True
-            document.save()
-
-        # After successful upload and document validation
-        if document.verification_status == 'quarantined':
-            create_notification(
-                user=request.user,
-                title="Document Requires Review",
-                message=f"Your document '{document_file.name}' for requirement '{requirement.requirement_name}' has been flagged for review. This may delay your application processing.",
-                notification_type='warning',
-                link=reverse('applications:application_detail', kwargs={'application_id': application.id})
-            )
+        # A scan that already finished may have quarantined the file; the task
+        # has then sent the applicant its own "requires review" notification
+        status = queued['verification_status']
+        if status == 'fraud':
+            message = 'Document uploaded and flagged for review.'
         else:
+            verified = status == 'verified'
+            message = 'Document uploaded and verified.' if verified else 'Document uploaded; scanning is in progress.'
+            outcome = 'uploaded and verified' if verified else 'uploaded and is being verified'
             create_notification(
                 user=request.user,
                 title="Document Uploaded",
-                message=f"Your document '{document_file.name}' for requirement '{requirement.requirement_name}' has been uploaded successfully.",
-                notification_type='success',
+                message=f"Your document '{document_file.name}' for requirement '{requirement.requirement_name}' has been {outcome}.",
+                notification_type='success' if verified else 'info',
                 link=reverse('applications:application_detail', kwargs={'application_id': application.id})
             )
 
         return JsonResponse({
             'success': True,
             'verification': {
-                'status': 'fraud_detected' if fraud_detected else 'verified',
-                'message': 'Document scanned successfully.'
+                'status': status,
+                'document_id': str(document.id),
+                'status_url': reverse('documents:verification_status', kwargs={'document_id': document.id}),
+                'message': message
             }
         })
 
@@ -0,0 +1,4 @@
+# Import celery app when Django starts
+from .celery import app as celery_app
+
+__all__ = ['celery_app']
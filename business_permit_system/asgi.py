@@ -7,10 +7,29 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
 
+import logging
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'business_permit_system.settings')
 
-application = get_asgi_application()
+# Set up Django before importing code that uses models
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from documents.utils.model_registry import preload_models  # noqa: E402
+from queuing.routing import websocket_urlpatterns  # noqa: E402
+
+# daphne serves the app from this one process (see Procfile): load the heavy models
+# here, before the first request; Celery workers do the same in worker_process_init
+for name, error in preload_models().items():
+    logging.getLogger(__name__).warning(f"Model {name} not preloaded: {error}")
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(AuthMiddlewareStack(URLRouter(websocket_urlpatterns))),
+})
@@ -0,0 +1,39 @@
+import os
+from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_init
+
+# Set the default Django settings module
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'business_permit_system.settings')
+
+# Create the Celery app
+app = Celery('business_permit_system')
+
+# Use a string for config to avoid namespace issues
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Auto-discover tasks in all installed apps
+app.autodiscover_tasks()
+
+app.conf.beat_schedule = {
+    'send-deadline-reminders-daily': {
+        'task': 'notifications.tasks.send_deadline_reminders',
+        'schedule': crontab(hour=9, minute=0),  # Run daily at 9:00 AM
+    },
+}
+
+
+@worker_process_init.connect
+def preload_worker_models(**kwargs):
+    """Load the heavy models and start the OCR pool once in each worker process, before its first task"""
+    from documents.utils.model_registry import preload_models
+    from documents.utils.ocr_pool import get_ocr_pool, tesseract_available
+    preload_models()
+    if tesseract_available():
+        # Prefork children are daemonic, so this is a thread pool with an engine per thread
+        get_ocr_pool()
+
+
+@app.task(bind=True)
+def debug_task(self):
+    print(f'Request: {self.request!r}')
\ No newline at end of file
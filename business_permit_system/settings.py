@@ -1,7 +1,7 @@
 import os
 import sys
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 import dj_database_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -106,11 +106,20 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    # Identical uploads share one copy on disk; see documents/storage.py
+    'default': {
+        'BACKEND': config('MEDIA_STORAGE_BACKEND', default='documents.storage.ContentAddressedStorage'),
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # PWA Settings
@@ -186,11 +195,6 @@ MAX_LOGIN_ATTEMPTS = 3  # or whatever number you prefer
 
 LOGIN_URL = 'accounts:login'
 
-# For handling file uploads on Heroku
-if not DEBUG:
-    # Consider using S3 for a production environment
-    DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
-
 if 'test' in sys.argv:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
     MEDIA_ROOT = os.path.join(BASE_DIR, 'test_media')
@@ -224,9 +228,71 @@ if not DEBUG:
     CSRF_COOKIE_SECURE = True
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 '''
+# OCR settings: 'tesseract' runs real OCR in a worker pool, 'filename' only parses filenames
+OCR_ENGINE = config('OCR_ENGINE', default='tesseract')
+OCR_POOL_SIZE = config('OCR_POOL_SIZE', default=2, cast=int)
+OCR_LANG = config('OCR_LANG', default='eng')
+OCR_DPI = config('OCR_DPI', default=300, cast=int)
+# Extra tesseract options, e.g. '--psm 6 --oem 1'; passed to tesserocr and the CLI alike
+OCR_TESSERACT_CONFIG = config('OCR_TESSERACT_CONFIG', default='')
+
+# Similarity (0-1) at which form values and document values are taken to match
+FUZZY_MATCH_THRESHOLD = config('FUZZY_MATCH_THRESHOLD', default=0.8, cast=float)
+
+# Bits (of 64) two document pHashes may differ by and count as near-duplicates
+DUPLICATE_HASH_DISTANCE = config('DUPLICATE_HASH_DISTANCE', default=6, cast=int)
+
+# Browser cache lifetime of document thumbnails and previews; their URLs change with the original
+RENDITION_CACHE_SECONDS = config('RENDITION_CACHE_SECONDS', default=31536000, cast=int)
+
+# Largest requirement upload accepted; checked while the upload streams in
+DOCUMENT_UPLOAD_MAX_SIZE = config('DOCUMENT_UPLOAD_MAX_SIZE', default=10 * 1024 * 1024, cast=int)
+
+# Shared cache. The in-memory queue engine, display snapshot, availability grid and
+# document indexes are kept coherent across processes through version keys in this
+# cache, so every web, ASGI and Celery process must use the same one. The per-process
+# LocMem cache is only allowed for development and tests (see queuing/apps.py).
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+TESTING = 'test' in sys.argv or 'pytest' in sys.modules
+
+# Channel layer for the live queue display: Redis when a URL is given (the shared cache's
+# by default), else in-process, which is fine for a single ASGI worker and for tests.
+CHANNEL_LAYER_URL = config('CHANNEL_LAYER_URL', default=CACHE_URL)
+if CHANNEL_LAYER_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_LAYER_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+# Trained fraud model (joblib); the built-in weighted model is used when unset
+FRAUD_MODEL_PATH = config('FRAUD_MODEL_PATH', default='')
+
+# spaCy pipeline for NLP validation
+NLP_MODEL = config('NLP_MODEL', default='en_core_web_sm')
+NLP_EXCLUDED_COMPONENTS = config('NLP_EXCLUDED_COMPONENTS', default='parser,lemmatizer', cast=Csv())
+
+# Models loaded when the ASGI app or a Celery worker process boots
+MODEL_PRELOAD = config('MODEL_PRELOAD', default='spacy,fraud_model,tesseract', cast=Csv())
+
 # Celery Settings
-CELERY_TASK_ALWAYS_EAGER = True  # Run tasks synchronously during development
+# Document verification runs in the Procfile's worker process, so uploads return while
+# it is pending. Eager mode runs tasks inside the request and is only the default for
+# development and tests; the broker and result store default to the shared cache's Redis.
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=DEBUG or TESTING, cast=bool)
 CELERY_TASK_EAGER_PROPAGATES = True  # Propagate exceptions
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=CACHE_URL)
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default=CELERY_BROKER_URL)
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
@@ -1,18 +0,0 @@
-import os
-from celery import Celery
-
-# Set the default Django settings module
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'business_permit_system.settings')
-
-# Create the Celery app
-app = Celery('business_permit_system')
-
-# Use a string for config to avoid namespace issues
-app.config_from_object('django.conf:settings', namespace='CELERY')
-
-# Auto-discover tasks in all installed apps
-app.autodiscover_tasks()
-
-@app.task(bind=True)
-def debug_task(self):
-    print(f'Request: {self.request!r}')
\ No newline at end of file
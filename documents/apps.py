@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class DocumentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'documents'
+
+    def ready(self):
+        check_task_broker()
+        import documents.signals
+
+
+def check_task_broker():
+    """
+    Refuse to queue verification without a broker: outside eager mode the
+    tasks would go to Celery's default of a local AMQP server instead of
+    the worker process.
+    """
+    if not settings.CELERY_TASK_ALWAYS_EAGER and not settings.CELERY_BROKER_URL:
+        raise ImproperlyConfigured(
+            "CELERY_TASK_ALWAYS_EAGER is off but no broker is configured. "
+            "Set CELERY_BROKER_URL, or CACHE_URL to the shared Redis, so uploads reach the Celery worker."
+        )
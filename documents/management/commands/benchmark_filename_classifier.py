@@ -0,0 +1,92 @@
+# documents/management/commands/benchmark_filename_classifier.py
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.models import Document
+from documents.utils.ocr import DOCUMENT_FORMAT_PATTERNS, classify_filenames
+
+# One conforming filename per document type
+SAMPLE_FILENAMES = {
+    'dti_sec': 'DTI_REG123456_2025-01-15.pdf',
+    'lease': 'LEASE_2025-01-15_Bumpz.pdf',
+    'title': 'TCT445566_Bumpz.pdf',
+    'consent': 'CONSENT_Bumpz_2025-01-15.pdf',
+    'signage': 'SIGNAGE_Bumpz.jpg',
+    'fire_cert': 'FIRE_CERT_2025-01-15.pdf',
+    'zoning': 'ZONING_Bumpz.pdf',
+    'hoa': 'HOA_PERMIT_Bumpz.pdf',
+    'occupancy': 'OCCUPANCY_Bumpz.pdf',
+    'sanitary': 'SANITARY_Bumpz_2025.pdf',
+    'barangay': 'BRGY_CLEARANCE_Bumpz.pdf',
+    'gross_receipt': 'GROSS_RECEIPT_2024.pdf',
+    'sale_deed': 'DEED_SALE_Bumpz.pdf',
+    'transfer': 'TRANSFER_Bumpz_2025-01-15.pdf',
+    'closure': 'CLOSURE_Bumpz_2025-01-15.pdf',
+    'board_resolution': 'BOARD_RES_Bumpz_2025-01-15.pdf',
+}
+
+
+def legacy_classify(filename, document_type):
+    """Validation and field extraction as they ran before the combined classifier"""
+    valid_patterns = {key: f'^{pattern}' for key, pattern in DOCUMENT_FORMAT_PATTERNS.items()}
+    is_valid = bool(re.match(valid_patterns[document_type], filename))
+
+    fields = {}
+    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
+    if date_match:
+        fields['date'] = date_match.group(1)
+    name_match = re.search(r'([A-Za-z]+)_', filename)
+    if name_match:
+        fields['business_name'] = name_match.group(1)
+    reg_match = re.search(r'(REG\d+)', filename)
+    if reg_match:
+        fields['registration_number'] = reg_match.group(1)
+
+    return is_valid, fields
+
+
+class Command(BaseCommand):
+    help = 'Benchmark filename classification over every document type'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5000, help='Passes over the sample filenames')
+
+    def handle(self, *args, **options):
+        document_types = [document_type for document_type, _ in Document.DOCUMENT_TYPES]
+        filenames = [SAMPLE_FILENAMES[document_type] for document_type in document_types]
+        rounds = options['rounds']
+
+        # Every sample is checked against its own type and the next one
+        pairs = [
+            (filename, document_types[(index + offset) % len(document_types)])
+            for index, filename in enumerate(filenames)
+            for offset in (0, 1)
+        ]
+        expected = [legacy_classify(filename, document_type) for filename, document_type in pairs]
+        results = classify_filenames([filename for filename, _ in pairs])
+        actual = [
+            (result['document_type'] == document_type, result['extracted_fields'])
+            for result, (_, document_type) in zip(results, pairs)
+        ]
+        if actual != expected:
+            self.stdout.write(self.style.ERROR("Combined classifier disagrees with the legacy checks"))
+            return
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for filename, document_type in pairs:
+                legacy_classify(filename, document_type)
+        legacy = (time.perf_counter() - start) / (rounds * len(pairs))
+
+        batch = [filename for filename, _ in pairs]
+        start = time.perf_counter()
+        for _ in range(rounds):
+            classify_filenames(batch)
+        combined = (time.perf_counter() - start) / (rounds * len(pairs))
+
+        self.stdout.write(f"{len(document_types)} document types, {len(pairs)} filenames x {rounds} rounds")
+        self.stdout.write(f"  legacy: {legacy * 1e6:.2f} us per filename")
+        self.stdout.write(f"combined: {combined * 1e6:.2f} us per filename")
+        self.stdout.write(self.style.SUCCESS(f"Results identical; {legacy / combined:.1f}x faster"))
@@ -0,0 +1,73 @@
+# documents/management/commands/benchmark_image_loading.py
+import multiprocessing
+import os
+import resource
+import tempfile
+
+import numpy as np
+from PIL import Image
+from django.core.management.base import BaseCommand
+
+from documents.utils.document_validator import DocumentValidator
+
+
+def create_photo(path, megapixels):
+    """Write a synthetic 4:3 phone photo of roughly the given size"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(180, 255, (height, width, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path, quality=92)
+    return width, height
+
+
+def read_bytes_validation(path):
+    """Validation as callers did it before: read() the file and pass the bytes"""
+    with open(path, 'rb') as document_file:
+        file_bytes = document_file.read()
+    return DocumentValidator().analyze(file_bytes)
+
+
+def mapped_validation(path):
+    return DocumentValidator().analyze_file(path)
+
+
+def measure_peak_rss(entry_point, path):
+    """
+    Run one validation in a fresh process and return how far it raised the
+    peak resident set size above the process baseline, in bytes.
+    """
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    entry_point(path)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux
+    return (peak - baseline) * 1024
+
+
+class Command(BaseCommand):
+    help = 'Compare peak memory of byte-based and memory-mapped image validation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--megapixels', type=float, default=12, help='Size of the synthetic photo')
+
+    def handle(self, *args, **options):
+        # A spawned process per run, so each starts from its own clean peak
+        context = multiprocessing.get_context('spawn')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'photo.jpg')
+            width, height = create_photo(path, options['megapixels'])
+            self.stdout.write(
+                f"Validating a {width}x{height} photo ({os.path.getsize(path) / 1e6:.1f} MB on disk)"
+            )
+
+            peaks = {}
+            for name, entry_point in (('bytes', read_bytes_validation), ('mmap', mapped_validation)):
+                with context.Pool(1) as pool:
+                    peaks[name] = pool.apply(measure_peak_rss, (entry_point, path))
+                self.stdout.write(f"{name:>6}: peak RSS +{peaks[name] / 2 ** 20:.1f} MB")
+
+        saved = peaks['bytes'] - peaks['mmap']
+        self.stdout.write(self.style.SUCCESS(
+            f"Memory-mapped loading saved {saved / 2 ** 20:.1f} MB of peak RSS per validation"
+        ))
@@ -0,0 +1,65 @@
+# documents/management/commands/benchmark_ocr.py
+import os
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.utils.ocr_pool import (
+    TesseractPool, PytesseractEngine, create_engine, recognize_page, tesseract_available
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare OCR pages per second for per-call tesseract, the persistent engine and the worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=20, help='Number of synthetic pages')
+        parser.add_argument('--pool-size', type=int, default=os.cpu_count() or 1, help='OCR worker processes')
+        parser.add_argument('--lang', default='eng')
+
+    def handle(self, *args, **options):
+        if not tesseract_available():
+            raise CommandError("Tesseract is not installed")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for index in range(options['pages']):
+                img = Image.new('RGB', (1240, 1754), 'white')
+                draw = ImageDraw.Draw(img)
+                for y in range(100, 1600, 60):
+                    draw.text((100, y), f"Business Name No. {6559081 + index} BUMPZ AUTO ACCESSORIES", fill='black')
+                path = os.path.join(temp_dir, f'page_{index}.png')
+                img.save(path)
+                paths.append(path)
+
+            engine = PytesseractEngine(options['lang'], '')
+            start = time.perf_counter()
+            for path in paths:
+                recognize_page(path, 1, None, 300, engine=engine)
+            per_call = len(paths) / (time.perf_counter() - start)
+            self.stdout.write(f"  per-call: {per_call:.2f} pages/s (tesseract CLI, model loaded per page)")
+
+            # The engine each pool worker keeps: tesserocr loads the model once
+            engine = create_engine(options['lang'], '')
+            recognize_page(paths[0], 1, None, 300, engine=engine)
+            start = time.perf_counter()
+            for path in paths:
+                recognize_page(path, 1, None, 300, engine=engine)
+            persistent = len(paths) / (time.perf_counter() - start)
+            self.stdout.write(f"persistent: {persistent:.2f} pages/s ({type(engine).__name__}, one process)")
+
+            pool = TesseractPool(size=options['pool_size'], lang=options['lang'])
+            try:
+                pool.extract_many(paths[:options['pool_size']])  # start workers and load models
+                start = time.perf_counter()
+                pool.extract_many(paths)
+                pooled = len(paths) / (time.perf_counter() - start)
+            finally:
+                pool.shutdown()
+            self.stdout.write(f"    pooled: {pooled:.2f} pages/s ({options['pool_size']} workers)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Persistent engine speed-up: {persistent / per_call:.1f}x; pool speed-up: {pooled / per_call:.1f}x"
+        ))
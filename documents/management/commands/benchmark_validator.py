@@ -0,0 +1,82 @@
+# documents/management/commands/benchmark_validator.py
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+from django.core.management.base import BaseCommand
+
+from documents.utils.document_validator import DocumentValidator
+
+
+def create_scan(dpi):
+    """Create a synthetic A4 page scanned at the given DPI"""
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    img = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(img)
+    for y in range(dpi // 2, height - dpi // 2, dpi // 6):
+        draw.text((dpi // 2, y), "Certificate of Business Name Registration No. 6559081", fill='black')
+    return np.array(img)
+
+
+def legacy_validations(validator, image_np):
+    """The checks as they ran before the shared feature stage"""
+    gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+    noise = cv2.subtract(gray, cv2.GaussianBlur(gray, (3, 3), 0))
+    noise_score = float(np.std(noise))
+
+    gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+    text_quality = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+    gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+    laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+    sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+    sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+    edge_intensity = np.sqrt(sobelx ** 2 + sobely ** 2).mean()
+
+    return {
+        'ela_score': validator._check_ela({'image': image_np}),
+        'noise_score': noise_score,
+        'text_quality': text_quality,
+        'resolution_score': float((laplacian_var + edge_intensity) / 2),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-page CPU time of the document validator checks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dpi', type=int, default=300, help='Resolution of the synthetic scan')
+        parser.add_argument('--pages', type=int, default=5, help='Number of pages to time')
+
+    def handle(self, *args, **options):
+        validator = DocumentValidator()
+        image_np = create_scan(options['dpi'])
+        pages = options['pages']
+
+        self.stdout.write(
+            f"Timing {pages} page(s) of {image_np.shape[1]}x{image_np.shape[0]} at {options['dpi']} dpi"
+        )
+
+        timings = {}
+        results = {}
+        for name, run in (
+            ('legacy', lambda: legacy_validations(validator, image_np)),
+            ('shared', lambda: validator._run_validations(image_np)),
+        ):
+            run()  # warm up
+            start = time.process_time()
+            for _ in range(pages):
+                results[name] = run()
+            timings[name] = (time.process_time() - start) / pages
+            self.stdout.write(f"{name:>8}: {timings[name] * 1000:.1f} ms CPU per page")
+
+        if results['legacy'] != results['shared']:
+            self.stdout.write(self.style.ERROR(f"Scores differ: {results['legacy']} != {results['shared']}"))
+            return
+
+        saved = timings['legacy'] - timings['shared']
+        self.stdout.write(self.style.SUCCESS(
+            f"Scores identical; saved {saved * 1000:.1f} ms CPU per page "
+            f"({saved / timings['legacy'] * 100:.0f}%)"
+        ))
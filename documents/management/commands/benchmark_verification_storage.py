@@ -0,0 +1,136 @@
+# documents/management/commands/benchmark_verification_storage.py
+import json
+import statistics
+import time
+import uuid
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from applications.models import BusinessApplication
+from documents.models import Document, VerificationResult
+from documents.utils.result_archive import pack
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_analysis(rng):
+    """An image analysis and OCR payload of the size a 1600x1200 scan produces"""
+    grid = (38, 50)
+    scores = {
+        'ela_score': float(rng.uniform(0, 100)),
+        'noise_score': float(rng.uniform(0, 50)),
+        'text_quality': float(rng.uniform(50, 900)),
+        'resolution_score': float(rng.uniform(50, 300)),
+    }
+    heatmap = {
+        'tile_size': 32,
+        'grid': list(grid),
+        'ela': np.round(rng.gamma(2.0, 3.0, grid), 2).tolist(),
+        'noise': np.round(rng.gamma(2.0, 1.5, grid), 2).tolist(),
+    }
+    areas = [
+        {'x': 10.0, 'y': 20.0, 'width': 12.5, 'height': 8.0, 'confidence': 0.8, 'indicator': 'ela'}
+        for _ in range(3)
+    ]
+    text = ' '.join(f'Barangay Clearance line {i} Bumpz Auto Accessories Shop REG6559081' for i in range(60))
+    ocr = {'text': text, 'extracted_fields': {'registration_number': 'REG6559081'}}
+    return scores, heatmap, areas, ocr
+
+
+class Command(BaseCommand):
+    help = 'Compare row size and reviewer list latency of inline and compacted verification results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=1000, help='Documents per layout')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs of each list query')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options['documents'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _run(self, count, repeat):
+        rng = np.random.default_rng(0)
+        user = get_user_model().objects.create_user(
+            username=f'benchmark-{uuid.uuid4().hex[:8]}', email=f'{uuid.uuid4().hex}@example.com'
+        )
+        application = BusinessApplication.objects.create(
+            applicant=user, application_type='new', payment_mode='annually', business_name='Benchmark'
+        )
+
+        sizes = {'inline': 0, 'compact': 0, 'archive': 0}
+        documents, results = [], []
+        for layout, document_type in (('inline', 'lease'), ('compact', 'title')):
+            for index in range(count):
+                scores, heatmap, areas, ocr = synthetic_analysis(rng)
+                details = {'image_validation': {
+                    'scores': scores, 'message': 'Document shows signs of tampering.',
+                    'quarantine_reason': 'ela', 'copy_move': [],
+                }}
+                result = VerificationResult(fraud_probability=float(rng.uniform()), fraud_areas=areas)
+                if layout == 'inline':
+                    # As stored before: heatmaps, areas and OCR text repeated in the details
+                    details['image_validation'].update(fraud_areas=areas, heatmaps=[heatmap])
+                    details['ocr'] = ocr
+                    sizes['inline'] += len(ocr['text'])
+                else:
+                    details['ocr'] = {'extracted_fields': ocr['extracted_fields']}
+                    for field in VerificationResult.SCORE_FIELDS:
+                        setattr(result, field, scores[field])
+                    sizes['archive'] += len(pack([heatmap], ocr))
+                sizes[layout] += len(json.dumps(details)) + len(json.dumps(areas))
+
+                document = Document(
+                    application=application, user=user, document_type=document_type,
+                    file=f'benchmark/{index}.png', filename=f'{index}.png', original_filename=f'{index}.png',
+                    verification_status='fraud', verification_details=details
+                )
+                result.document = document
+                documents.append(document)
+                results.append(result)
+
+        Document.objects.bulk_create(documents, batch_size=500)
+        VerificationResult.objects.bulk_create(results, batch_size=500)
+
+        def inline_list():
+            # Sorting by a score meant loading and decoding every row's JSON
+            rows = Document.objects.filter(document_type='lease', verification_status='fraud')
+            return sorted(
+                rows, key=lambda d: d.verification_details['image_validation']['scores']['ela_score'], reverse=True
+            )[:50]
+
+        def compact_list():
+            rows = Document.objects.filter(document_type='title', verification_status='fraud')
+            return list(
+                rows.select_related('result').defer('verification_details')
+                .order_by(F('result__ela_score').desc(nulls_last=True))[:50]
+            )
+
+        timings = {}
+        for name, query in (('inline', inline_list), ('compact', compact_list)):
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                query()
+                runs.append(time.perf_counter() - started)
+            timings[name] = statistics.median(runs)
+
+        for name in ('inline', 'compact'):
+            self.stdout.write(
+                f"{name:>8}: {sizes[name] / count / 1024:.1f} KB per row in the tables, "
+                f"top-50 by ELA in {timings[name] * 1000:.1f} ms"
+            )
+        self.stdout.write(f" archive: {sizes['archive'] / count / 1024:.1f} KB per result on disk")
+        self.stdout.write(self.style.SUCCESS(
+            f"Compaction keeps {sizes['compact'] / sizes['inline']:.1%} of the row bytes; "
+            f"list query {timings['inline'] / timings['compact']:.1f}x faster"
+        ))
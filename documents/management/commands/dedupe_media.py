@@ -0,0 +1,74 @@
+# documents/management/commands/dedupe_media.py
+import os
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from documents.storage import ContentAddressedStorage, hash_path
+
+
+class Command(BaseCommand):
+    help = 'Move existing media files into the content-addressed blob store, keeping one copy of identical files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be saved without changing files')
+        parser.add_argument('--prune', action='store_true', help='Also delete blobs no file refers to any more')
+
+    def handle(self, *args, **options):
+        storage = ContentAddressedStorage(location=settings.MEDIA_ROOT)
+        blob_root = storage.path(storage.BLOB_DIRECTORY)
+        stats = {'files': 0, 'linked': 0, 'duplicates': 0, 'bytes_saved': 0, 'pruned': 0}
+        # Digests this run has stored, for --dry-run where nothing is written
+        seen = set()
+
+        for directory, subdirectories, filenames in os.walk(settings.MEDIA_ROOT):
+            if directory == settings.MEDIA_ROOT and storage.BLOB_DIRECTORY in subdirectories:
+                subdirectories.remove(storage.BLOB_DIRECTORY)
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if os.path.islink(path):
+                    continue
+                stats['files'] += 1
+                self._dedupe(storage, path, seen, stats, options['dry_run'])
+
+        if options['prune'] and os.path.isdir(blob_root):
+            for directory, _, filenames in os.walk(blob_root):
+                for filename in filenames:
+                    blob = os.path.join(directory, filename)
+                    if os.stat(blob).st_nlink == 1:
+                        stats['pruned'] += 1
+                        if not options['dry_run']:
+                            os.remove(blob)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would save' if options['dry_run'] else 'Saved'} {stats['bytes_saved'] / 2 ** 20:.1f} MB: "
+            f"{stats['files']} files, {stats['duplicates']} duplicates, "
+            f"{stats['linked']} newly stored, {stats['pruned']} orphaned blobs pruned"
+        ))
+
+    def _dedupe(self, storage, path, seen, stats, dry_run):
+        digest = hash_path(path)
+        blob = storage.blob_path(digest)
+
+        if digest not in seen and not os.path.exists(blob):
+            # First copy: it becomes the blob without moving any bytes
+            seen.add(digest)
+            stats['linked'] += 1
+            if not dry_run:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                storage.record_hash(path, digest)
+                os.link(path, blob)
+            return
+        seen.add(digest)
+
+        if os.path.exists(blob) and os.path.samefile(path, blob):
+            return
+
+        stats['duplicates'] += 1
+        stats['bytes_saved'] += os.path.getsize(path)
+        if not dry_run:
+            # Swap the copy for a link in one step, so readers never see it missing
+            temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+            os.link(blob, temp_path)
+            os.replace(temp_path, path)
@@ -0,0 +1,48 @@
+# documents/management/commands/model_report.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.utils.model_registry import registry
+
+
+class Command(BaseCommand):
+    help = 'Load the registered models and report load time, memory and request latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='Models to report (default: all registered)')
+        parser.add_argument('--requests', type=int, default=20, help='Warm requests timed per model')
+
+    def handle(self, *args, **options):
+        names = options['models'] or registry.names
+
+        for name in names:
+            registry.unload(name)
+
+            # Cold: the first request of a fresh worker pays for the load
+            start = time.perf_counter()
+            try:
+                registry.get(name)
+                if registry.has_probe(name):
+                    registry.probe(name)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"{name}: could not load ({str(e)})"))
+                continue
+            cold = time.perf_counter() - start
+
+            stats = registry.report()[name]
+            line = (
+                f"{name}: loaded in {stats['load_seconds']:.3f}s, "
+                f"+{stats['memory_bytes'] / 2 ** 20:.1f} MB, cold request {cold * 1000:.1f} ms"
+            )
+
+            if registry.has_probe(name):
+                warm = []
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    registry.probe(name)
+                    warm.append(time.perf_counter() - start)
+                line += f", warm request {statistics.median(warm) * 1000:.2f} ms"
+
+            self.stdout.write(line)
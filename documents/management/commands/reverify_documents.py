@@ -0,0 +1,55 @@
+# documents/management/commands/reverify_documents.py
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from documents.models import Document
+from documents.services.batch_verification import BatchVerificationService, default_worker_count
+
+
+class Command(BaseCommand):
+    help = 'Re-run image verification on stored documents using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200, help='Documents loaded and written per chunk')
+        parser.add_argument('--workers', type=int, default=default_worker_count(), help='Analysis processes')
+        parser.add_argument('--document-type', choices=[t[0] for t in Document.DOCUMENT_TYPES])
+        parser.add_argument('--status', choices=[s[0] for s in Document.VERIFICATION_STATUS])
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(settings.MEDIA_ROOT, 'processing_results', 'reverify_checkpoint.json'),
+            help='File recording the last committed document'
+        )
+        parser.add_argument('--resume', action='store_true', help='Continue after the last checkpoint taken with the same filters')
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options['document_type']:
+            filters['document_type'] = options['document_type']
+        if options['status']:
+            filters['verification_status'] = options['status']
+        documents = Document.objects.filter(**filters)
+
+        service = BatchVerificationService(
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            checkpoint_path=options['checkpoint'],
+            filters=filters
+        )
+
+        self.stdout.write(
+            f"Re-verifying documents with {service.workers} workers in chunks of {service.chunk_size}"
+        )
+
+        def report(stats, elapsed):
+            rate = stats['processed'] / elapsed if elapsed else 0.0
+            self.stdout.write(f"  {stats['processed']} processed ({rate:.1f} docs/s)")
+
+        stats = service.reverify(documents, resume=options['resume'], progress_callback=report)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {stats['processed']} documents in {stats['elapsed']:.1f}s "
+            f"({stats['documents_per_second']:.1f} docs/s): "
+            f"{stats['updated']} updated, {stats['failed']} could not be analysed"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0007_auto_20250401_1324'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='verification_progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='verification_task_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_document_verification_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='verificationresult',
+            name='analyzer_version',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0009_verification_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='dhash',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='phash',
+            field=models.CharField(blank=True, db_index=True, max_length=16),
+        ),
+    ]
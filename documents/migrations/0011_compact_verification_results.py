@@ -0,0 +1,86 @@
+# Generated by Django 5.1.5 on 2026-10-18 17:02
+
+from django.core.files.base import ContentFile
+from django.db import migrations, models
+
+import documents.models
+from documents.utils.result_archive import pack
+
+SCORE_FIELDS = ('ela_score', 'noise_score', 'text_quality', 'resolution_score')
+
+
+def compact_results(apps, schema_editor):
+    """
+    Move OCR text and tile heatmaps into each result's archive, copy the
+    scores into their columns and drop the copies kept in the details.
+    """
+    VerificationResult = apps.get_model('documents', 'VerificationResult')
+    Document = apps.get_model('documents', 'Document')
+
+    results = VerificationResult.objects.select_related('document').order_by('pk')
+    for result in results.iterator(chunk_size=500):
+        document = result.document
+        details = document.verification_details or {}
+        image_validation = details.get('image_validation') or {}
+        ocr = details.get('ocr') or {}
+
+        for field in SCORE_FIELDS:
+            setattr(result, field, (image_validation.get('scores') or {}).get(field))
+
+        heatmaps = image_validation.pop('heatmaps', None) or []
+        image_validation.pop('fraud_areas', None)
+        (details.get('fraud_detection') or {}).pop('fraud_areas', None)
+        text = ocr.pop('text', None) or result.ocr_text
+        payload = dict(ocr, text=text) if text else None
+        if 'ocr' in details:
+            details['ocr'] = {'extracted_fields': ocr.get('extracted_fields', {})}
+
+        if heatmaps or payload:
+            result.archive.save('archive.npz', ContentFile(pack(heatmaps, payload)), save=False)
+        result.save(update_fields=[*SCORE_FIELDS, 'archive'])
+        Document.objects.filter(pk=document.pk).update(verification_details=details)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0010_document_perceptual_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verificationresult',
+            name='archive',
+            field=models.FileField(blank=True, upload_to=documents.models.verification_archive_path),
+        ),
+        migrations.AddField(
+            model_name='verificationresult',
+            name='ela_score',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='verificationresult',
+            name='noise_score',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='verificationresult',
+            name='resolution_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='verificationresult',
+            name='text_quality',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='verificationresult',
+            name='fraud_probability',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.RunPython(compact_results, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='verificationresult',
+            name='ocr_text',
+        ),
+    ]
@@ -1,6 +1,11 @@
 from django.db import models
 from django.conf import settings
 from applications.models import BusinessApplication
+from .utils.hashing import compute_content_hash
+from .utils.perceptual_hash import IMAGE_EXTENSIONS, hash_file
+from .utils.result_archive import pack, unpack
+from django.core.files.base import ContentFile
+import os
 import uuid
 
 
@@ -17,6 +22,11 @@ def document_upload_path(instance, filename):
     return f'documents/user_{instance.user.id}/{instance.document_type}/{new_filename}'
 
 
+def verification_archive_path(instance, filename):
+    """Compressed OCR text and heatmaps of a result: MEDIA_ROOT/verification/<document id>.npz"""
+    return f'verification/{instance.document_id}.npz'
+
+
 class Document(models.Model):
     DOCUMENT_TYPES = (
         ('dti_sec', 'DTI/SEC Registration'),
@@ -59,6 +69,10 @@ class Document(models.Model):
     file = models.FileField(upload_to=document_upload_path)
     filename = models.CharField(max_length=255)
     original_filename = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    # Perceptual hashes (64-bit hex) for finding re-encoded or lightly edited copies
+    phash = models.CharField(max_length=16, blank=True, db_index=True)
+    dhash = models.CharField(max_length=16, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     verification_status = models.CharField(
         max_length=20,
@@ -67,6 +81,8 @@ class Document(models.Model):
     )
     verification_details = models.JSONField(null=True, blank=True)
     verification_timestamp = models.DateTimeField(null=True, blank=True)
+    verification_task_id = models.CharField(max_length=255, blank=True)
+    verification_progress = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         ordering = ['-uploaded_at']
@@ -74,6 +90,39 @@ class Document(models.Model):
     def __str__(self):
         return f"{self.get_document_type_display()} - {self.application}"
 
+    @property
+    def is_quarantined(self):
+        """Flagged documents are held for review until a reviewer releases them"""
+        return self.verification_status == 'fraud'
+
+    @property
+    def quarantine_reason(self):
+        if not self.is_quarantined:
+            return None
+        return (self.verification_details or {}).get('image_validation', {}).get('quarantine_reason')
+
+    def save(self, *args, **kwargs):
+        # Hash new uploads so identical files can reuse earlier verification results
+        if self.file and not self.file._committed and not self.content_hash:
+            self.content_hash = compute_content_hash(self.file)
+        # Images are hashed here; PDFs are hashed when verified, as they must be rendered
+        if self.file and not self.file._committed and not self.phash:
+            self._hash_image_upload()
+        super().save(*args, **kwargs)
+
+
+    def _hash_image_upload(self):
+        if os.path.splitext(self.file.name)[1].lower() not in IMAGE_EXTENSIONS:
+            return
+        try:
+            hashes = hash_file(self.file)
+        except Exception:
+            # Not decodable as an image; the validator will report it
+            return
+        finally:
+            self.file.seek(0)
+        self.phash, self.dhash = hashes['phash'], hashes['dhash']
+
 
 class VerificationResult(models.Model):
     document = models.OneToOneField(
@@ -81,12 +130,48 @@ class VerificationResult(models.Model):
         on_delete=models.CASCADE,
         related_name='result'
     )
+    SCORE_FIELDS = ('ela_score', 'noise_score', 'text_quality', 'resolution_score')
+
     is_valid = models.BooleanField(default=False)
     confidence_score = models.FloatField(default=0.0)
-    fraud_probability = models.FloatField(default=0.0)
+    fraud_probability = models.FloatField(default=0.0, db_index=True)
     fraud_areas = models.JSONField(null=True, blank=True)
-    ocr_text = models.TextField(null=True, blank=True)
+    # Image forensics scores as columns, so reviewer lists sort and filter without reading JSON
+    ela_score = models.FloatField(null=True, blank=True, db_index=True)
+    noise_score = models.FloatField(null=True, blank=True, db_index=True)
+    text_quality = models.FloatField(null=True, blank=True)
+    resolution_score = models.FloatField(null=True, blank=True)
+    # OCR payload and tile heatmaps, compressed outside the table
+    archive = models.FileField(upload_to=verification_archive_path, blank=True)
+    analyzer_version = models.CharField(max_length=50, blank=True)
     processed_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Verification for {self.document}"
\ No newline at end of file
+        return f"Verification for {self.document}"
+
+    def archived(self):
+        """The archived {'heatmaps', 'ocr'}, read once per instance"""
+        if not hasattr(self, '_archived'):
+            self._archived = {'heatmaps': [], 'ocr': None}
+            if self.archive:
+                with self.archive.open('rb') as archive:
+                    self._archived = unpack(archive.read())
+        return self._archived
+
+    def store_archive(self, heatmaps=(), ocr=None):
+        """Replace the archive without saving the row"""
+        if self.archive:
+            self.archive.delete(save=False)
+        self._archived = {'heatmaps': list(heatmaps or ()), 'ocr': ocr}
+        if heatmaps or ocr:
+            self.archive.save('archive.npz', ContentFile(pack(heatmaps, ocr)), save=False)
+        else:
+            self.archive = ''
+
+    @property
+    def ocr_text(self):
+        return (self.archived()['ocr'] or {}).get('text')
+
+    @property
+    def heatmaps(self):
+        return self.archived()['heatmaps']
\ No newline at end of file
@@ -0,0 +1,55 @@
+import time
+from django.core.cache import cache
+
+
+class ChangeLog:
+    """
+    Changes to a per-process index, shared through the cache.
+    Every change gets the next version number and is stored under a key of
+    its own, so a process whose index is behind applies the changes it
+    missed in order instead of rebuilding the index from the database.
+    A process only rebuilds when the changes it needs have expired or were
+    evicted.
+    """
+
+    # Changes a process may be behind before it rebuilds instead
+    MAX_ENTRIES = 1000
+
+    # Seconds a change is kept for processes that have not caught up
+    TIMEOUT = 24 * 60 * 60
+
+    def __init__(self, version_key):
+        self.version_key = version_key
+
+    def _entry_key(self, version):
+        return f'{self.version_key}:{version}'
+
+    def version(self):
+        return cache.get(self.version_key, 0)
+
+    def publish(self, change):
+        """Record a change under the next version"""
+        # Numbering starts from the clock, so a sequence restarted after the
+        # version key was evicted never reuses the keys of older entries
+        cache.add(self.version_key, int(time.time() * 1000), timeout=None)
+        try:
+            version = cache.incr(self.version_key)
+        except ValueError:
+            # Evicted between add and incr; the jump makes every process rebuild
+            version = int(time.time() * 1000)
+            cache.set(self.version_key, version, timeout=None)
+        cache.set(self._entry_key(version), change, timeout=self.TIMEOUT)
+        return version
+
+    def changes_since(self, version, current):
+        """
+        The changes after version up to current, oldest first, or None when
+        the index has to be rebuilt because some of them are gone.
+        """
+        if version is None or not 0 <= current - version <= self.MAX_ENTRIES:
+            return None
+        keys = [self._entry_key(number) for number in range(version + 1, current + 1)]
+        entries = cache.get_many(keys)
+        if len(entries) != len(keys):
+            return None
+        return [entries[key] for key in keys]
@@ -0,0 +1,245 @@
+import threading
+from collections import defaultdict
+from django.conf import settings
+from applications.models import BusinessApplication
+from ..utils.fuzzy_match import (
+    NGramIndex, normalize, normalize_business_name, normalize_registration_number, similarity
+)
+from .change_log import ChangeLog
+
+
+class BusinessIndex:
+    """
+    In-memory index over every BusinessApplication's business name and
+    registration number. Names go into a trigram index; registration
+    numbers map to the applications that use them.
+    """
+
+    def __init__(self):
+        self.names = NGramIndex()
+        self.registrations = defaultdict(set)
+        self._registration_of = {}
+
+    @classmethod
+    def build(cls):
+        index = cls()
+        rows = BusinessApplication.objects.values_list('id', 'business_name', 'registration_number')
+        for application_id, business_name, registration_number in rows.iterator(chunk_size=2000):
+            index.add(application_id, business_name, registration_number)
+        return index
+
+    def add(self, application_id, business_name, registration_number):
+        self.remove(application_id)
+        self.names.add(application_id, normalize_business_name(business_name))
+        registration = normalize_registration_number(registration_number)
+        if registration:
+            self.registrations[registration].add(application_id)
+            self._registration_of[application_id] = registration
+
+    def remove(self, application_id):
+        self.names.remove(application_id)
+        registration = self._registration_of.pop(application_id, None)
+        if registration:
+            self.registrations[registration].discard(application_id)
+            if not self.registrations[registration]:
+                del self.registrations[registration]
+
+
+class CrossValidationService:
+    """
+    Service for comparing what applicants typed with what their documents say,
+    and with the businesses already registered.
+    """
+
+    # Fields compared between the form and OCR output, and how
+    FIELDS = {
+        'business_name': 'business_name',
+        'registration_number': 'exact',
+        'owner_name': 'fuzzy',
+        'business_address': 'fuzzy',
+    }
+
+    DEFAULT_THRESHOLD = 0.8
+
+    VERSION_KEY = 'documents:business_index:version'
+    changes = ChangeLog(VERSION_KEY)
+
+    _index = None
+    _index_version = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def threshold():
+        return getattr(settings, 'FUZZY_MATCH_THRESHOLD', CrossValidationService.DEFAULT_THRESHOLD)
+
+    @staticmethod
+    def compare(field, form_value, extracted_value):
+        """Similarity of a form value and an extracted value, after normalising both"""
+        match_type = CrossValidationService.FIELDS[field]
+        if match_type == 'exact':
+            return float(
+                normalize_registration_number(form_value) == normalize_registration_number(extracted_value)
+            )
+        if match_type == 'business_name':
+            return similarity(normalize_business_name(form_value), normalize_business_name(extracted_value))
+        return similarity(normalize(form_value), normalize(extracted_value))
+
+    @staticmethod
+    def cross_validate(form_data, extracted_data):
+        """
+        Cross-validate form input data with extracted document data.
+        extracted_data maps each document to the fields read from it.
+        """
+        threshold = CrossValidationService.threshold()
+        validation_results = {
+            'is_valid': True,
+            'matches': [],
+            'discrepancies': [],
+            'issues': []
+        }
+
+        for field in CrossValidationService.FIELDS:
+            form_value = form_data.get(field)
+            extracted_value = None
+
+            # Look for the field in extracted data from all documents
+            for doc_data in extracted_data.values():
+                if doc_data.get(field):
+                    extracted_value = doc_data[field]
+                    break
+
+            if not (form_value and extracted_value):
+                validation_results['issues'].append(
+                    f"Unable to cross-validate {field}: missing data in form or documents"
+                )
+                continue
+
+            score = CrossValidationService.compare(field, form_value, extracted_value)
+            comparison = {
+                'field': field,
+                'form_value': form_value,
+                'extracted_value': extracted_value,
+                'similarity': round(score, 3)
+            }
+            if score >= threshold:
+                validation_results['matches'].append(comparison)
+            else:
+                validation_results['discrepancies'].append(comparison)
+                validation_results['issues'].append(
+                    f"Possible mismatch in {field}: form shows '{form_value}' but document shows '{extracted_value}'"
+                )
+
+        validation_results['is_valid'] = len(validation_results['discrepancies']) == 0
+        return validation_results
+
+    @staticmethod
+    def validate_application(application, extracted_fields):
+        """
+        Cross-validate fields read from one document against its application,
+        and check the registration number is not used by another business.
+        """
+        form_data = {field: getattr(application, field, '') for field in CrossValidationService.FIELDS}
+        results = CrossValidationService.cross_validate(form_data, {'document': extracted_fields})
+
+        registration_number = extracted_fields.get('registration_number') or application.registration_number
+        results['registration_reuse'] = CrossValidationService.find_registration_reuse(
+            registration_number, application.business_name, exclude_id=application.id
+        )
+        if results['registration_reuse']:
+            results['issues'].append(
+                f"Registration number {registration_number} is also used by "
+                f"{len(results['registration_reuse'])} other business(es)"
+            )
+        return results
+
+    @staticmethod
+    def get_index():
+        """
+        The process-wide business index, built on first use.
+        Changes saved by any process reach it through the shared change
+        log, so it is only rebuilt when that log has lost entries.
+        """
+        current = CrossValidationService.changes.version()
+        with CrossValidationService._lock:
+            index = CrossValidationService._index
+            changes = None
+            if index is not None:
+                changes = CrossValidationService.changes.changes_since(
+                    CrossValidationService._index_version, current
+                )
+            if changes is None:
+                index = BusinessIndex.build()
+                CrossValidationService._index = index
+            else:
+                for application_id, business_name, registration_number, deleted in changes:
+                    if deleted:
+                        index.remove(application_id)
+                    else:
+                        index.add(application_id, business_name, registration_number)
+            CrossValidationService._index_version = current
+            return index
+
+    @staticmethod
+    def application_changed(application_id, business_name=None, registration_number=None, deleted=False):
+        """Share a saved or deleted application with every process's index"""
+        CrossValidationService.changes.publish((application_id, business_name, registration_number, deleted))
+
+    @staticmethod
+    def reset_index():
+        with CrossValidationService._lock:
+            CrossValidationService._index = None
+            CrossValidationService._index_version = None
+
+    @staticmethod
+    def find_similar_businesses(business_name, threshold=None, limit=10, exclude_id=None):
+        """Existing applications whose business name is close to this one, best first"""
+        threshold = CrossValidationService.threshold() if threshold is None else threshold
+        index = CrossValidationService.get_index()
+        matches = index.names.search(normalize_business_name(business_name), threshold, limit + 1)
+        return [
+            {'application_id': str(application_id), 'similarity': round(score, 3)}
+            for application_id, score in matches
+            if application_id != exclude_id
+        ][:limit]
+
+    @staticmethod
+    def find_registration_reuse(registration_number, business_name, exclude_id=None):
+        """
+        Other applications using the same registration number under a
+        different business name. The same business renewing is not reuse.
+        """
+        registration = normalize_registration_number(registration_number)
+        if not registration:
+            return []
+
+        index = CrossValidationService.get_index()
+        name = normalize_business_name(business_name)
+        threshold = CrossValidationService.threshold()
+        reuse = []
+        for application_id in index.registrations.get(registration, ()):
+            if application_id == exclude_id:
+                continue
+            other_name = index.names.value(application_id)
+            score = similarity(name, other_name)
+            if score < threshold:
+                reuse.append({
+                    'application_id': str(application_id),
+                    'business_name': other_name,
+                    'similarity': round(score, 3)
+                })
+        return reuse
+
+    @staticmethod
+    def find_reused_registrations():
+        """Every registration number shared by businesses with different names"""
+        index = CrossValidationService.get_index()
+        threshold = CrossValidationService.threshold()
+        reused = {}
+        for registration, application_ids in index.registrations.items():
+            if len(application_ids) < 2:
+                continue
+            names = {index.names.value(application_id) for application_id in application_ids}
+            first = next(iter(names))
+            if any(similarity(first, name) < threshold for name in names):
+                reused[registration] = sorted(str(application_id) for application_id in application_ids)
+        return reused
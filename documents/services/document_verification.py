@@ -4,15 +4,73 @@ from django.conf import settings
 from django.utils import timezone
 from ..utils.ocr import extract_text_from_document
 from ..utils.fraud_detection import detect_fraud
+from ..utils.document_validator import analyze_document_file
 from ..models import Document, VerificationResult
+from .verification_cache import VerificationCache
+from .cross_validation import CrossValidationService
+from .duplicate_detection import DuplicateDetectionService
 
 
 class DocumentVerificationService:
     """
     Service for processing document verification.
-    This simulates AI document processing but actually just checks filenames.
+    Uploaded documents are read by OCR, scored for fraud over their filename
+    and image forensics, and cross-validated against their application;
+    requirement uploads are checked by the DocumentValidator alone. Results
+    are reused for byte-identical uploads through the VerificationCache.
     """
 
+    # Bump these when an analyzer changes so cached results are not reused
+    # ocr-3: fraud scores include image forensics features
+    ANALYZER_VERSION = 'ocr-3'
+    # 5: results inherited by perceptual match are no longer reused
+    # 6: sharpness and noise are measured at full resolution when screening
+    # 7: copy-move areas are only reported for clusters passing the region thresholds
+    IMAGE_ANALYZER_VERSION = 'image-validator-7'
+
+    CACHED_RESULT_FIELDS = (
+        'is_valid', 'confidence_score', 'fraud_probability', 'fraud_areas'
+    ) + VerificationResult.SCORE_FIELDS
+
+    @staticmethod
+    def _copy_result_fields(result):
+        return {
+            field: getattr(result, field)
+            for field in DocumentVerificationService.CACHED_RESULT_FIELDS
+        }
+
+    @staticmethod
+    def _save_result(document, defaults, archive):
+        """Create or update the document's result, with its archive stored beside it"""
+        result = VerificationResult.objects.filter(document=document).first() or VerificationResult(document=document)
+        for field, value in defaults.items():
+            setattr(result, field, value)
+        # The archive file is written first, so the row is saved once with its name
+        result.store_archive(**archive)
+        result.save()
+        return result
+
+    @staticmethod
+    def _cached_details(result):
+        """Verification details of the source document, marked as a cache hit"""
+        details = dict(result.document.verification_details or {})
+        details.pop('manual_review', None)
+        details.pop('superseded_by', None)
+        details.pop('duplicates', None)
+        # Compared against the source's application: recomputed for this one
+        details.pop('cross_validation', None)
+        details['cache'] = {
+            'hit': True,
+            'source_document': str(result.document_id),
+            'analyzer_version': result.analyzer_version,
+        }
+        return details
+
+    @staticmethod
+    def _analysed_filename(document):
+        # detect_fraud and the filename OCR fallback read the stored name as well as the bytes
+        return os.path.basename(document.file.name)
+
     @staticmethod
     def process_document(document_id):
         """
@@ -21,39 +79,64 @@ class DocumentVerificationService:
         try:
             document = Document.objects.get(id=document_id)
 
-            # Get the file path
-            file_path = os.path.join(settings.MEDIA_ROOT, document.file.name)
+            cached_result = VerificationCache.lookup(
+                document, DocumentVerificationService.ANALYZER_VERSION,
+                inputs=DocumentVerificationService._analysed_filename
+            )
+            if cached_result is not None:
+                # Same bytes and name were analysed before with this analyzer version
+                defaults = DocumentVerificationService._copy_result_fields(cached_result)
+                archive = cached_result.archived()
+                is_valid = cached_result.is_valid
+                details = DocumentVerificationService._cached_details(cached_result)
+                details['cross_validation'] = CrossValidationService.validate_application(
+                    document.application, details.get('ocr', {}).get('extracted_fields', {})
+                )
+            else:
+                # Get the file path
+                file_path = os.path.join(settings.MEDIA_ROOT, document.file.name)
 
-            # Extract text using OCR (simulated)
-            ocr_result = extract_text_from_document(file_path)
+                # Extract text using OCR
+                ocr_result = extract_text_from_document(file_path)
 
-            # Detect fraud (simulated)
-            fraud_result = detect_fraud(file_path, document.document_type)
+                # Detect fraud
+                fraud_result = detect_fraud(file_path, document.document_type)
 
-            # Create or update verification result
-            verification_result, created = VerificationResult.objects.update_or_create(
-                document=document,
-                defaults={
+                defaults = {
                     'is_valid': fraud_result['is_valid'],
                     'confidence_score': fraud_result['confidence_score'],
                     'fraud_probability': fraud_result['fraud_probability'],
                     'fraud_areas': fraud_result['fraud_areas'],
-                    'ocr_text': ocr_result['text'],
-                    'processed_at': timezone.now(),
                 }
-            )
+                # The forensics behind the score, in the same columns as image validation
+                for field in VerificationResult.SCORE_FIELDS:
+                    defaults[field] = (fraud_result['image_scores'] or {}).get(field)
+                # The OCR payload goes to the archive; areas are already on the result
+                archive = {'ocr': ocr_result}
+                is_valid = fraud_result['is_valid']
+                details = {
+                    'ocr': {'extracted_fields': ocr_result['extracted_fields']},
+                    'fraud_detection': {
+                        key: value for key, value in fraud_result.items() if key != 'fraud_areas'
+                    },
+                    'cross_validation': CrossValidationService.validate_application(
+                        document.application, ocr_result['extracted_fields']
+                    ),
+                }
+
+            # Create or update verification result
+            defaults['analyzer_version'] = DocumentVerificationService.ANALYZER_VERSION
+            defaults['processed_at'] = timezone.now()
+            DocumentVerificationService._save_result(document, defaults, archive)
 
             # Update document status
-            if fraud_result['is_valid']:
+            if is_valid:
                 document.verification_status = 'verified'
             else:
                 document.verification_status = 'fraud'
 
-            document.verification_details = {
-                'ocr': ocr_result,
-                'fraud_detection': fraud_result,
-                'processed_at': datetime.now().isoformat()
-            }
+            details['processed_at'] = datetime.now().isoformat()
+            document.verification_details = details
             document.verification_timestamp = timezone.now()
             document.save()
 
@@ -73,4 +156,101 @@ class DocumentVerificationService:
             return {
                 'success': False,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+
+    @staticmethod
+    def image_result_fields(analysis):
+        """VerificationResult column values from a DocumentValidator analysis"""
+        fields = {
+            'is_valid': analysis['is_valid'],
+            'fraud_areas': analysis['fraud_areas'],
+        }
+        for field in VerificationResult.SCORE_FIELDS:
+            fields[field] = analysis['scores'].get(field)
+        return fields
+
+    @staticmethod
+    def apply_image_validation(document, analysis):
+        """
+        Copy a DocumentValidator analysis onto the document without saving it.
+        Heatmaps and fraud areas are left to the VerificationResult.
+        """
+        document.verification_status = 'verified' if analysis['is_valid'] else 'fraud'
+        document.verification_details = {
+            'image_validation': {
+                'scores': analysis['scores'],
+                'message': analysis['message'],
+                'quarantine_reason': analysis['quarantine_reason'],
+                'copy_move': analysis['copy_move'],
+            },
+            'processed_at': datetime.now().isoformat()
+        }
+        if 'pages' in analysis:
+            document.verification_details['image_validation']['pages'] = analysis['pages']
+            document.verification_details['image_validation']['memory'] = analysis['memory']
+        if 'analysis_path' in analysis:
+            # Shows reviewers whether the scores came from screening or full resolution
+            document.verification_details['image_validation']['analysis_path'] = analysis['analysis_path']
+        document.verification_timestamp = timezone.now()
+
+    @staticmethod
+    def validate_document_image(document_id):
+        """
+        Run the image forensics checks on a stored document.
+        Used for requirement uploads, which are analysed by the
+        DocumentValidator instead of the filename checks.
+        """
+        try:
+            document = Document.objects.get(id=document_id)
+
+            version = DocumentVerificationService.IMAGE_ANALYZER_VERSION
+            DuplicateDetectionService.ensure_hashes(document)
+            # Only byte-identical uploads reuse a result. A perceptual match says
+            # the pictures look alike, not that their content is the same: an
+            # edited registration number leaves both hashes unchanged.
+            cached_result = VerificationCache.lookup(document, version)
+            if cached_result is not None:
+                defaults = DocumentVerificationService._copy_result_fields(cached_result)
+                archive = cached_result.archived()
+                document.verification_status = 'verified' if cached_result.is_valid else 'fraud'
+                document.verification_details = DocumentVerificationService._cached_details(cached_result)
+                document.verification_details['processed_at'] = datetime.now().isoformat()
+                document.verification_timestamp = timezone.now()
+            else:
+                analysis = analyze_document_file(document.file.path)
+                if analysis['scores'] is None:
+                    # Leave the document pending for manual review
+                    return {
+                        'success': False,
+                        'error': analysis['message']
+                    }
+
+                defaults = DocumentVerificationService.image_result_fields(analysis)
+                archive = {'heatmaps': analysis['heatmaps']}
+                DocumentVerificationService.apply_image_validation(document, analysis)
+
+            # Near-duplicates elsewhere are worth a reviewer's look either way
+            document.verification_details['duplicates'] = DuplicateDetectionService.find_near_duplicates(document)
+
+            defaults['analyzer_version'] = version
+            defaults['processed_at'] = timezone.now()
+            DocumentVerificationService._save_result(document, defaults, archive)
+            document.save()
+
+            return {
+                'success': True,
+                'document_id': document.id,
+                'verification_status': document.verification_status,
+                'details': document.verification_details
+            }
+
+        except Document.DoesNotExist:
+            return {
+                'success': False,
+                'error': f"Document with ID {document_id} not found"
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
@@ -14,15 +14,50 @@ class DocumentWorkflowService:
     """
 
     @staticmethod
-    def process_new_document(document_id):
+    def queue_verification(document_id, task=None):
+        """
+        Hand a document to the verification queue and return immediately.
+        The document stays 'pending' until a worker picks it up; progress
+        and the final result are read back through the status endpoint.
+        With CELERY_TASK_ALWAYS_EAGER the task runs in-process instead.
+        """
+        from ..tasks import verify_document
+
+        task = task or verify_document
+
+        Document.objects.filter(id=document_id).update(
+            verification_status='pending',
+            verification_progress=0
+        )
+        async_result = task.delay(str(document_id))
+        Document.objects.filter(id=document_id).update(verification_task_id=async_result.id)
+
+        return {
+            'success': True,
+            'document_id': document_id,
+            'task_id': async_result.id,
+            'verification_status': Document.objects.values_list(
+                'verification_status', flat=True
+            ).get(id=document_id)
+        }
+
+    @staticmethod
+    def process_new_document(document_id, progress_callback=None):
         """
         Process a newly uploaded document through the workflow:
         1. Run verification
         2. Send notifications based on results
         3. Update application status if needed
+
+        progress_callback, if given, is called as (percent, stage) between steps.
         """
+        def report(progress, stage):
+            if progress_callback:
+                progress_callback(progress, stage)
+
         try:
             # Step 1: Run verification
+            report(10, 'verifying')
             verification_result = DocumentVerificationService.process_document(document_id)
 
             if not verification_result['success']:
@@ -34,6 +69,7 @@ class DocumentWorkflowService:
             document = Document.objects.get(id=document_id)
 
             # Step 2: Send notifications based on verification status
+            report(80, 'notifying')
             if document.verification_status == 'verified':
                 NotificationService.send_document_verified_notification(document)
             elif document.verification_status == 'fraud':
@@ -42,6 +78,7 @@ class DocumentWorkflowService:
             # Step 3: Update application status if all documents are verified
             # This would typically call ApplicationService to check if all required docs are present
             # and update the application status accordingly
+            report(100, 'complete')
 
             return {
                 'success': True,
@@ -65,7 +102,7 @@ class DocumentWorkflowService:
         """
         Handle the resubmission of a document:
         1. Mark old document as superseded
-        2. Process new document
+        2. Queue new document for verification
         3. Link them together for tracking
         """
         try:
@@ -82,8 +119,8 @@ class DocumentWorkflowService:
             }
             old_document.save()
 
-            # Process new document
-            return DocumentWorkflowService.process_new_document(new_document_id)
+            # Queue new document for verification
+            return DocumentWorkflowService.queue_verification(new_document_id)
 
         except Document.DoesNotExist:
             return {
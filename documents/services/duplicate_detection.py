@@ -0,0 +1,118 @@
+import threading
+from django.conf import settings
+from ..models import Document
+from ..utils.perceptual_hash import BKTree, hamming, hash_document
+from .change_log import ChangeLog
+
+
+class DuplicateDetectionService:
+    """
+    Service for finding uploads that are the same picture as an earlier
+    document, even after re-encoding, rescaling or small edits.
+    """
+
+    # Bits (of 64) two pHashes may differ by and still be near-duplicates
+    DEFAULT_MAX_DISTANCE = 6
+
+    VERSION_KEY = 'documents:phash_index:version'
+    changes = ChangeLog(VERSION_KEY)
+
+    _index = None
+    _index_version = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def max_distance():
+        return getattr(settings, 'DUPLICATE_HASH_DISTANCE', DuplicateDetectionService.DEFAULT_MAX_DISTANCE)
+
+    @staticmethod
+    def ensure_hashes(document):
+        """Hash a document that was not hashed at upload, e.g. a PDF"""
+        if document.phash:
+            return True
+        hashes = hash_document(document.file.path)
+        if hashes is None:
+            return False
+        document.phash, document.dhash = hashes['phash'], hashes['dhash']
+        document.save(update_fields=['phash', 'dhash'])
+        return True
+
+    @staticmethod
+    def get_index():
+        """
+        The process-wide BK-tree of document pHashes, built on first use.
+        Hashes added or removed by any process reach it through the shared
+        change log, so it is only rebuilt when that log has lost entries.
+        """
+        current = DuplicateDetectionService.changes.version()
+        with DuplicateDetectionService._lock:
+            index = DuplicateDetectionService._index
+            changes = None
+            if index is not None:
+                changes = DuplicateDetectionService.changes.changes_since(
+                    DuplicateDetectionService._index_version, current
+                )
+            if changes is None:
+                index = BKTree()
+                rows = Document.objects.exclude(phash='').values_list('id', 'phash')
+                for document_id, phash in rows.iterator(chunk_size=2000):
+                    index.add(document_id, phash)
+                DuplicateDetectionService._index = index
+            else:
+                for document_id, phash in changes:
+                    if phash:
+                        index.add(document_id, phash)
+                    else:
+                        index.remove(document_id)
+            DuplicateDetectionService._index_version = current
+            return index
+
+    @staticmethod
+    def document_changed(document_id, phash=None, deleted=False):
+        """Share a hashed or deleted document with every process's index"""
+        DuplicateDetectionService.changes.publish((document_id, None if deleted else phash))
+
+    @staticmethod
+    def reset_index():
+        with DuplicateDetectionService._lock:
+            DuplicateDetectionService._index = None
+            DuplicateDetectionService._index_version = None
+
+    @staticmethod
+    def find_near_duplicates(document, max_distance=None, limit=20):
+        """
+        Other documents whose pHash is within max_distance bits of this
+        one, nearest first, flagged when they belong to another application.
+        """
+        if not document.phash:
+            return []
+        max_distance = DuplicateDetectionService.max_distance() if max_distance is None else max_distance
+        index = DuplicateDetectionService.get_index()
+        hits = [
+            (document_id, distance)
+            for document_id, distance in index.search(document.phash, max_distance)
+            if document_id != document.id
+        ][:limit]
+        if not hits:
+            return []
+
+        others = Document.objects.filter(
+            id__in=[document_id for document_id, _ in hits]
+        ).select_related('application').in_bulk()
+        duplicates = []
+        for document_id, distance in hits:
+            other = others.get(document_id)
+            if other is None:
+                continue
+            duplicates.append({
+                'document_id': str(other.id),
+                'application_id': str(other.application_id),
+                'application_number': other.application.application_number,
+                'document_type': other.document_type,
+                'filename': other.original_filename,
+                'uploaded_at': other.uploaded_at.isoformat(),
+                'distance': distance,
+                'dhash_distance': hamming(document.dhash, other.dhash) if document.dhash and other.dhash else None,
+                'other_application': other.application_id != document.application_id,
+            })
+        return duplicates
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+from django.conf import settings
+from django.urls import reverse
+from PIL import Image, ImageOps
+from ..utils.pdf_pages import render_pdf_page
+
+
+class RenditionService:
+    """
+    Service for small JPEG renditions of uploaded documents, so reviewers
+    do not download full-resolution scans just to look at them.
+    Renditions of the first page are stored next to the original under
+    MEDIA_ROOT and generated on first request.
+    """
+
+    # Longest edge in pixels, JPEG quality and the DPI PDFs are rendered at
+    RENDITIONS = {
+        'thumbnail': {'size': 320, 'quality': 70, 'dpi': 40},
+        'preview': {'size': 1600, 'quality': 80, 'dpi': 150},
+    }
+
+    DIRECTORY = 'renditions'
+
+    @staticmethod
+    def rendition_name(name, rendition):
+        """Storage name of a rendition, e.g. dir/renditions/scan.pdf.preview.jpg"""
+        directory, filename = posixpath.split(name)
+        return posixpath.join(directory, RenditionService.DIRECTORY, f'{filename}.{rendition}.jpg')
+
+    @staticmethod
+    def version(field_file):
+        """Changes whenever the original is replaced, so URLs can be cached forever"""
+        return hashlib.sha1(field_file.name.encode()).hexdigest()[:12]
+
+    @staticmethod
+    def urls(url_name, object_id, field_file):
+        """Rendition URLs for a file served by the given view"""
+        return {
+            f'{rendition}_url': (
+                f"{reverse(url_name, args=[object_id, rendition])}?v={RenditionService.version(field_file)}"
+            )
+            for rendition in RenditionService.RENDITIONS
+        }
+
+    @staticmethod
+    def get(field_file, rendition):
+        """
+        Path of the rendition of a stored file, generating it if it is
+        missing or older than the original.
+        """
+        source = field_file.path
+        target = os.path.join(
+            settings.MEDIA_ROOT, RenditionService.rendition_name(field_file.name, rendition)
+        )
+        try:
+            if os.path.getmtime(target) >= os.path.getmtime(source):
+                return target
+        except OSError:
+            pass
+
+        RenditionService.generate(source, target, rendition)
+        return target
+
+    @staticmethod
+    def generate(source, target, rendition):
+        options = RenditionService.RENDITIONS[rendition]
+        size = (options['size'], options['size'])
+
+        if source.lower().endswith('.pdf'):
+            image = render_pdf_page(source, 1, options['dpi'])
+        else:
+            image = Image.open(source)
+            # JPEGs decode straight to a smaller scale
+            image.draft('RGB', size)
+            image = ImageOps.exif_transpose(image)
+        image.thumbnail(size)
+
+        # Write then rename, so concurrent requests never serve a partial file
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.jpg')
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                image.convert('RGB').save(output, format='JPEG', quality=options['quality'], optimize=True)
+            os.replace(temp_path, target)
+        except Exception:
+            os.unlink(temp_path)
+            raise
@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from ..models import VerificationResult
+
+
+class VerificationCache:
+    """
+    Reuse of verification results for byte-identical uploads.
+    Results are keyed by the document's content hash, its type, the
+    version of the analyzer that produced them and whatever else the
+    analyzer reads from the document, so bumping an analyzer version
+    invalidates everything it stored before.
+
+    Hit and miss counts are incremented in the shared cache, so the stats
+    cover lookups made by every web and worker process without a database
+    write per lookup.
+    """
+
+    HITS_KEY = 'documents:verification_cache:hits'
+    MISSES_KEY = 'documents:verification_cache:misses'
+
+    @staticmethod
+    def lookup(document, analyzer_version, inputs=None):
+        """
+        Return an earlier VerificationResult for the same bytes, or None.
+        inputs(document) gives the values besides the bytes the analyzer
+        depends on, e.g. the filename; only a document giving the same
+        values can supply the result.
+        """
+        result = None
+        if document.content_hash:
+            candidates = VerificationResult.objects.filter(
+                document__content_hash=document.content_hash,
+                document__document_type=document.document_type,
+                analyzer_version=analyzer_version
+            ).exclude(
+                document=document
+            ).select_related('document').order_by('-processed_at')
+            if inputs is None:
+                result = candidates.first()
+            else:
+                expected = inputs(document)
+                result = next(
+                    (candidate for candidate in candidates.iterator() if inputs(candidate.document) == expected),
+                    None
+                )
+
+        VerificationCache._count(VerificationCache.HITS_KEY if result else VerificationCache.MISSES_KEY)
+        return result
+
+    @staticmethod
+    def _count(key):
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Evicted between add and incr
+                cache.add(key, 1, timeout=None)
+
+    @staticmethod
+    def stats():
+        counts = cache.get_many([VerificationCache.HITS_KEY, VerificationCache.MISSES_KEY])
+        hits = counts.get(VerificationCache.HITS_KEY, 0)
+        misses = counts.get(VerificationCache.MISSES_KEY, 0)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def reset_stats():
+        cache.delete_many([VerificationCache.HITS_KEY, VerificationCache.MISSES_KEY])
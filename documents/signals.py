@@ -0,0 +1,56 @@
+# documents/signals.py
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from applications.models import BusinessApplication
+from .models import Document
+from .services.cross_validation import CrossValidationService
+from .services.duplicate_detection import DuplicateDetectionService
+
+INDEXED_FIELDS = {'business_name', 'registration_number'}
+HASH_FIELDS = {'phash', 'dhash'}
+
+
+def indexed_values(application):
+    # Read from __dict__ so a deferred field is not loaded just to compare it
+    return tuple(application.__dict__.get(field) for field in sorted(INDEXED_FIELDS))
+
+
+@receiver(post_init, sender=BusinessApplication)
+def remember_indexed_values(sender, instance, **kwargs):
+    instance._indexed_values = indexed_values(instance)
+
+
+@receiver(post_save, sender=BusinessApplication)
+def index_application(sender, instance, created=False, update_fields=None, **kwargs):
+    """Keep the business name and registration index current"""
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    # Status changes and other edits save every column; only a changed name
+    # or registration number is shared with the other processes' indexes
+    values = indexed_values(instance)
+    if not created and values == instance._indexed_values:
+        return
+    instance._indexed_values = values
+    CrossValidationService.application_changed(
+        instance.id, instance.business_name, instance.registration_number
+    )
+
+
+@receiver(post_delete, sender=BusinessApplication)
+def unindex_application(sender, instance, **kwargs):
+    CrossValidationService.application_changed(instance.id, deleted=True)
+
+
+@receiver(post_save, sender=Document)
+def index_document(sender, instance, created=False, update_fields=None, **kwargs):
+    """Add newly hashed documents to the near-duplicate index"""
+    # Hashes are only set on upload or by DuplicateDetectionService.ensure_hashes
+    hashed = created or (update_fields is not None and HASH_FIELDS.intersection(update_fields))
+    if hashed and instance.phash:
+        DuplicateDetectionService.document_changed(instance.id, instance.phash)
+
+
+@receiver(post_delete, sender=Document)
+def unindex_document(sender, instance, **kwargs):
+    if instance.phash:
+        DuplicateDetectionService.document_changed(instance.id, deleted=True)
@@ -0,0 +1,141 @@
+# documents/storage.py
+import hashlib
+import os
+import tempfile
+import uuid
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Extended attribute holding a blob's SHA-256; it lives on the inode, so
+# every name linked to the blob carries it
+HASH_ATTRIBUTE = 'user.content_hash'
+
+
+def hash_path(path):
+    """SHA-256 of a file on disk, read chunk by chunk"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that keeps each distinct file once.
+
+    The bytes live in a blob named by their SHA-256 under BLOB_DIRECTORY;
+    every saved name is a hard link to its blob. Names, paths and URLs
+    behave exactly as with FileSystemStorage, so existing FieldFiles keep
+    working, but identical uploads share one copy on disk. The file
+    system's link count is the reference count: a blob is removed when
+    the last name pointing at it is deleted. Blobs record their hash in an
+    extended attribute, so a delete finds the blob without reading the file.
+    """
+
+    BLOB_DIRECTORY = '.blobs'
+
+    def blob_name(self, digest):
+        return f'{self.BLOB_DIRECTORY}/{digest[:2]}/{digest[2:4]}/{digest}'
+
+    def blob_path(self, digest):
+        return self.path(self.blob_name(digest))
+
+    def refcount(self, name):
+        """Number of names sharing this name's bytes"""
+        return os.stat(self.path(name)).st_nlink - 1
+
+    @staticmethod
+    def record_hash(path, digest):
+        """Store a blob's hash on its inode, where the file system supports it"""
+        try:
+            os.setxattr(path, HASH_ATTRIBUTE, digest.encode())
+        except (AttributeError, OSError):
+            pass
+
+    @staticmethod
+    def stored_hash(path):
+        """The hash recorded on a blob-backed file, or its SHA-256 read from disk"""
+        try:
+            return os.getxattr(path, HASH_ATTRIBUTE).decode()
+        except (AttributeError, OSError):
+            # No extended attributes here, or a blob stored before they were recorded
+            return hash_path(path)
+
+    def _save(self, name, content):
+        # Uploads streamed through SniffingUploadHandler arrive already hashed
+        digest = getattr(content, 'content_hash', None)
+        if not (digest and os.path.exists(self.blob_path(digest))):
+            digest = self._store_blob(content, digest)
+
+        blob = self.blob_path(digest)
+        while True:
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                os.link(blob, full_path)
+                break
+            except FileExistsError:
+                # A file with this name was created since get_available_name
+                name = self.get_available_name(name)
+            except FileNotFoundError:
+                # The last other name was deleted along with the blob; write it again
+                # from the content, whose temporary file may already have been moved
+                self._store_blob(content)
+        return str(name).replace('\\', '/')
+
+    def _store_blob(self, content, digest=None):
+        """Write content into its blob, unless an identical blob exists; return its digest"""
+        blob_root = self.path(self.BLOB_DIRECTORY)
+        os.makedirs(blob_root, exist_ok=True)
+
+        if digest and hasattr(content, 'temporary_file_path'):
+            # Move the upload's temporary file into place instead of copying it
+            temp_path = os.path.join(blob_root, f'{uuid.uuid4().hex}.tmp')
+            file_move_safe(content.temporary_file_path(), temp_path)
+        else:
+            hasher = hashlib.sha256()
+            fd, temp_path = tempfile.mkstemp(dir=blob_root, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    temp.write(chunk)
+            digest = hasher.hexdigest()
+        self.record_hash(temp_path, digest)
+
+        blob = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        try:
+            # link, unlike rename, never replaces a blob stored concurrently
+            os.link(temp_path, blob)
+            if self.file_permissions_mode is not None:
+                os.chmod(blob, self.file_permissions_mode)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(temp_path)
+        return digest
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        path = self.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        if stat.st_nlink != 2 or os.path.isdir(path):
+            # Still shared, or not blob-backed (e.g. from before deduplication)
+            super().delete(name)
+            return
+
+        blob = self.blob_path(self.stored_hash(path))
+        super().delete(name)
+        try:
+            if os.stat(blob).st_nlink == 1:
+                os.remove(blob)
+        except FileNotFoundError:
+            pass
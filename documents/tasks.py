@@ -0,0 +1,59 @@
+# documents/tasks.py
+from celery import shared_task
+from django.urls import reverse
+from .models import Document
+from .services.document_workflow import DocumentWorkflowService
+from .services.document_verification import DocumentVerificationService
+from notifications.utils import create_notification
+
+
+def _progress_reporter(task, document_id):
+    """Build a callback that records verification progress on the document"""
+    def report(progress, stage):
+        Document.objects.filter(id=document_id).update(verification_progress=progress)
+        if not task.request.is_eager:
+            task.update_state(state='PROGRESS', meta={'progress': progress, 'stage': stage})
+    return report
+
+
+def _serializable(result):
+    """Task results go through the JSON serializer"""
+    if result.get('document_id') is not None:
+        result['document_id'] = str(result['document_id'])
+    return result
+
+
+@shared_task(bind=True)
+def verify_document(self, document_id):
+    """
+    Run the verification workflow for an uploaded document off the request path
+    """
+    result = DocumentWorkflowService.process_new_document(
+        document_id,
+        progress_callback=_progress_reporter(self, document_id)
+    )
+    return _serializable(result)
+
+
+@shared_task(bind=True)
+def validate_requirement_document(self, document_id):
+    """
+    Run the image forensics checks for a requirement upload off the request path
+    """
+    report = _progress_reporter(self, document_id)
+    report(10, 'validating')
+
+    result = DocumentVerificationService.validate_document_image(document_id)
+    report(100, 'complete')
+
+    if result['success'] and result['verification_status'] == 'fraud':
+        document = Document.objects.select_related('user', 'application').get(id=document_id)
+        create_notification(
+            user=document.user,
+            title="Document Requires Review",
+            message=f"Your document '{document.original_filename}' has been flagged for review. This may delay your application processing.",
+            notification_type='warning',
+            link=reverse('applications:application_detail', kwargs={'application_id': document.application.id})
+        )
+
+    return _serializable(result)
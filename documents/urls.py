@@ -16,6 +16,17 @@ urlpatterns = [
     # Document detail
     path('detail/<int:document_id>/', views.document_detail, name='document_detail'),
 
+    # Verification progress and result (JSON)
+    path('status/<uuid:document_id>/', views.verification_status, name='verification_status'),
+
+    # First-page thumbnails and previews
+    path('rendition/<uuid:document_id>/<str:rendition>/', views.document_rendition, name='document_rendition'),
+    path('requirement-rendition/<int:requirement_id>/<str:rendition>/', views.requirement_rendition,
+         name='requirement_rendition'),
+
+    # Verification cache counters (staff only)
+    path('cache-stats/', views.verification_cache_stats, name='verification_cache_stats'),
+
     # Manual verification (admin only)
     path('review/<int:document_id>/', views.manual_verification, name='manual_verification'),
 
@@ -0,0 +1,162 @@
+# documents/utils/copy_move.py
+import time
+
+import cv2
+import numpy as np
+
+# Strongest keypoints kept per page; bounds both SIFT output and matching cost
+DEFAULT_MAX_KEYPOINTS = 2000
+
+# Seconds allowed for keypoint detection before matching is skipped
+DEFAULT_TIME_BUDGET = 2.0
+
+# Longest side (pixels) a page is shrunk to before detection; SIFT cost grows
+# with pixel count, not with the number of keypoints it keeps
+MAX_DETECTION_SIDE = 1024
+
+# Lowe's ratio between the best and second-best non-self neighbour
+MATCH_RATIO = 0.6
+
+# Matches closer than this (pixels) are the same structure, not a copy
+MIN_SHIFT = 20
+
+# Displacements are grouped into bins of this many pixels
+SHIFT_BIN = 8
+
+# Matches sharing one displacement needed to report a copied region
+MIN_CLUSTER_MATCHES = 4
+
+# A cluster is only reported as a copied region when it has this many
+# matches, spans at least this many pixels both ways, and its matches
+# cover this share of the keypoints inside it. Repeated printed text
+# forms thin strips or sparse clusters spanning unrelated lines.
+MIN_REGION_MATCHES = 8
+MIN_REGION_SIDE = 32
+MIN_REGION_COVERAGE = 0.5
+
+# Padding around the keypoints of a region, in pixels
+REGION_PADDING = 8
+
+FLANN_INDEX_KDTREE = 1
+
+
+def create_matcher():
+    """Approximate nearest-neighbour matcher over a randomised KD-tree forest"""
+    return cv2.FlannBasedMatcher(
+        {'algorithm': FLANN_INDEX_KDTREE, 'trees': 4},
+        {'checks': 32}
+    )
+
+
+def match_self(descriptors, points):
+    """
+    Match every descriptor against the rest of the page.
+    Returns (source, target) point arrays of matches passing the ratio
+    test that are far enough apart to be a copy.
+    """
+    matches = create_matcher().knnMatch(descriptors, descriptors, k=3)
+
+    sources, targets = [], []
+    for query, neighbours in enumerate(matches):
+        # The first neighbour is normally the descriptor itself
+        others = [match for match in neighbours if match.trainIdx != query]
+        if len(others) < 2 or others[0].distance >= MATCH_RATIO * others[1].distance:
+            continue
+        sources.append(points[query])
+        targets.append(points[others[0].trainIdx])
+
+    sources = np.array(sources, dtype=np.float32).reshape(-1, 2)
+    targets = np.array(targets, dtype=np.float32).reshape(-1, 2)
+    far = np.linalg.norm(targets - sources, axis=1) > MIN_SHIFT
+    return sources[far], targets[far]
+
+
+def cluster_by_shift(sources, targets):
+    """
+    Group matches by their displacement. A copied region moves all of its
+    keypoints by the same offset, so real copies form dense clusters.
+    Yields (sources, targets) for each cluster large enough to report.
+    """
+    shifts = targets - sources
+    # Orient each pair so A->B and B->A fall in the same bin
+    flip = (shifts[:, 0] < 0) | ((shifts[:, 0] == 0) & (shifts[:, 1] < 0))
+    sources[flip], targets[flip] = targets[flip], sources[flip].copy()
+    bins = np.round((targets - sources) / SHIFT_BIN).astype(np.int64)
+
+    unique_bins, labels, counts = np.unique(bins, axis=0, return_inverse=True, return_counts=True)
+    labels = labels.reshape(-1)
+    for label in np.flatnonzero(counts >= MIN_CLUSTER_MATCHES):
+        members = labels == label
+        yield sources[members], targets[members]
+
+
+def downscale(gray, max_side=MAX_DETECTION_SIDE):
+    """Shrink a page so its longest side is at most max_side pixels"""
+    scale = max_side / max(gray.shape[:2])
+    if scale >= 1:
+        return gray
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def is_copied_region(sources, points):
+    """
+    Whether a cluster of matches looks like a pasted region rather than
+    repeated printed text: enough matches, a block rather than a strip,
+    and dense among the page's keypoints inside its bounding box.
+    """
+    sources = np.unique(np.round(sources), axis=0)
+    if len(sources) < MIN_REGION_MATCHES:
+        return False
+    low, high = sources.min(axis=0), sources.max(axis=0)
+    if np.any(high - low < MIN_REGION_SIDE):
+        return False
+    inside = np.unique(np.round(points[np.all((points >= low) & (points <= high), axis=1)]), axis=0)
+    return len(sources) >= MIN_REGION_COVERAGE * len(inside)
+
+
+def points_to_area(points, image_shape, confidence):
+    """Bounding box of keypoints in percent of the page"""
+    height, width = image_shape[:2]
+    left, top = np.maximum(points.min(axis=0) - REGION_PADDING, 0)
+    right, bottom = np.minimum(points.max(axis=0) + REGION_PADDING, (width, height))
+    return {
+        'x': round(float(left) * 100 / width, 1),
+        'y': round(float(top) * 100 / height, 1),
+        'width': round(float(right - left) * 100 / width, 1),
+        'height': round(float(bottom - top) * 100 / height, 1),
+        'confidence': confidence,
+        'indicator': 'copy_move',
+    }
+
+
+def detect_copy_move(gray, max_keypoints=DEFAULT_MAX_KEYPOINTS, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Find regions of a page that were copied onto another part of it.
+    Returns a summary with the matched regions as fraud areas; both the
+    source and the pasted copy of each region are reported. Clusters that
+    fail the region thresholds are only counted in 'rejected'.
+    """
+    started = time.perf_counter()
+    result = {'keypoints': 0, 'matches': 0, 'rejected': 0, 'timed_out': False, 'areas': []}
+
+    gray = downscale(gray)
+    sift = cv2.SIFT_create(nfeatures=max_keypoints)
+    keypoints, descriptors = sift.detectAndCompute(gray, None)
+    result['keypoints'] = len(keypoints)
+
+    if time.perf_counter() - started > time_budget:
+        result['timed_out'] = True
+    elif descriptors is not None and len(keypoints) >= 3:
+        points = np.array([keypoint.pt for keypoint in keypoints], dtype=np.float32)
+        sources, targets = match_self(descriptors, points)
+        for cluster_sources, cluster_targets in cluster_by_shift(sources, targets):
+            if not is_copied_region(cluster_sources, points):
+                result['rejected'] += 1
+                continue
+            result['matches'] += len(cluster_sources)
+            confidence = round(min(0.99, 1 - 1 / len(cluster_sources)), 2)
+            result['areas'].append(points_to_area(cluster_sources, gray.shape, confidence))
+            result['areas'].append(points_to_area(cluster_targets, gray.shape, confidence))
+
+    result['elapsed'] = round(time.perf_counter() - started, 3)
+    return result
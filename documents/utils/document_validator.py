@@ -1,14 +1,32 @@
 # documents/utils/document_validator.py
 import cv2
+import mmap
 import numpy as np
 from PIL import Image
 import io
+from .pdf_pages import iter_pdf_pages, DEFAULT_DPI, DEFAULT_PAGE_MEMORY_BUDGET
+from .tile_forensics import locate_fraud_areas, DEFAULT_TILE_SIZE
+from .copy_move import detect_copy_move, DEFAULT_MAX_KEYPOINTS, DEFAULT_TIME_BUDGET
+
+
+# Longest side of the pyramid level used for screening
+DEFAULT_SCREENING_SIZE = 1024
+
+# Relative distance from a threshold at which screening scores are not trusted
+DEFAULT_ESCALATION_MARGIN = 0.25
 
 
 class DocumentValidator:
     """Document validation and fraud detection system"""
 
-    def __init__(self):
+    # Checks measured on full-resolution pixels even when screening: blur a
+    # few pixels wide vanishes after pyrDown, so these scores cannot be
+    # estimated from a pyramid level, by any threshold scale
+    FULL_RESOLUTION_CHECKS = ('noise_score', 'text_quality', 'resolution_score')
+
+    def __init__(self, multi_resolution=True, screening_size=DEFAULT_SCREENING_SIZE,
+                 escalation_margin=DEFAULT_ESCALATION_MARGIN, tile_size=DEFAULT_TILE_SIZE,
+                 copy_move_keypoints=DEFAULT_MAX_KEYPOINTS, copy_move_budget=DEFAULT_TIME_BUDGET):
         # Validation thresholds based on our tests
         self.thresholds = {
             'ela_score': {'min': 0, 'max': 100},
@@ -16,6 +34,12 @@ class DocumentValidator:
             'text_quality': {'min': 50},
             'resolution_score': {'min': 50}
         }
+        self.multi_resolution = multi_resolution
+        self.screening_size = screening_size
+        self.escalation_margin = escalation_margin
+        self.tile_size = tile_size
+        self.copy_move_keypoints = copy_move_keypoints
+        self.copy_move_budget = copy_move_budget
 
     def validate_document(self, file_bytes):
         """
@@ -27,7 +51,7 @@ class DocumentValidator:
             image_np = self._bytes_to_np_array(file_bytes)
 
             # Run all checks
-            results = self._run_validations(image_np)
+            results, _, _ = self._score_image(image_np)
 
             # Check if all validations pass
             is_valid = self._check_thresholds(results)
@@ -39,47 +63,310 @@ class DocumentValidator:
         except Exception as e:
             return False, None, f"Validation error: {str(e)}"
 
+    def analyze(self, file_bytes):
+        """
+        Validate a document and bundle the outcome for storage.
+        scores is None when the file could not be analysed.
+        """
+        try:
+            image_np = self._bytes_to_np_array(file_bytes)
+        except Exception as e:
+            return self._failed_analysis(e)
+        return self._analyze_image(image_np)
+
+    def analyze_file(self, file_path):
+        """
+        Validate an image stored on disk.
+        The file is memory-mapped and decoded straight into the array the
+        checks run on, so the encoded bytes are never copied into memory.
+        """
+        try:
+            image_np = self._load_image(file_path)
+        except (OSError, ValueError) as e:
+            return self._failed_analysis(e)
+        return self._analyze_image(image_np)
+
+    def _failed_analysis(self, error):
+        return {
+            'is_valid': False,
+            'scores': None,
+            'message': f"Validation error: {str(error)}",
+            'quarantine_reason': None,
+        }
+
+    def _analyze_image(self, image_np):
+        try:
+            results, analysis_path, localisation = self._score_image(image_np)
+        except Exception as e:
+            return self._failed_analysis(e)
+
+        return {
+            'is_valid': self._check_thresholds(results),
+            'scores': results,
+            'message': self._generate_validation_message(results),
+            'quarantine_reason': self.determine_quarantine_reason(results),
+            'analysis_path': analysis_path,
+            'fraud_areas': localisation['areas'],
+            'heatmaps': [localisation['heatmap']],
+            'copy_move': [localisation['copy_move']],
+        }
+
+    def analyze_pdf(self, pdf_path, dpi=DEFAULT_DPI, memory_budget=DEFAULT_PAGE_MEMORY_BUDGET):
+        """
+        Validate a PDF page by page, keeping one page raster in memory at a time.
+        The document scores are the worst page score for each check.
+        """
+        memory_report = {}
+        page_results = []
+        page_paths = []
+        fraud_areas = []
+        heatmaps = []
+        copy_move = []
+        try:
+            for page_number, page in iter_pdf_pages(pdf_path, dpi, memory_budget, report=memory_report):
+                results, analysis_path, localisation = self._score_image(np.array(page))
+                page_results.append(results)
+                page_paths.append(analysis_path)
+                heatmaps.append(localisation['heatmap'])
+                copy_move.append(localisation['copy_move'])
+                fraud_areas.extend(dict(area, page=page_number) for area in localisation['areas'])
+        except Exception as e:
+            return dict(self._failed_analysis(e), memory=memory_report)
+
+        results = self._combine_page_results(page_results)
+        return {
+            'is_valid': self._check_thresholds(results),
+            'scores': results,
+            'message': self._generate_validation_message(results),
+            'quarantine_reason': self.determine_quarantine_reason(results),
+            'pages': page_results,
+            'memory': memory_report,
+            'analysis_path': self._combine_analysis_paths(page_paths),
+            'fraud_areas': fraud_areas,
+            'heatmaps': heatmaps,
+            'copy_move': copy_move,
+        }
+
+    def _combine_analysis_paths(self, page_paths):
+        """Summarise which resolution each page was decided at"""
+        escalated_pages = [
+            number for number, path in enumerate(page_paths, start=1) if path['escalated']
+        ]
+        return {
+            'mode': page_paths[0]['mode'] if page_paths else 'full_resolution',
+            'escalated': bool(escalated_pages),
+            'escalated_pages': escalated_pages,
+            'pages': page_paths,
+        }
+
+    def _combine_page_results(self, page_results):
+        """Take the worst page for every check so one bad page fails the document"""
+        return {
+            'ela_score': max(page['ela_score'] for page in page_results),
+            'noise_score': max(page['noise_score'] for page in page_results),
+            'text_quality': min(page['text_quality'] for page in page_results),
+            'resolution_score': min(page['resolution_score'] for page in page_results),
+        }
+
     def _bytes_to_np_array(self, file_bytes):
         """Convert file bytes to numpy array"""
         image = Image.open(io.BytesIO(file_bytes))
         return np.array(image)
 
+    def _load_image(self, file_path):
+        """Decode an image file into a numpy array through a read-only memory map"""
+        with open(file_path, 'rb') as image_file, \
+                mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            encoded = np.frombuffer(mapped, dtype=np.uint8)
+            try:
+                image_np = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+            finally:
+                # The map cannot be closed while an array still exports it
+                del encoded
+
+        if image_np is None:
+            raise ValueError(f"Cannot decode image {file_path}")
+
+        # imdecode gives BGR; convert in place to the RGB order PIL produces
+        return cv2.cvtColor(image_np, cv2.COLOR_BGR2RGB, dst=image_np)
+
+    def _extract_features(self, image_np):
+        """
+        Compute the intermediate images shared by the checks.
+        Each derived image is computed once per document so the checks
+        only read from this context instead of redoing the work.
+        """
+        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
+        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+
+        return {
+            'image': image_np,
+            'gray': gray,
+            'laplacian_var': laplacian.var(),
+            'sobel_magnitude': np.sqrt(sobelx ** 2 + sobely ** 2),
+        }
+
+    def _screening_level(self, image_np):
+        """
+        Halve the image with a Gaussian pyramid until its longest side
+        fits the screening size. Returns the level image and its scale.
+        """
+        level = image_np
+        scale = 1.0
+        while max(level.shape[:2]) > self.screening_size:
+            level = cv2.pyrDown(level)
+            scale /= 2
+        return level, scale
+
+    def _needs_escalation(self, results):
+        """
+        Screened checks whose score fails a threshold or is within the
+        escalation margin of passing it; only full resolution decides those
+        """
+        flagged = []
+        for check, limits in self.thresholds.items():
+            if check in self.FULL_RESOLUTION_CHECKS:
+                continue
+            low, high = limits.get('min'), limits.get('max')
+            # A zero bound cannot be approached by a relative margin
+            if (low and results[check] < low * (1 + self.escalation_margin)) or \
+                    (high and results[check] >= high * (1 - self.escalation_margin)):
+                flagged.append(check)
+        return flagged
+
+    def _full_resolution_scores(self, features):
+        """The scale-dependent checks, from the features of the full image"""
+        return {
+            'noise_score': self._check_noise(features),
+            'text_quality': self._check_text_quality(features),
+            'resolution_score': self._check_resolution(features),
+        }
+
+    def _score_image(self, image_np):
+        """
+        Score an image and localise suspicious regions on it.
+        Returns (results, analysis_path, localisation); the tile outliers and
+        any copy-moved regions are merged into localisation['areas'].
+        """
+        results, analysis_path, localisation = self._score_levels(image_np)
+        copy_move = self._check_copy_move(image_np)
+        localisation['areas'] = localisation['areas'] + copy_move.pop('areas')
+        localisation['copy_move'] = copy_move
+        return results, analysis_path, localisation
+
+    def _check_copy_move(self, image_np):
+        """
+        Look for regions duplicated within the page.
+        Runs on the screening level so large scans stay within the time
+        budget. Only clusters passing the region thresholds in copy_move
+        are reported, so repeated printed text is not highlighted; this
+        localises regions for reviewers and does not decide validity.
+        """
+        level, _ = self._screening_level(image_np)
+        gray = cv2.cvtColor(level, cv2.COLOR_BGR2GRAY)
+        return detect_copy_move(gray, self.copy_move_keypoints, self.copy_move_budget)
+
+    def _score_levels(self, image_np):
+        """
+        Score an image, screening on a downscaled pyramid level first.
+        The screening level only stands in for ELA and the tile heatmap;
+        the sharpness and noise checks are always taken at full resolution.
+        The whole image is analysed at full resolution when it is already
+        small, multi-resolution mode is off, or the screened ELA score fails
+        or lands near a threshold. Returns (results, analysis_path, localisation) where
+        analysis_path records which path decided the scores and
+        localisation holds the tile heatmap and fraud areas of that pass.
+        """
+        height, width = image_np.shape[:2]
+        analysis_path = {
+            'mode': 'multi_resolution' if self.multi_resolution else 'full_resolution',
+            'full_size': [width, height],
+            'escalated': False,
+        }
+
+        if not self.multi_resolution:
+            scores, localisation = self._analyse_level(image_np)
+            return scores, analysis_path, localisation
+
+        level, scale = self._screening_level(image_np)
+        analysis_path['screening_size'] = [level.shape[1], level.shape[0]]
+        analysis_path['screening_scale'] = scale
+        if scale == 1.0:
+            # Already small enough: screening is the full-resolution pass
+            analysis_path['decided_at'] = 'full_resolution'
+            scores, localisation = self._analyse_level(image_np)
+            return scores, analysis_path, localisation
+
+        # The scale-dependent checks always need the full-resolution features,
+        # so they are extracted once and reused if the page escalates
+        features = self._extract_features(image_np)
+        screening, localisation = self._analyse_level(level)
+        screening.update(self._full_resolution_scores(features))
+        near = self._needs_escalation(screening)
+        analysis_path['screening_scores'] = screening
+        analysis_path['near_threshold'] = near
+        if not near:
+            analysis_path['decided_at'] = 'screening'
+            return screening, analysis_path, localisation
+
+        # Escalation only adds the full-resolution ELA and tiles
+        analysis_path['escalated'] = True
+        analysis_path['decided_at'] = 'full_resolution'
+        scores = dict(screening, ela_score=self._check_ela(features))
+        return scores, analysis_path, self._localise(features)
+
+    def _analyse_level(self, image_np):
+        """Score one resolution level and localise suspicious tiles on it"""
+        features = self._extract_features(image_np)
+        scores = self._score_features(features)
+        return scores, self._localise(features)
+
+    def _localise(self, features):
+        """Tile heatmap and fraud areas from scored features"""
+        heatmap, areas = locate_fraud_areas(features['ela_map'], features['noise_map'], self.tile_size)
+        return {'heatmap': heatmap, 'areas': areas}
+
     def _run_validations(self, image_np):
         """Run all validation checks"""
+        return self._score_features(self._extract_features(image_np))
+
+    def _score_features(self, features):
+        """Run the checks on precomputed features"""
         return {
-            'ela_score': self._check_ela(image_np),
-            'noise_score': self._check_noise(image_np),
-            'text_quality': self._check_text_quality(image_np),
-            'resolution_score': self._check_resolution(image_np)
+            'ela_score': self._check_ela(features),
+            'noise_score': self._check_noise(features),
+            'text_quality': self._check_text_quality(features),
+            'resolution_score': self._check_resolution(features)
         }
 
-    def _check_ela(self, image_np):
+    def _check_ela(self, features):
         """Check Error Level Analysis"""
+        image_np = features['image']
         _, buffer = cv2.imencode('.jpg', image_np, [cv2.IMWRITE_JPEG_QUALITY, 90])
         temp_image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
         ela = cv2.absdiff(image_np, temp_image)
+        # Kept for the tile heatmap, which reuses the difference image
+        features['ela_map'] = ela
         return float(np.mean(ela))
 
-    def _check_noise(self, image_np):
+    def _check_noise(self, features):
         """Check noise patterns"""
-        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+        gray = features['gray']
         noise = cv2.subtract(gray, cv2.GaussianBlur(gray, (3, 3), 0))
+        features['noise_map'] = noise
         return float(np.std(noise))
 
-    def _check_text_quality(self, image_np):
+    def _check_text_quality(self, features):
         """Check text clarity"""
-        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
-        return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        return float(features['laplacian_var'])
 
-    def _check_resolution(self, image_np):
+    def _check_resolution(self, features):
         """Check image resolution quality"""
-        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
-
         # Combined resolution score
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        edge_intensity = np.sqrt(sobelx ** 2 + sobely ** 2).mean()
+        laplacian_var = features['laplacian_var']
+        edge_intensity = features['sobel_magnitude'].mean()
 
         return float((laplacian_var + edge_intensity) / 2)
 
@@ -128,4 +415,15 @@ class DocumentValidator:
             return 'low_quality'
         elif results['resolution_score'] < self.thresholds['resolution_score']['min']:
             return 'resolution'
-        return None
\ No newline at end of file
+        return None
+
+
+def analyze_document_file(file_path):
+    """
+    Analyze a stored document by path.
+    Module-level so it can be sent to worker processes.
+    """
+    if str(file_path).lower().endswith('.pdf'):
+        return DocumentValidator().analyze_pdf(file_path)
+
+    return DocumentValidator().analyze_file(file_path)
@@ -0,0 +1,207 @@
+# documents/utils/fraud_scoring.py
+import logging
+import os
+
+import numpy as np
+
+from .document_validator import DocumentValidator
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png')
+
+# Limits the image forensics features are measured against
+FORENSICS_THRESHOLDS = DocumentValidator().thresholds
+
+# Feature extractors by name. Each takes the scoring context and returns a float.
+FEATURE_EXTRACTORS = {}
+
+
+def register_feature(name):
+    """Decorator adding a feature extractor to the registry"""
+    def decorator(extractor):
+        FEATURE_EXTRACTORS[name] = extractor
+        return extractor
+    return decorator
+
+
+@register_feature('format_match')
+def format_match(context):
+    return float(context['classification']['document_type'] == context['document_type'])
+
+
+@register_feature('has_date')
+def has_date(context):
+    return float('date' in context['classification']['extracted_fields'])
+
+
+@register_feature('has_registration_number')
+def has_registration_number(context):
+    return float('registration_number' in context['classification']['extracted_fields'])
+
+
+@register_feature('allowed_extension')
+def allowed_extension(context):
+    return float(context['filename'].lower().endswith(ALLOWED_EXTENSIONS))
+
+
+@register_feature('empty_file')
+def empty_file(context):
+    try:
+        return float(os.path.getsize(context['file_path']) == 0)
+    except OSError:
+        return 1.0
+
+
+def _image_scores(context):
+    """DocumentValidator scores of the file, or None if it could not be analysed"""
+    analysis = context.get('analysis')
+    return analysis['scores'] if analysis else None
+
+
+@register_feature('ela_excess')
+def ela_excess(context):
+    """Error level as a fraction of the validator's limit, capped at 2"""
+    scores = _image_scores(context)
+    if not scores:
+        return 0.0
+    return min(scores['ela_score'] / FORENSICS_THRESHOLDS['ela_score']['max'], 2.0)
+
+
+@register_feature('noise_excess')
+def noise_excess(context):
+    """Noise level as a fraction of the validator's limit, capped at 2"""
+    scores = _image_scores(context)
+    if not scores:
+        return 0.0
+    return min(scores['noise_score'] / FORENSICS_THRESHOLDS['noise_score']['max'], 2.0)
+
+
+@register_feature('blur')
+def blur(context):
+    """How far text sharpness falls short of the validator's minimum, 0 to 1"""
+    scores = _image_scores(context)
+    if not scores:
+        return 0.0
+    return max(0.0, 1 - scores['text_quality'] / FORENSICS_THRESHOLDS['text_quality']['min'])
+
+
+@register_feature('low_resolution')
+def low_resolution(context):
+    """How far the resolution score falls short of the validator's minimum, 0 to 1"""
+    scores = _image_scores(context)
+    if not scores:
+        return 0.0
+    return max(0.0, 1 - scores['resolution_score'] / FORENSICS_THRESHOLDS['resolution_score']['min'])
+
+
+class WeightedModel:
+    """
+    Logistic model over hand-set feature weights.
+    The default until a trained model is configured.
+    """
+
+    version = 'weighted-2'
+
+    WEIGHTS = {
+        'format_match': -4.0,
+        'has_date': -0.3,
+        'has_registration_number': -0.3,
+        'allowed_extension': -0.5,
+        'empty_file': 3.0,
+        # From the image itself, so they follow the bytes, not the name
+        'ela_excess': 3.0,
+        'noise_excess': 2.0,
+        'blur': 1.5,
+        'low_resolution': 1.0,
+    }
+    BIAS = 2.0
+
+    def __init__(self, weights=None, bias=None):
+        self.weights = weights or self.WEIGHTS
+        self.bias = self.BIAS if bias is None else bias
+        self.feature_names = list(self.weights)
+        self._coefficients = np.array([self.weights[name] for name in self.feature_names])
+
+    def predict_proba(self, features):
+        """Fraud probability for each row of an (n, features) matrix"""
+        return 1 / (1 + np.exp(-(features @ self._coefficients + self.bias)))
+
+
+class SklearnModel:
+    """
+    A trained scikit-learn classifier saved with joblib.
+    The estimator must expose predict_proba and feature_names_in_ (or be
+    saved next to the feature list as {'model': ..., 'features': [...]}).
+    """
+
+    def __init__(self, path):
+        import joblib
+        saved = joblib.load(path)
+        if isinstance(saved, dict):
+            self.estimator = saved['model']
+            self.feature_names = list(saved['features'])
+        else:
+            self.estimator = saved
+            self.feature_names = list(saved.feature_names_in_)
+        self.version = f"sklearn-{os.path.basename(path)}"
+
+    def predict_proba(self, features):
+        return self.estimator.predict_proba(features)[:, 1]
+
+
+def load_model(path=None):
+    """The configured trained model, or the weighted model if none is set or it fails to load"""
+    if path and os.path.exists(path):
+        try:
+            return SklearnModel(path)
+        except Exception as e:
+            logger.error(f"Could not load fraud model {path}: {str(e)}")
+    return WeightedModel()
+
+
+class FraudScoringEngine:
+    """
+    Scores documents from registered features with a loaded model.
+    The same inputs always give the same score. Features come from the
+    filename and from the DocumentValidator analysis of the content, passed
+    in the context as 'analysis'.
+    """
+
+    def __init__(self, model=None):
+        self.model = model or WeightedModel()
+        missing = [name for name in self.model.feature_names if name not in FEATURE_EXTRACTORS]
+        if missing:
+            raise ValueError(f"No feature extractor registered for: {', '.join(missing)}")
+
+    @property
+    def version(self):
+        return self.model.version
+
+    def extract_features(self, context):
+        """Feature vector for one document, in the model's feature order"""
+        return np.array(
+            [FEATURE_EXTRACTORS[name](context) for name in self.model.feature_names],
+            dtype=np.float64
+        )
+
+    def score_batch(self, features):
+        """Fraud probabilities for an (n, features) matrix in one vectorised call"""
+        return self.model.predict_proba(np.atleast_2d(np.asarray(features, dtype=np.float64)))
+
+    def score(self, context):
+        """Score one document"""
+        features = self.extract_features(context)
+        fraud_probability = float(self.score_batch(features)[0])
+        return {
+            'fraud_probability': round(fraud_probability, 4),
+            'confidence_score': round(1 - fraud_probability, 4),
+            'features': dict(zip(self.model.feature_names, features.tolist())),
+            'model_version': self.version,
+        }
+
+
+def get_scoring_engine():
+    """Scoring engine over the model shared by this process"""
+    from .model_registry import get_model
+    return FraudScoringEngine(get_model('fraud_model'))
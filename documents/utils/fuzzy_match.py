@@ -0,0 +1,111 @@
+# documents/utils/fuzzy_match.py
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+# Words that do not tell two businesses apart
+BUSINESS_NAME_NOISE = frozenset({
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd', 'limited', 'the', 'and',
+})
+
+
+def normalize(text, drop=frozenset()):
+    """
+    Lower-case, strip accents and punctuation and collapse whitespace.
+    Words in drop are removed, e.g. legal suffixes of business names.
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    return ' '.join(word for word in NON_ALPHANUMERIC.sub(' ', text).split() if word not in drop)
+
+
+def normalize_business_name(name):
+    return normalize(name, BUSINESS_NAME_NOISE)
+
+
+def normalize_registration_number(number):
+    """Registration numbers compare on their letters and digits only"""
+    return NON_ALPHANUMERIC.sub('', (number or '').casefold()).upper()
+
+
+def trigrams(normalized):
+    """Character trigrams of a normalised string, padded so short words count"""
+    padded = f'  {normalized} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def dice(a, b):
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def similarity(a, b):
+    """
+    Similarity of two normalised strings between 0 and 1.
+    The better of token-set and trigram overlap, so reordered words and
+    small spelling differences both score high.
+    """
+    if a == b:
+        return 1.0 if a else 0.0
+    return max(dice(frozenset(a.split()), frozenset(b.split())), dice(trigrams(a), trigrams(b)))
+
+
+class NGramIndex:
+    """
+    Inverted index from trigrams to entries.
+    Candidates are scored by counting shared trigrams over the posting
+    lists of the query's trigrams, so a lookup touches only entries that
+    share at least one trigram instead of scanning every entry. Reordered
+    words keep most of their trigrams, so they still score high.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._grams = {}
+        self._values = {}
+
+    def __len__(self):
+        return len(self._grams)
+
+    def __contains__(self, key):
+        return key in self._grams
+
+    def add(self, key, normalized):
+        self.remove(key)
+        grams = trigrams(normalized)
+        self._grams[key] = grams
+        self._values[key] = normalized
+        for gram in grams:
+            self._postings[gram].add(key)
+
+    def remove(self, key):
+        grams = self._grams.pop(key, None)
+        self._values.pop(key, None)
+        for gram in grams or ():
+            posting = self._postings[gram]
+            posting.discard(key)
+            if not posting:
+                del self._postings[gram]
+
+    def value(self, key):
+        return self._values[key]
+
+    def search(self, normalized, threshold=0.6, limit=10):
+        """Return [(key, similarity)] of entries at or above threshold, best first"""
+        query = trigrams(normalized)
+        shared = Counter()
+        for gram in query:
+            shared.update(self._postings.get(gram, ()))
+
+        # Shared counts give the exact trigram Dice without touching the strings
+        results = []
+        for key, count in shared.items():
+            score = 2 * count / (len(query) + len(self._grams[key]))
+            if score >= threshold:
+                results.append((key, score))
+
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:limit]
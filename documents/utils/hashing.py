@@ -0,0 +1,13 @@
+# documents/utils/hashing.py
+import hashlib
+
+
+def compute_content_hash(file):
+    """
+    Compute the SHA-256 of a Django File chunk by chunk,
+    so large uploads are never fully loaded into memory.
+    """
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
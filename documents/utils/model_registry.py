@@ -0,0 +1,173 @@
+# documents/utils/model_registry.py
+import logging
+import os
+import resource
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Peak rather than current RSS, but still grows with each model
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelRegistry:
+    """
+    Process-level registry of heavy models.
+    Each model is loaded on first use and then shared by every request the
+    process serves. Worker boot hooks can preload them so the first
+    request does not pay the load. Load time and memory are recorded per
+    model.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._probes = {}
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, probe=None):
+        """
+        Register a loader for a model.
+        probe, if given, runs one representative request against the
+        loaded model and is used to measure request latency.
+        """
+        self._loaders[name] = loader
+        if probe:
+            self._probes[name] = probe
+
+    @property
+    def names(self):
+        return list(self._loaders)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def get(self, name):
+        """Return the model, loading it if this process has not yet"""
+        if name in self._models:
+            return self._models[name]
+
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+        return self._models[name]
+
+    def _load(self, name):
+        rss_before = current_rss()
+        started = time.perf_counter()
+        model = self._loaders[name]()
+        self._stats[name] = {
+            'load_seconds': round(time.perf_counter() - started, 4),
+            'memory_bytes': max(0, current_rss() - rss_before),
+            'pid': os.getpid(),
+        }
+        logger.info(
+            f"Loaded model {name} in {self._stats[name]['load_seconds']:.2f}s "
+            f"(+{self._stats[name]['memory_bytes'] / 2 ** 20:.1f} MB)"
+        )
+        return model
+
+    def preload(self, names=None):
+        """
+        Load models ahead of the first request.
+        A model that fails to load is reported and skipped, so a missing
+        optional dependency does not stop the worker from booting.
+        """
+        errors = {}
+        for name in names or self.names:
+            try:
+                self.get(name)
+            except Exception as e:
+                errors[name] = str(e)
+                logger.error(f"Could not preload model {name}: {str(e)}")
+        return errors
+
+    def probe(self, name):
+        """Run the model's representative request"""
+        return self._probes[name](self.get(name))
+
+    def has_probe(self, name):
+        return name in self._probes
+
+    def unload(self, name=None):
+        """Drop one or all loaded models; the next get() loads them again"""
+        with self._lock:
+            for key in ([name] if name else list(self._models)):
+                self._models.pop(key, None)
+                self._stats.pop(key, None)
+
+    def report(self):
+        """Load status, time and memory for every registered model"""
+        return {
+            name: dict(self._stats.get(name, {}), loaded=self.is_loaded(name))
+            for name in self.names
+        }
+
+
+def load_spacy():
+    """The NER pipeline, without the components validation does not use"""
+    import spacy
+    return spacy.load(
+        getattr(settings, 'NLP_MODEL', 'en_core_web_sm'),
+        exclude=getattr(settings, 'NLP_EXCLUDED_COMPONENTS', ['parser', 'lemmatizer'])
+    )
+
+
+def load_fraud_model():
+    from .fraud_scoring import load_model
+    return load_model(getattr(settings, 'FRAUD_MODEL_PATH', None))
+
+
+def load_tesseract_config():
+    """Tesseract settings, checked once so requests do not probe the binary"""
+    from .ocr_pool import tesseract_available
+    config = {
+        'lang': getattr(settings, 'OCR_LANG', 'eng'),
+        'config': getattr(settings, 'OCR_TESSERACT_CONFIG', ''),
+        'dpi': getattr(settings, 'OCR_DPI', 300),
+        'available': tesseract_available(),
+        'version': None,
+    }
+    if config['available']:
+        try:
+            import pytesseract
+            config['version'] = str(pytesseract.get_tesseract_version())
+        except Exception:
+            pass
+    return config
+
+
+def probe_fraud_model(model):
+    import numpy as np
+    return model.predict_proba(np.zeros((1, len(model.feature_names))))
+
+
+registry = ModelRegistry()
+registry.register('spacy', load_spacy, probe=lambda nlp: nlp("Bumpz Auto Accessories Shop, 12 Rizal Street"))
+registry.register('fraud_model', load_fraud_model, probe=probe_fraud_model)
+registry.register('tesseract', load_tesseract_config)
+
+
+def get_model(name):
+    return registry.get(name)
+
+
+def preload_models(**kwargs):
+    """
+    Worker boot hook: load the models named in MODEL_PRELOAD.
+    Called when a Celery worker process starts and when daphne imports
+    asgi.py; accepts and ignores signal arguments.
+    """
+    names = [name for name in getattr(settings, 'MODEL_PRELOAD', registry.names) if name]
+    return registry.preload(names)
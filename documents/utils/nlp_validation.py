@@ -1,47 +1,200 @@
+import logging
 import re
-import random
+import unicodedata
+from .model_registry import get_model
 
+logger = logging.getLogger(__name__)
 
-def validate_business_name(name):
+PROHIBITED_WORDS = ('scam', 'illegal', 'fake')
+
+BUSINESS_NAME_PATTERN = re.compile(r"^[A-Za-z0-9\s\.\&\-\']+$")
+PERSON_NAME_PATTERN = re.compile(r"^[^\W\d_]+(?:[\s\.\-\'][^\W\d_]*)*\.?$")
+ADDRESS_NUMBER_PATTERN = re.compile(r'\d+')
+ADDRESS_KEYWORD_PATTERN = re.compile(
+    r'\b(?:street|st|avenue|ave|road|rd|highway|hwy|barangay|brgy|purok|sitio|'
+    r'city|municipality|province|subdivision|subd|village|blk|block|lot|zone)\b\.?',
+    re.IGNORECASE
+)
+
+# Entity labels that support each field type
+FIELD_ENTITY_LABELS = {
+    'business_name': {'ORG', 'PERSON', 'PRODUCT', 'FAC'},
+    'owner_name': {'PERSON'},
+    'address': {'GPE', 'LOC', 'FAC'},
+}
+
+# Validated strings kept per process before the cache is cleared
+CACHE_SIZE = 10000
+
+
+def normalize_text(text):
+    """Cache key for a field value: Unicode-normalised with collapsed whitespace"""
+    return ' '.join(unicodedata.normalize('NFKC', text or '').split())
+
+
+class NLPValidator:
     """
-    Simulates NLP validation of business names.
-    In a real system, this would use NLP libraries to check naming conventions.
+    Validates business names, owner names and addresses.
+    Texts are run through the shared spaCy pipeline in batches with
+    nlp.pipe, and each result is cached per normalised string, so a whole
+    form or a bulk re-validation costs one pipeline pass over the distinct
+    values. Falls back to the rule checks alone when spaCy is not installed.
     """
-    # Check if the name matches common patterns
-    if not name or len(name) < 3:
-        return False, "Business name is too short"
 
-    # Check for prohibited words
-    prohibited_words = ['scam', 'illegal', 'fake']
-    for word in prohibited_words:
-        if word.lower() in name.lower():
-            return False, f"Business name contains prohibited word: {word}"
+    FIELD_TYPES = ('business_name', 'owner_name', 'address')
+
+    def __init__(self, nlp=None, batch_size=256):
+        self._nlp = nlp
+        self.batch_size = batch_size
+        self._cache = {}
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            try:
+                self._nlp = get_model('spacy')
+            except Exception as e:
+                logger.warning(f"spaCy pipeline unavailable, using rule checks only: {str(e)}")
+                self._nlp = False
+        return self._nlp or None
+
+    def validate_many(self, items):
+        """
+        Validate (field_type, text) pairs in one pipeline pass.
+        Returns a result dict per pair, in order.
+        """
+        keys = [(field_type, normalize_text(text)) for field_type, text in items]
+        # Results for this call are collected locally, so clearing the cache
+        # to make room cannot drop the hits it already supplied
+        results = {key: self._cache[key] for key in keys if key in self._cache}
+        pending = [key for key in dict.fromkeys(keys) if key not in results]
+
+        if pending:
+            nlp = self.nlp
+            if nlp is not None:
+                docs = nlp.pipe((text for _, text in pending), batch_size=self.batch_size)
+            else:
+                docs = (None for _ in pending)
+
+            for (field_type, text), doc in zip(pending, docs):
+                results[(field_type, text)] = self._validate(field_type, text, doc)
+
+            if len(self._cache) + len(pending) > CACHE_SIZE:
+                self._cache.clear()
+            self._cache.update((key, results[key]) for key in pending[-CACHE_SIZE:])
+
+        return [results[key] for key in keys]
+
+    def validate(self, field_type, text):
+        return self.validate_many([(field_type, text)])[0]
+
+    def validate_form(self, data):
+        """
+        Validate every NLP-checked field present in a form in one pass.
+        data maps field names to (field_type, text) or, for the three
+        field types themselves, directly to text.
+        """
+        items = {}
+        for field, value in data.items():
+            if isinstance(value, tuple):
+                items[field] = value
+            elif field in self.FIELD_TYPES:
+                items[field] = (field, value)
+
+        results = self.validate_many(list(items.values()))
+        return dict(zip(items, results))
+
+    def _validate(self, field_type, text, doc):
+        checks = {
+            'business_name': self._check_business_name,
+            'owner_name': self._check_owner_name,
+            'address': self._check_address,
+        }
+        is_valid, message = checks[field_type](text)
+
+        entities = [] if doc is None else [(ent.text, ent.label_) for ent in doc.ents]
+        supported = any(label in FIELD_ENTITY_LABELS[field_type] for _, label in entities)
+        if field_type == 'address' and ADDRESS_KEYWORD_PATTERN.search(text):
+            supported = True
+
+        if not is_valid:
+            confidence = 0.0
+        else:
+            confidence = 0.95 if supported else 0.75
+
+        return {
+            'is_valid': is_valid,
+            'message': message,
+            'confidence': confidence,
+            'entities': entities,
+        }
+
+    def _check_business_name(self, name):
+        # Check if the name matches common patterns
+        if len(name) < 3:
+            return False, "Business name is too short"
+
+        # Check for prohibited words
+        for word in PROHIBITED_WORDS:
+            if word in name.lower():
+                return False, f"Business name contains prohibited word: {word}"
+
+        # Check for business name pattern
+        if not BUSINESS_NAME_PATTERN.match(name):
+            return False, "Business name contains invalid characters"
+
+        return True, "Business name is valid"
+
+    def _check_owner_name(self, name):
+        if len(name.split()) < 2:
+            return False, "Owner name should include a first and last name"
+
+        if not PERSON_NAME_PATTERN.match(name):
+            return False, "Owner name contains invalid characters"
+
+        return True, "Owner name is valid"
+
+    def _check_address(self, address):
+        # Check if address is empty
+        if len(address) < 5:
+            return False, "Address is too short"
+
+        # Should contain at least one number
+        if not ADDRESS_NUMBER_PATTERN.search(address):
+            return False, "Address should include a number"
+
+        return True, "Address is valid"
+
+
+_validator = None
 
-    # Check for business name pattern
-    valid_pattern = re.match(r'^[A-Za-z0-9\s\.\&\-\']+$', name)
-    if not valid_pattern:
-        return False, "Business name contains invalid characters"
 
-    return True, "Business name is valid"
+def get_validator():
+    """Process-wide validator, so its cache is shared across requests"""
+    global _validator
+    if _validator is None:
+        _validator = NLPValidator()
+    return _validator
 
 
-def validate_address(address):
+def validate_business_name(name):
     """
-    Simulates NLP validation of addresses.
-    In a real system, this would use NLP/geocoding to validate addresses.
+    Validate a business name.
+    Returns (is_valid, message).
     """
-    # Check if address is empty
-    if not address or len(address) < 5:
-        return False, "Address is too short"
-
-    # Check for address pattern (very basic check)
-    if not re.search(r'\d+', address):  # Should contain at least one number
-        return False, "Address should include a number"
+    result = get_validator().validate('business_name', name)
+    return result['is_valid'], result['message']
 
-    # Simulate geocoding validation
-    confidence = random.uniform(0.7, 0.99)
 
-    return confidence > 0.8, f"Address validation confidence: {confidence:.2f}"
+def validate_address(address):
+    """
+    Validate an address.
+    Returns (is_valid, message).
+    """
+    result = get_validator().validate('address', address)
+    if not result['is_valid']:
+        return False, result['message']
+    return True, f"Address validation confidence: {result['confidence']:.2f}"
 
 
 def suggest_corrections(text, field_type):
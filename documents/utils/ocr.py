@@ -1,39 +1,169 @@
 import re
 import random
 import os
+import logging
 from datetime import datetime
+from django.conf import settings
+from .ocr_pool import get_ocr_pool, tesseract_available
 
+logger = logging.getLogger(__name__)
 
-def extract_text_from_document(file_path):
+OCR_DATE_PATTERN = re.compile(
+    r'\b(\d{4}-\d{2}-\d{2}|'
+    r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+    r'\s+\d{1,2},\s+\d{4})\b'
+)
+OCR_REGISTRATION_PATTERN = re.compile(
+    r'\b(REG\d+)\b|(?:Business Name|Registration|Reg\.?)\s+No\.?\s*:?\s*([A-Z0-9-]*\d[A-Z0-9-]*)',
+    re.IGNORECASE
+)
+OCR_BUSINESS_NAME_PATTERN = re.compile(
+    r'Business\s+(?:Trade\s+)?Name\s*:\s*(.+)',
+    re.IGNORECASE
+)
+
+# Filename conventions per document type, matched at the start of the name
+DOCUMENT_FORMAT_PATTERNS = {
+    'dti_sec': r'(?:DTI|SEC)_REG\d+_\d{4}-\d{2}-\d{2}',
+    'lease': r'LEASE_\d{4}-\d{2}-\d{2}_\w+',
+    'title': r'TCT\d+_\w+',
+    'consent': r'CONSENT_\w+_\d{4}-\d{2}-\d{2}',
+    'signage': r'SIGNAGE_\w+',
+    'fire_cert': r'FIRE_CERT_\d{4}-\d{2}-\d{2}',
+    'zoning': r'ZONING_\w+',
+    'hoa': r'HOA_PERMIT_\w+',
+    'occupancy': r'OCCUPANCY_\w+',
+    'sanitary': r'SANITARY_\w+_\d{4}',
+    'barangay': r'BRGY_CLEARANCE_\w+',
+    'gross_receipt': r'GROSS_RECEIPT_\d{4}',
+    'sale_deed': r'DEED_SALE_\w+',
+    'transfer': r'TRANSFER_\w+_\d{4}-\d{2}-\d{2}',
+    'closure': r'CLOSURE_\w+_\d{4}-\d{2}-\d{2}',
+    'board_resolution': r'BOARD_RES_\w+_\d{4}-\d{2}-\d{2}',
+}
+
+# (extracted field, group name) for the fields read from filenames
+FILENAME_FIELD_GROUPS = (
+    ('date', 'field_date'),
+    ('business_name', 'field_business_name'),
+    ('registration_number', 'field_registration_number'),
+)
+
+
+def _compile_filename_classifier():
+    """
+    One pattern that classifies and extracts in a single match.
+    The field lookaheads all start at position 0 and lazily find the
+    first occurrence of each field anywhere in the name, then the named
+    alternation matches the document type prefixes, which are mutually
+    exclusive so at most one branch can match.
+    """
+    fields = (
+        r'(?=.*?(?P<field_date>\d{4}-\d{2}-\d{2}))?'
+        r'(?=.*?(?P<field_business_name>[A-Za-z]+)_)?'
+        r'(?=.*?(?P<field_registration_number>REG\d+))?'
+    )
+    document_types = '|'.join(
+        f'(?P<{document_type}>{pattern})'
+        for document_type, pattern in DOCUMENT_FORMAT_PATTERNS.items()
+    )
+    return re.compile(f'{fields}(?:{document_types})?', re.DOTALL)
+
+
+FILENAME_CLASSIFIER = _compile_filename_classifier()
+
+
+def extract_text_from_document(file_path, regions=None, mode=None):
+    """
+    Extract text and key fields from a document.
+
+    mode is 'tesseract' (default, set by OCR_ENGINE) to run real OCR through
+    the worker pool, or 'filename' for the fast simulator that only parses
+    the filename. regions optionally limits OCR to per-page rectangles,
+    given as {page_number: [{'x', 'y', 'width', 'height'}]} in percent.
+    Falls back to the filename simulator when tesseract is not available.
+    """
+    mode = mode or getattr(settings, 'OCR_ENGINE', 'tesseract')
+
+    if mode == 'tesseract':
+        if tesseract_available():
+            try:
+                text = get_ocr_pool().extract_text(file_path, regions)
+                return {
+                    'text': text,
+                    'extracted_fields': extract_fields_from_text(text)
+                }
+            except Exception as e:
+                logger.error(f"OCR failed for {file_path}: {str(e)}")
+        else:
+            logger.warning("Tesseract is not installed; using filename OCR simulation")
+
+    return extract_text_from_filename(file_path)
+
+
+def extract_fields_from_text(text):
+    """
+    Pull the date, registration number and business name out of OCR text.
+    """
+    fields = {}
+
+    date_match = OCR_DATE_PATTERN.search(text)
+    if date_match:
+        fields['date'] = date_match.group(1)
+
+    reg_match = OCR_REGISTRATION_PATTERN.search(text)
+    if reg_match:
+        fields['registration_number'] = reg_match.group(1) or reg_match.group(2)
+
+    name_match = OCR_BUSINESS_NAME_PATTERN.search(text)
+    if name_match:
+        fields['business_name'] = name_match.group(1).strip()
+
+    return fields
+
+
+def extract_text_from_filename(file_path):
     """
     Simulates OCR text extraction.
-    In a real system, this would use an OCR library like Tesseract.
+    Fast fallback that only looks at the filename.
     """
     # For simulation, we'll extract data from the filename
     filename = os.path.basename(file_path)
 
-    # Extract common patterns
-    extracted_data = {
+    return {
         'text': f"Extracted content from {filename}",
-        'extracted_fields': {}
+        'extracted_fields': classify_filename(filename)['extracted_fields']
     }
 
-    # Extract dates (format: YYYY-MM-DD)
-    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
-    if date_match:
-        extracted_data['extracted_fields']['date'] = date_match.group(1)
 
-    # Extract business name (format: BusinessName_)
-    name_match = re.search(r'([A-Za-z]+)_', filename)
-    if name_match:
-        extracted_data['extracted_fields']['business_name'] = name_match.group(1)
+def classify_filename(filename):
+    """
+    Classify a filename and extract its fields in a single regex match.
+    Returns the document type whose naming convention the filename
+    follows (None if it follows none) and the date (YYYY-MM-DD), business
+    name (BusinessName_) and registration number (REG123456) found in it.
+    """
+    groups = FILENAME_CLASSIFIER.match(filename).groupdict()
 
-    # Extract registration numbers (format: REG123456)
-    reg_match = re.search(r'(REG\d+)', filename)
-    if reg_match:
-        extracted_data['extracted_fields']['registration_number'] = reg_match.group(1)
+    document_type = None
+    for candidate in DOCUMENT_FORMAT_PATTERNS:
+        if groups[candidate] is not None:
+            document_type = candidate
+            break
 
-    return extracted_data
+    return {
+        'document_type': document_type,
+        'extracted_fields': {
+            field: groups[group]
+            for field, group in FILENAME_FIELD_GROUPS
+            if groups[group] is not None
+        }
+    }
+
+
+def classify_filenames(filenames):
+    """Classify a batch of filenames, keeping their order"""
+    return [classify_filename(filename) for filename in filenames]
 
 
 def is_valid_document_format(filename, document_type):
@@ -41,26 +171,7 @@ def is_valid_document_format(filename, document_type):
     Check if the document filename follows expected patterns for the document type.
     This simulates AI validation based on naming conventions.
     """
-    valid_patterns = {
-        'dti_sec': r'^(DTI|SEC)_REG\d+_\d{4}-\d{2}-\d{2}',
-        'lease': r'^LEASE_\d{4}-\d{2}-\d{2}_\w+',
-        'title': r'^TCT\d+_\w+',
-        'consent': r'^CONSENT_\w+_\d{4}-\d{2}-\d{2}',
-        'signage': r'^SIGNAGE_\w+',
-        'fire_cert': r'^FIRE_CERT_\d{4}-\d{2}-\d{2}',
-        'zoning': r'^ZONING_\w+',
-        'hoa': r'^HOA_PERMIT_\w+',
-        'occupancy': r'^OCCUPANCY_\w+',
-        'sanitary': r'^SANITARY_\w+_\d{4}',
-        'barangay': r'^BRGY_CLEARANCE_\w+',
-        'gross_receipt': r'^GROSS_RECEIPT_\d{4}',
-        'sale_deed': r'^DEED_SALE_\w+',
-        'transfer': r'^TRANSFER_\w+_\d{4}-\d{2}-\d{2}',
-        'closure': r'^CLOSURE_\w+_\d{4}-\d{2}-\d{2}',
-        'board_resolution': r'^BOARD_RES_\w+_\d{4}-\d{2}-\d{2}',
-    }
-
-    if document_type not in valid_patterns:
+    if document_type not in DOCUMENT_FORMAT_PATTERNS:
         return False
 
-    return bool(re.match(valid_patterns[document_type], filename))
\ No newline at end of file
+    return classify_filename(filename)['document_type'] == document_type
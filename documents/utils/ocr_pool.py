@@ -0,0 +1,223 @@
+# documents/utils/ocr_pool.py
+import atexit
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image
+from .pdf_pages import render_pdf_page, get_page_sizes
+
+# Engine owned by each pool worker (process or thread), created once by _init_worker
+_worker = threading.local()
+
+
+class PytesseractEngine:
+    """Runs the tesseract CLI through pytesseract"""
+
+    def __init__(self, lang, config):
+        import pytesseract
+        self._pytesseract = pytesseract
+        self.lang = lang
+        self.config = config
+
+    def recognize(self, image):
+        return self._pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+
+def parse_tesseract_config(config):
+    """
+    Split a tesseract command-line config ('--psm 6 --oem 1 -c name=value')
+    into the page segmentation mode, engine mode, tessdata directory and
+    variables, so the tesserocr engine reads pages the way the CLI would.
+    """
+    options = {'psm': None, 'oem': None, 'tessdata_dir': None, 'variables': {}}
+    tokens = config.split()
+    while tokens:
+        token = tokens.pop(0)
+        option, _, value = token.partition('=')
+        if option in ('--psm', '--oem', '--tessdata-dir', '-c'):
+            if not value:
+                if not tokens:
+                    raise ValueError(f"Missing value for {option} in tesseract config")
+                value = tokens.pop(0)
+            if option == '-c':
+                name, _, variable = value.partition('=')
+                options['variables'][name] = variable
+            elif option == '--tessdata-dir':
+                options['tessdata_dir'] = value
+            else:
+                options[option[2:]] = int(value)
+        else:
+            raise ValueError(f"Unsupported tesseract config option {token}")
+    return options
+
+
+class TesserocrEngine:
+    """
+    Keeps one tesseract API instance loaded, so the language model is read
+    once per worker instead of once per page. Used when tesserocr is installed.
+    """
+
+    def __init__(self, lang, config):
+        import tesserocr
+        options = parse_tesseract_config(config)
+        kwargs = {'lang': lang}
+        if options['tessdata_dir']:
+            kwargs['path'] = options['tessdata_dir']
+        if options['psm'] is not None:
+            kwargs['psm'] = options['psm']
+        if options['oem'] is not None:
+            kwargs['oem'] = options['oem']
+        self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        for name, value in options['variables'].items():
+            if not self._api.SetVariable(name, value):
+                raise ValueError(f"Unknown tesseract variable {name}")
+
+    def recognize(self, image):
+        self._api.SetImage(image)
+        return self._api.GetUTF8Text()
+
+
+def create_engine(lang, config):
+    try:
+        return TesserocrEngine(lang, config)
+    except (ImportError, RuntimeError, ValueError):
+        # Not installed, no tessdata for lang, or a config only the CLI understands
+        return PytesseractEngine(lang, config)
+
+
+def tesseract_available():
+    """True if the tesseract binary or bindings can be used"""
+    try:
+        import tesserocr
+        # The bindings are only usable with language data to load
+        if tesserocr.get_languages()[1]:
+            return True
+    except ImportError:
+        pass
+    try:
+        import pytesseract
+    except ImportError:
+        return False
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+def _init_worker(lang, config):
+    _worker.engine = create_engine(lang, config)
+
+
+def load_page(file_path, page_number, dpi):
+    """Open one page of a document as a PIL image"""
+    if str(file_path).lower().endswith('.pdf'):
+        return render_pdf_page(file_path, page_number, dpi)
+
+    image = Image.open(file_path)
+    image.load()
+    return image
+
+
+def crop_region(image, region):
+    """Crop a region given in percent of the page (x, y, width, height)"""
+    width, height = image.size
+    left = int(width * region['x'] / 100)
+    top = int(height * region['y'] / 100)
+    right = int(width * min(100, region['x'] + region['width']) / 100)
+    bottom = int(height * min(100, region['y'] + region['height']) / 100)
+    return image.crop((left, top, right, bottom))
+
+
+def recognize_page(file_path, page_number, regions, dpi, engine=None):
+    """
+    OCR one page, or only its regions of interest if any are given.
+    Runs inside a pool worker unless an engine is passed in.
+    """
+    engine = engine or _worker.engine
+    image = load_page(file_path, page_number, dpi)
+    try:
+        if not regions:
+            return engine.recognize(image)
+        return '\n'.join(engine.recognize(crop_region(image, region)) for region in regions)
+    finally:
+        image.close()
+
+
+class TesseractPool:
+    """
+    Pool of long-lived OCR workers.
+    Each worker builds its engine once at start-up and then serves pages,
+    so pages of a document are recognised in parallel without paying
+    interpreter start-up and model loading on every call. Workers are
+    processes, or threads where this process may not start children;
+    tesserocr and the tesseract CLI both recognise outside the GIL.
+    """
+
+    def __init__(self, size=2, lang='eng', config='', dpi=300, threads=False):
+        self.size = size
+        self.dpi = dpi
+        executor_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+        self._executor = executor_class(
+            max_workers=size,
+            initializer=_init_worker,
+            initargs=(lang, config)
+        )
+
+    def extract_text(self, file_path, regions=None):
+        """
+        OCR every page of a document.
+        regions maps page numbers to lists of percent rectangles; when it
+        is given only those pages are read, and only inside the rectangles.
+        """
+        page_numbers = self._page_numbers(file_path, regions)
+        futures = [
+            self._executor.submit(
+                recognize_page, file_path, page_number,
+                (regions or {}).get(page_number), self.dpi
+            )
+            for page_number in page_numbers
+        ]
+        return '\n'.join(future.result() for future in futures)
+
+    def extract_many(self, file_paths):
+        """OCR several single-page documents concurrently, keeping their order"""
+        futures = [
+            self._executor.submit(recognize_page, file_path, 1, None, self.dpi)
+            for file_path in file_paths
+        ]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _page_numbers(self, file_path, regions):
+        if regions:
+            return sorted(regions)
+        if str(file_path).lower().endswith('.pdf'):
+            _, page_count = get_page_sizes(file_path)
+            return list(range(1, page_count + 1))
+        return [1]
+
+
+_pool = None
+
+
+def get_ocr_pool():
+    """
+    Process-wide OCR pool, created on first use or when a Celery worker
+    process starts. Celery's prefork workers are daemonic processes, which
+    may not have children, so the pool runs threads there.
+    """
+    global _pool
+    if _pool is None:
+        from django.conf import settings
+        from .model_registry import get_model
+        tesseract = get_model('tesseract')
+        _pool = TesseractPool(
+            size=getattr(settings, 'OCR_POOL_SIZE', min(4, os.cpu_count() or 1)),
+            lang=tesseract['lang'],
+            config=tesseract['config'],
+            dpi=tesseract['dpi'],
+            threads=multiprocessing.current_process().daemon
+        )
+        atexit.register(_pool.shutdown)
+    return _pool
@@ -0,0 +1,118 @@
+# documents/utils/pdf_pages.py
+import math
+import re
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+DEFAULT_DPI = 200
+
+# Largest raster a single page may occupy (RGB, 3 bytes per pixel)
+DEFAULT_PAGE_MEMORY_BUDGET = 64 * 1024 * 1024
+
+BYTES_PER_PIXEL = 3
+POINTS_PER_INCH = 72
+
+PAGE_SIZE_PATTERN = re.compile(r'^Page\s+(\d+)\s+size$')
+
+
+class PageMemoryBudgetExceeded(Exception):
+    """Raised when a page cannot be rasterised within the memory budget"""
+
+
+def raster_bytes(width, height):
+    """Bytes of an RGB raster of the given size"""
+    return width * height * BYTES_PER_PIXEL
+
+
+def dpi_within_budget(width_pt, height_pt, dpi, memory_budget):
+    """
+    Highest DPI, capped at the requested one, at which a page of the
+    given size in points fits in the memory budget.
+    """
+    width_in = width_pt / POINTS_PER_INCH
+    height_in = height_pt / POINTS_PER_INCH
+    needed = raster_bytes(width_in * dpi, height_in * dpi)
+    if needed <= memory_budget:
+        return dpi
+    return int(math.floor(dpi * math.sqrt(memory_budget / needed)))
+
+
+def get_page_sizes(pdf_path):
+    """Return {page_number: (width_pt, height_pt)} for every page of a PDF"""
+    info = pdfinfo_from_path(pdf_path)
+    page_count = info['Pages']
+    if page_count > 1:
+        # pdfinfo only reports per-page sizes when given a page range
+        info = pdfinfo_from_path(pdf_path, first_page=1, last_page=page_count)
+
+    sizes = {}
+    for key, value in info.items():
+        match = PAGE_SIZE_PATTERN.match(key)
+        if match:
+            width, height = value.split(' x ')
+            sizes[int(match.group(1))] = (float(width), float(height.split()[0]))
+
+    if not sizes and 'Page size' in info:
+        width, height = info['Page size'].split(' x ')
+        sizes[1] = (float(width), float(height.split()[0]))
+
+    return sizes, page_count
+
+
+def render_pdf_page(pdf_path, page_number=1, dpi=DEFAULT_DPI):
+    """Rasterise a single page of a PDF"""
+    images = convert_from_path(
+        str(pdf_path),
+        dpi=dpi,
+        first_page=page_number,
+        last_page=page_number
+    )
+    return images[0]
+
+
+def iter_pdf_pages(pdf_path, dpi=DEFAULT_DPI, memory_budget=DEFAULT_PAGE_MEMORY_BUDGET, report=None):
+    """
+    Yield (page_number, image) for each page of a PDF, one page at a time.
+
+    Only one page raster is alive at once: each image is closed when the
+    consumer asks for the next page. Pages that would not fit in
+    memory_budget at the requested DPI are rendered at a lower DPI.
+    If a report dict is given it is filled with the per-document memory
+    figures as pages are produced.
+    """
+    pdf_path = str(pdf_path)
+    sizes, page_count = get_page_sizes(pdf_path)
+
+    if report is None:
+        report = {}
+    report.update({
+        'pages': page_count,
+        'requested_dpi': dpi,
+        'memory_budget': memory_budget,
+        'peak_page_bytes': 0,
+        'downscaled_pages': [],
+    })
+
+    for page_number in range(1, page_count + 1):
+        page_dpi = dpi
+        if page_number in sizes:
+            page_dpi = dpi_within_budget(*sizes[page_number], dpi, memory_budget)
+            if page_dpi < 1:
+                raise PageMemoryBudgetExceeded(
+                    f"Page {page_number} of {pdf_path} does not fit in {memory_budget} bytes"
+                )
+            if page_dpi < dpi:
+                report['downscaled_pages'].append({'page': page_number, 'dpi': page_dpi})
+
+        image = render_pdf_page(pdf_path, page_number, page_dpi)
+        try:
+            page_bytes = raster_bytes(*image.size)
+            if page_bytes > memory_budget:
+                raise PageMemoryBudgetExceeded(
+                    f"Page {page_number} of {pdf_path} needs {page_bytes} bytes, "
+                    f"over the {memory_budget} byte budget"
+                )
+            report['peak_page_bytes'] = max(report['peak_page_bytes'], page_bytes)
+
+            yield page_number, image
+        finally:
+            image.close()
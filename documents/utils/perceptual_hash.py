@@ -0,0 +1,150 @@
+# documents/utils/perceptual_hash.py
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .pdf_pages import render_pdf_page
+
+HASH_BITS = 64
+
+# Hashes only need a thumbnail; PDFs are rendered this small
+PDF_HASH_DPI = 36
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp'}
+
+
+def _to_hex(bits):
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return f'{value:016x}'
+
+
+def dhash(gray):
+    """Difference hash: whether each pixel of a 9x8 thumbnail is brighter than its right neighbour"""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _to_hex(small[:, 1:] > small[:, :-1])
+
+
+def phash(gray):
+    """
+    DCT hash: the lowest 8x8 frequencies of a 32x32 thumbnail, each
+    compared with their median. Survives re-encoding, rescaling and
+    small brightness changes.
+    """
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    # The DC term is overall brightness and would dominate the median
+    median = np.median(low.ravel()[1:])
+    return _to_hex(low > median)
+
+
+def hamming(a, b):
+    """Number of differing bits between two hex hashes"""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def _grayscale(image):
+    """PIL image to a uint8 grayscale array"""
+    return np.asarray(image.convert('L'), dtype=np.uint8)
+
+
+def hash_image(image):
+    """{'phash', 'dhash'} of a PIL image"""
+    gray = _grayscale(image)
+    return {'phash': phash(gray), 'dhash': dhash(gray)}
+
+
+def hash_file(file):
+    """
+    Perceptual hashes of an uploaded image (path or file object).
+    JPEGs are decoded at reduced size through PIL's draft mode, which is
+    enough for a 32x32 thumbnail and much cheaper than a full decode.
+    """
+    with Image.open(file) as image:
+        image.draft('L', (128, 128))
+        return hash_image(image)
+
+
+def hash_document(file_path):
+    """
+    Perceptual hashes of a stored document; PDFs are hashed on their
+    first page. Returns None for files that cannot be decoded.
+    """
+    ext = os.path.splitext(str(file_path))[1].lower()
+    try:
+        if ext == '.pdf':
+            return hash_image(render_pdf_page(file_path, 1, PDF_HASH_DPI))
+        if ext in IMAGE_EXTENSIONS:
+            return hash_file(file_path)
+    except Exception:
+        pass
+    return None
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes under Hamming distance.
+    A radius search only descends into children whose edge distance is
+    within the radius of the query's distance to the node (triangle
+    inequality), so it visits a small part of the tree instead of every
+    hash. Each hash keeps the set of keys that have it; removing a key
+    leaves its node in place, which keeps the tree valid.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._keys = {}
+        self._hash_of = {}
+
+    def __len__(self):
+        return len(self._hash_of)
+
+    def __contains__(self, key):
+        return key in self._hash_of
+
+    def add(self, key, value):
+        self.remove(key)
+        value = int(value, 16)
+        self._hash_of[key] = value
+        if value in self._keys:
+            self._keys[value].add(key)
+            return
+        self._keys[value] = {key}
+
+        if self._root is None:
+            self._root = (value, {})
+            return
+        node = self._root
+        while True:
+            distance = bin(node[0] ^ value).count('1')
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (value, {})
+                return
+            node = child
+
+    def remove(self, key):
+        value = self._hash_of.pop(key, None)
+        if value is not None:
+            self._keys[value].discard(key)
+
+    def search(self, value, max_distance):
+        """Return [(key, distance)] of keys within max_distance, nearest first"""
+        if self._root is None:
+            return []
+        value = int(value, 16)
+        results = []
+        stack = [self._root]
+        while stack:
+            node_value, children = stack.pop()
+            distance = bin(node_value ^ value).count('1')
+            if distance <= max_distance:
+                results.extend((key, distance) for key in self._keys[node_value])
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        results.sort(key=lambda item: item[1])
+        return results
@@ -0,0 +1,40 @@
+# documents/utils/result_archive.py
+import io
+import json
+
+import numpy as np
+
+
+def pack(heatmaps=(), ocr=None):
+    """
+    Compress the bulky part of a verification result into .npz bytes.
+    Tile heatmaps become float16 arrays, which keeps about three
+    significant digits, plenty for display; the OCR payload is stored
+    as JSON inside the same compressed archive.
+    """
+    arrays = {}
+    meta = {'heatmaps': [], 'ocr': ocr}
+    for index, heatmap in enumerate(heatmaps or ()):
+        meta['heatmaps'].append({'tile_size': heatmap['tile_size'], 'grid': heatmap['grid']})
+        arrays[f'ela_{index}'] = np.asarray(heatmap['ela'], dtype=np.float16)
+        arrays[f'noise_{index}'] = np.asarray(heatmap['noise'], dtype=np.float16)
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def unpack(data):
+    """Inverse of pack: {'heatmaps': [...], 'ocr': ...} with heatmaps as lists again"""
+    with np.load(io.BytesIO(data)) as archive:
+        meta = json.loads(archive['meta'].tobytes())
+        heatmaps = [
+            dict(
+                info,
+                ela=np.round(archive[f'ela_{index}'].astype(np.float64), 2).tolist(),
+                noise=np.round(archive[f'noise_{index}'].astype(np.float64), 2).tolist(),
+            )
+            for index, info in enumerate(meta['heatmaps'])
+        ]
+    return {'heatmaps': heatmaps, 'ocr': meta['ocr']}
@@ -4,7 +4,7 @@ import numpy as np
 import cv2
 from PIL import Image
 import pytesseract
-from pdf2image import convert_from_path
+from documents.utils.pdf_pages import render_pdf_page
 from pathlib import Path
 
 
@@ -126,8 +126,8 @@ def test_all_documents(test_documents):
 
             # Handle both PDF and image files
             if str(doc_path).lower().endswith('.pdf'):
-                images = convert_from_path(str(doc_path))
-                image_np = np.array(images[0])
+                page = render_pdf_page(str(doc_path))
+                image_np = np.array(page)
             else:
                 image = Image.open(doc_path)
                 image_np = np.array(image)
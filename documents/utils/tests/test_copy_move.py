@@ -0,0 +1,96 @@
+# documents/utils/tests/test_copy_move.py
+import cv2
+import numpy as np
+
+from documents.utils.copy_move import detect_copy_move
+from documents.utils.document_validator import DocumentValidator
+
+
+def create_texture(size=(600, 800)):
+    """Paper-like texture with no repeated structure"""
+    rng = np.random.default_rng(0)
+    return cv2.GaussianBlur(rng.integers(0, 255, size, dtype=np.uint8), (5, 5), 0)
+
+
+def test_untouched_page_has_no_copied_regions():
+    """Matching a page against itself finds nothing without a copy"""
+    result = detect_copy_move(create_texture())
+
+    assert result['areas'] == []
+    assert result['timed_out'] is False
+
+
+def test_copied_region_reports_source_and_copy():
+    """Both ends of a copy-move are localised in percent of the page"""
+    page = create_texture()
+    page[300:420, 450:570] = page[50:170, 100:220]
+
+    result = detect_copy_move(page)
+
+    assert result['matches'] >= 4
+    source, copy = result['areas']
+    assert 10 <= source['x'] <= 15 and 5 <= source['y'] <= 10
+    assert 55 <= copy['x'] <= 60 and 48 <= copy['y'] <= 53
+    assert copy['indicator'] == 'copy_move'
+
+
+def create_form(size=(1100, 850)):
+    """Scanned form whose field labels repeat down the page"""
+    rng = np.random.default_rng(0)
+    page = np.full(size, 235, np.uint8)
+    for row in range(12):
+        label = ('NAME:', 'ADDRESS:', 'PERMIT NO.:')[row % 3]
+        value = ''.join(rng.choice(list('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789'), 10))
+        cv2.putText(page, label + ' ' + value, (60, 70 + row * 85), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 20, 2)
+    noise = rng.normal(0, 6, size)
+    return cv2.GaussianBlur(np.clip(page + noise, 0, 255).astype(np.uint8), (3, 3), 0)
+
+
+def test_repeated_printed_text_not_reported():
+    """Labels printed on several lines match, but are not copied regions"""
+    result = detect_copy_move(create_form())
+
+    assert result['rejected'] > 0
+    assert result['areas'] == []
+
+
+def test_large_scan_downscaled_before_detection():
+    """A high-resolution scan is detected at a bounded size, in page percent"""
+    page = create_texture()
+    page[300:420, 450:570] = page[50:170, 100:220]
+    large = cv2.resize(page, None, fx=4, fy=4, interpolation=cv2.INTER_NEAREST)
+
+    result = detect_copy_move(large)
+
+    source, copy = result['areas']
+    assert 10 <= source['x'] <= 15 and 5 <= source['y'] <= 10
+    assert 55 <= copy['x'] <= 60 and 48 <= copy['y'] <= 53
+
+
+def test_keypoints_capped():
+    """Keypoint count is bounded so matching cost is bounded"""
+    result = detect_copy_move(create_texture(), max_keypoints=300)
+
+    assert result['keypoints'] <= 300
+
+
+def test_time_budget_skips_matching():
+    """Pages whose detection overruns the budget are not matched"""
+    page = create_texture()
+    page[300:420, 450:570] = page[50:170, 100:220]
+
+    result = detect_copy_move(page, time_budget=0)
+
+    assert result['timed_out'] is True
+    assert result['areas'] == []
+
+
+def test_validator_adds_copy_move_to_fraud_areas():
+    """Copied regions reach the validator's fraud areas"""
+    page = cv2.cvtColor(create_texture(), cv2.COLOR_GRAY2RGB)
+    page[300:420, 450:570] = page[50:170, 100:220]
+
+    analysis = DocumentValidator()._analyze_image(page)
+
+    assert analysis['copy_move'][0]['matches'] >= 4
+    assert [area for area in analysis['fraud_areas'] if area.get('indicator') == 'copy_move']
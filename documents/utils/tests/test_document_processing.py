@@ -2,7 +2,7 @@
 import pytest
 from PIL import Image, ImageDraw, ImageFont
 import pytesseract
-from pdf2image import convert_from_path
+from documents.utils.pdf_pages import render_pdf_page
 import os
 from pathlib import Path
 import io
@@ -41,8 +41,8 @@ def test_dti_registration(setup_test_documents):
         pytest.skip(f"Test file not found: {dti_path}")
 
     try:
-        images = convert_from_path(str(dti_path))
-        text = pytesseract.image_to_string(images[0])
+        page = render_pdf_page(str(dti_path))
+        text = pytesseract.image_to_string(page)
 
         # Updated expected fields based on actual DTI document
         expected_fields = [
@@ -67,8 +67,8 @@ def test_barangay_clearance(setup_test_documents):
         pytest.skip(f"Test file not found: {clearance_path}")
 
     try:
-        images = convert_from_path(str(clearance_path))
-        text = pytesseract.image_to_string(images[0])
+        page = render_pdf_page(str(clearance_path))
+        text = pytesseract.image_to_string(page)
 
         # Updated expected fields based on actual Barangay document
         expected_fields = [
@@ -93,8 +93,8 @@ def test_real_property_tax(setup_test_documents):
         pytest.skip(f"Test file not found: {tax_path}")
 
     try:
-        images = convert_from_path(str(tax_path))
-        text = pytesseract.image_to_string(images[0])
+        page = render_pdf_page(str(tax_path))
+        text = pytesseract.image_to_string(page)
 
         # Updated expected fields based on actual document
         expected_fields = [
@@ -148,8 +148,8 @@ def test_zoning_permit(setup_test_documents):
         pytest.skip(f"Test file not found: {permit_path}")
 
     try:
-        images = convert_from_path(str(permit_path))
-        text = pytesseract.image_to_string(images[0])
+        page = render_pdf_page(str(permit_path))
+        text = pytesseract.image_to_string(page)
 
         # Updated expected fields based on actual document
         expected_fields = [
@@ -174,8 +174,8 @@ def test_sanitary_permit(setup_test_documents):
         pytest.skip(f"Test file not found: {permit_path}")
 
     try:
-        images = convert_from_path(str(permit_path))
-        text = pytesseract.image_to_string(images[0])
+        page = render_pdf_page(str(permit_path))
+        text = pytesseract.image_to_string(page)
 
         # Updated expected fields based on actual sanitary permit
         expected_fields = [
@@ -200,8 +200,8 @@ def test_dti_data_extraction(setup_test_documents):
         pytest.skip(f"Test file not found: {dti_path}")
 
     try:
-        images = convert_from_path(str(dti_path))
-        text = pytesseract.image_to_string(images[0])
+        page = render_pdf_page(str(dti_path))
+        text = pytesseract.image_to_string(page)
 
         # Test for specific data patterns
         import re
@@ -0,0 +1,183 @@
+# documents/utils/tests/test_document_validator.py
+import pytest
+import numpy as np
+import cv2
+from PIL import Image, ImageDraw
+import io
+
+from documents.utils.document_validator import DocumentValidator
+
+
+class LegacyValidationChecks:
+    """Per-check implementations the shared feature pipeline must reproduce"""
+
+    @staticmethod
+    def noise(image_np):
+        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+        noise = cv2.subtract(gray, cv2.GaussianBlur(gray, (3, 3), 0))
+        return float(np.std(noise))
+
+    @staticmethod
+    def text_quality(image_np):
+        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+        return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+    @staticmethod
+    def resolution(image_np):
+        gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        edge_intensity = np.sqrt(sobelx ** 2 + sobely ** 2).mean()
+        return float((laplacian_var + edge_intensity) / 2)
+
+
+def create_document_bytes(size=(800, 400)):
+    """Create a PNG document with some text and noise"""
+    img = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(img)
+    for line in range(0, size[1] - 20, 40):
+        draw.text((30, line + 10), "Business Name Registration No. 6559081", fill='black')
+    img_np = np.array(img)
+    rng = np.random.default_rng(0)
+    img_np[100:200, 100:200] = rng.integers(0, 255, (100, 100, 3), dtype=np.uint8)
+
+    output = io.BytesIO()
+    Image.fromarray(img_np).save(output, format='PNG')
+    return output.getvalue()
+
+
+def test_shared_features_match_legacy_scores():
+    """Shared feature pipeline must give exactly the per-check scores"""
+    try:
+        validator = DocumentValidator()
+        image_np = validator._bytes_to_np_array(create_document_bytes())
+
+        results = validator._run_validations(image_np)
+
+        assert results['noise_score'] == LegacyValidationChecks.noise(image_np)
+        assert results['text_quality'] == LegacyValidationChecks.text_quality(image_np)
+        assert results['resolution_score'] == LegacyValidationChecks.resolution(image_np)
+
+    except Exception as e:
+        pytest.fail(f"Shared feature test failed: {str(e)}")
+
+
+def test_validate_document_returns_all_scores():
+    """Test the public validation entry point"""
+    validator = DocumentValidator()
+    is_valid, results, message = validator.validate_document(create_document_bytes())
+
+    assert results is not None, message
+    assert set(results) == {'ela_score', 'noise_score', 'text_quality', 'resolution_score'}
+    assert isinstance(is_valid, bool)
+
+
+def test_small_image_is_scored_at_full_resolution():
+    """Images that already fit the screening size are not downscaled"""
+    validator = DocumentValidator()
+    analysis = validator.analyze(create_document_bytes())
+
+    assert analysis['analysis_path']['decided_at'] == 'full_resolution'
+    assert analysis['analysis_path']['escalated'] is False
+    assert analysis['analysis_path']['screening_scale'] == 1.0
+
+
+def test_large_image_screened_on_pyramid_level():
+    """Scores far from every threshold are taken from the downscaled level"""
+    validator = DocumentValidator(screening_size=256, escalation_margin=0)
+    analysis = validator.analyze(create_document_bytes(size=(1600, 800)))
+
+    path = analysis['analysis_path']
+    assert path['decided_at'] == 'screening'
+    assert path['screening_size'] == [200, 100]
+    assert analysis['scores'] == path['screening_scores']
+
+
+def test_near_threshold_escalates_to_full_resolution():
+    """A screening score near a threshold is re-checked at full resolution"""
+    validator = DocumentValidator(screening_size=256, escalation_margin=1000)
+    image_bytes = create_document_bytes(size=(1600, 800))
+    analysis = validator.analyze(image_bytes)
+
+    path = analysis['analysis_path']
+    assert path['escalated'] is True
+    assert path['decided_at'] == 'full_resolution'
+    assert path['near_threshold']
+    full = DocumentValidator(multi_resolution=False).analyze(image_bytes)
+    assert analysis['scores'] == full['scores']
+    assert analysis['heatmaps'] == full['heatmaps']
+
+
+def test_escalation_extracts_full_resolution_features_once(monkeypatch):
+    """Escalating reuses the features the full-resolution checks already computed"""
+    validator = DocumentValidator(screening_size=256, escalation_margin=1000)
+    extracted = []
+    extract = validator._extract_features
+    monkeypatch.setattr(validator, '_extract_features', lambda image: extracted.append(image.shape[:2]) or extract(image))
+
+    analysis = validator.analyze(create_document_bytes(size=(1600, 800)))
+
+    assert analysis['analysis_path']['escalated'] is True
+    assert extracted.count((800, 1600)) == 1
+
+
+def create_scan_array(size=(2400, 1800)):
+    """A page of small text filling a large scan"""
+    img = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(img)
+    for line in range(20, size[1] - 20, 14):
+        draw.text((20, line), "Business Name Registration No. 6559081 " * 6, fill='black')
+    return np.array(img)
+
+
+@pytest.mark.parametrize('degrade', ['none', 'blur_5', 'blur_9', 'low_resolution'])
+def test_screening_agrees_with_full_resolution(degrade):
+    """Blur and upscaling hidden by the pyramid level still fail the scan"""
+    image_np = create_scan_array()
+    if degrade.startswith('blur'):
+        kernel = int(degrade.split('_')[1])
+        image_np = cv2.GaussianBlur(image_np, (kernel, kernel), 0)
+    elif degrade == 'low_resolution':
+        small = cv2.resize(image_np, (480, 360), interpolation=cv2.INTER_AREA)
+        image_np = cv2.resize(small, (2400, 1800))
+
+    screened = DocumentValidator()._analyze_image(image_np)
+    full = DocumentValidator(multi_resolution=False)._analyze_image(image_np)
+
+    assert screened['analysis_path']['decided_at'] == 'screening'
+    assert screened['is_valid'] == full['is_valid']
+    assert full['is_valid'] == (degrade in ('none', 'blur_5'))
+    for check in DocumentValidator.FULL_RESOLUTION_CHECKS:
+        assert screened['scores'][check] == full['scores'][check]
+
+
+def test_analysis_localises_noisy_patch():
+    """Outlier tiles are returned as fraud areas with the tile heatmap"""
+    analysis = DocumentValidator().analyze(create_document_bytes())
+
+    assert analysis['heatmaps'][0]['grid'] == [12, 25]
+    area = analysis['fraud_areas'][0]
+    assert (area['x'], area['y'], area['width'], area['height']) == (12.0, 24.0, 16.0, 32.0)
+
+
+def test_memory_mapped_file_matches_bytes(tmp_path):
+    """Path-based loading gives the same scores as the bytes entry point"""
+    image_bytes = create_document_bytes()
+    path = tmp_path / 'scan.png'
+    path.write_bytes(image_bytes)
+    validator = DocumentValidator()
+
+    assert validator.analyze_file(str(path))['scores'] == validator.analyze(image_bytes)['scores']
+
+
+def test_memory_mapped_file_rejects_undecodable_data(tmp_path):
+    """Files that are empty or not images are reported, not raised"""
+    empty = tmp_path / 'empty.png'
+    empty.write_bytes(b'')
+    garbage = tmp_path / 'garbage.png'
+    garbage.write_bytes(b'not an image')
+    validator = DocumentValidator()
+
+    assert validator.analyze_file(str(empty))['scores'] is None
+    assert validator.analyze_file(str(garbage))['scores'] is None
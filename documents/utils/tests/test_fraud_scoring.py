@@ -0,0 +1,113 @@
+# documents/utils/tests/test_fraud_scoring.py
+import cv2
+import joblib
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from sklearn.linear_model import LogisticRegression
+
+from documents.utils.fraud_detection import detect_fraud
+from documents.utils.fraud_scoring import FraudScoringEngine, WeightedModel, SklearnModel, load_model
+
+
+def scan_image():
+    img = Image.new('RGB', (800, 400), 'white')
+    draw = ImageDraw.Draw(img)
+    for y in range(20, 380, 30):
+        draw.text((30, y), "Certificate of Business Name Registration No. 6559081", fill='black')
+    return np.array(img)
+
+
+@pytest.fixture
+def documents(tmp_path):
+    paths = []
+    for name in ('DTI_REG123456_2025-01-15.png', 'scan_0001.png'):
+        path = tmp_path / name
+        Image.fromarray(scan_image()).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_same_file_gets_same_scores(documents):
+    """Re-running detection does not change the scores"""
+    first = [detect_fraud(path, 'dti_sec') for path in documents]
+    second = [detect_fraud(path, 'dti_sec') for path in documents]
+
+    for a, b in zip(first, second):
+        assert a['confidence_score'] == b['confidence_score']
+        assert a['fraud_probability'] == b['fraud_probability']
+
+
+def test_invalid_filename_scores_higher_fraud(documents):
+    """The naming convention weighs most in the default model"""
+    valid, invalid = (detect_fraud(path, 'dti_sec') for path in documents)
+
+    assert valid['is_valid'] and not invalid['is_valid']
+    assert valid['fraud_probability'] < 0.1 < 0.7 < invalid['fraud_probability']
+
+
+def test_fraud_areas_returned_whatever_the_filename(documents):
+    """Areas come from the content, so a well-named file keeps them too"""
+    valid, invalid = (detect_fraud(path, 'dti_sec') for path in documents)
+
+    assert isinstance(valid['fraud_areas'], list)
+    assert valid['fraud_areas'] == invalid['fraud_areas']
+    assert 'fraud_indicators' not in valid
+
+
+def test_image_content_moves_the_score(tmp_path):
+    """Under the same name, a blurred copy of a scan scores higher fraud than the sharp original"""
+    sharp_dir, blurred_dir = tmp_path / 'sharp', tmp_path / 'blurred'
+    sharp_dir.mkdir()
+    blurred_dir.mkdir()
+    name = 'DTI_REG123456_2025-01-15.png'
+    Image.fromarray(scan_image()).save(sharp_dir / name)
+    Image.fromarray(cv2.GaussianBlur(scan_image(), (9, 9), 0)).save(blurred_dir / name)
+
+    sharp = detect_fraud(str(sharp_dir / name), 'dti_sec')
+    blurred = detect_fraud(str(blurred_dir / name), 'dti_sec')
+
+    assert blurred['features']['blur'] > sharp['features']['blur'] == 0.0
+    assert blurred['fraud_probability'] > sharp['fraud_probability']
+    assert blurred['image_scores']['text_quality'] < sharp['image_scores']['text_quality']
+
+
+def test_batch_scoring_matches_single_scores():
+    """A feature matrix is scored in one call with the same results"""
+    engine = FraudScoringEngine(WeightedModel())
+    matrix = np.array([
+        [1, 1, 1, 1, 0, 0.01, 0.1, 0, 0],
+        [0, 0, 0, 1, 0, 0.02, 0.3, 0.5, 0.2],
+        [0, 0, 0, 0, 1, 1.5, 2.0, 1, 1],
+    ], dtype=float)
+
+    batch = engine.score_batch(matrix)
+
+    assert batch.shape == (3,)
+    assert [float(engine.score_batch(row)[0]) for row in matrix] == batch.tolist()
+
+
+def test_unregistered_feature_rejected():
+    """A model cannot ask for a feature no extractor provides"""
+    with pytest.raises(ValueError):
+        FraudScoringEngine(WeightedModel(weights={'pixel_magic': 1.0}))
+
+
+def test_trained_model_loaded_from_joblib(tmp_path):
+    """A saved scikit-learn model replaces the weighted model"""
+    features = ['format_match', 'empty_file']
+    X = np.array([[1, 0], [1, 0], [0, 0], [0, 1]], dtype=float)
+    y = np.array([0, 0, 1, 1])
+    path = tmp_path / 'fraud.joblib'
+    joblib.dump({'model': LogisticRegression(random_state=0).fit(X, y), 'features': features}, path)
+
+    model = load_model(str(path))
+
+    assert isinstance(model, SklearnModel)
+    engine = FraudScoringEngine(model)
+    genuine, forged = engine.score_batch(np.array([[1, 0], [0, 1]]))
+    assert genuine < 0.5 < forged
+
+
+def test_missing_model_falls_back_to_weights(tmp_path):
+    assert isinstance(load_model(str(tmp_path / 'missing.joblib')), WeightedModel)
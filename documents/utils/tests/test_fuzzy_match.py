@@ -0,0 +1,43 @@
+# documents/utils/tests/test_fuzzy_match.py
+from documents.utils.fuzzy_match import (
+    NGramIndex, normalize, normalize_business_name, normalize_registration_number, similarity, trigrams, dice
+)
+
+
+def test_normalisation():
+    assert normalize("  Bumpz   Auto-Accessories, Shop ") == 'bumpz auto accessories shop'
+    assert normalize("Niño's Café") == 'nino s cafe'
+    assert normalize_business_name("Bumpz Auto Co., Inc.") == 'bumpz auto'
+    assert normalize_registration_number('reg-655 9081') == 'REG6559081'
+
+
+def test_similarity_tolerates_order_and_typos():
+    assert similarity('juan dela cruz', 'dela cruz juan') == 1.0
+    assert similarity('12 rizal street poblacion', '12 rizal st poblacion') > 0.8
+    assert similarity('bumpz auto', 'golden bakery') < 0.3
+    assert similarity('', '') == 0.0
+
+
+def test_index_search_matches_pairwise_trigram_score():
+    """Posting-list counts give the same score as comparing the strings"""
+    index = NGramIndex()
+    names = ['bumpz auto accessories', 'bumps auto accessory', 'golden bakery', 'auto bumpz accessories']
+    for key, name in enumerate(names):
+        index.add(key, name)
+
+    results = dict(index.search('bumpz auto accessories', threshold=0.5))
+
+    assert set(results) == {0, 1, 3}
+    for key, score in results.items():
+        assert score == dice(trigrams('bumpz auto accessories'), trigrams(names[key]))
+
+
+def test_index_entries_replaced_and_removed():
+    index = NGramIndex()
+    index.add('a', 'bumpz auto')
+    index.add('a', 'golden bakery')
+    assert index.search('bumpz auto', threshold=0.5) == []
+
+    index.remove('a')
+    assert len(index) == 0
+    assert index.search('golden bakery') == []
@@ -0,0 +1,64 @@
+# documents/utils/tests/test_model_registry.py
+import threading
+
+from documents.utils.model_registry import ModelRegistry, registry, preload_models
+
+
+def test_model_loaded_once_and_shared():
+    """Concurrent first requests share a single load"""
+    calls = []
+    models = ModelRegistry()
+    models.register('pipeline', lambda: calls.append(1) or object())
+
+    loaded = []
+    threads = [threading.Thread(target=lambda: loaded.append(models.get('pipeline'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(model is loaded[0] for model in loaded)
+    assert models.report()['pipeline']['loaded'] is True
+    assert models.report()['pipeline']['load_seconds'] >= 0
+
+
+def test_models_are_lazy_until_preloaded():
+    models = ModelRegistry()
+    models.register('pipeline', object)
+
+    assert models.report() == {'pipeline': {'loaded': False}}
+    assert models.preload() == {}
+    assert models.is_loaded('pipeline')
+
+
+def test_preload_reports_failures_without_raising():
+    """A missing optional dependency does not stop a worker booting"""
+    def broken():
+        raise ImportError("No module named 'spacy'")
+
+    models = ModelRegistry()
+    models.register('spacy', broken)
+    models.register('weights', dict)
+
+    assert models.preload() == {'spacy': "No module named 'spacy'"}
+    assert models.is_loaded('weights') and not models.is_loaded('spacy')
+
+
+def test_unload_forces_reload():
+    calls = []
+    models = ModelRegistry()
+    models.register('pipeline', lambda: calls.append(1) or object(), probe=lambda model: 'ok')
+
+    models.get('pipeline')
+    models.unload('pipeline')
+    assert models.probe('pipeline') == 'ok'
+    assert len(calls) == 2
+
+
+def test_worker_hook_preloads_configured_models(settings):
+    settings.MODEL_PRELOAD = ['fraud_model']
+    registry.unload('fraud_model')
+
+    assert preload_models(sender=None) == {}
+    assert registry.is_loaded('fraud_model')
@@ -0,0 +1,105 @@
+# documents/utils/tests/test_nlp_validation.py
+from types import SimpleNamespace
+
+import pytest
+
+from documents.utils.nlp_validation import NLPValidator, normalize_text, validate_address
+
+
+class FakePipeline:
+    """Stands in for a spaCy pipeline and records how it was called"""
+
+    def __init__(self, entities=None):
+        self.entities = entities or {}
+        self.calls = []
+
+    def pipe(self, texts, batch_size):
+        texts = list(texts)
+        self.calls.append(texts)
+        for text in texts:
+            ents = [SimpleNamespace(text=text, label_=label) for label in self.entities.get(text, [])]
+            yield SimpleNamespace(ents=ents)
+
+
+def test_form_validated_in_one_pipeline_pass():
+    """Every field of a form goes through a single nlp.pipe call"""
+    nlp = FakePipeline({'Juan Dela Cruz': ['PERSON']})
+    validator = NLPValidator(nlp=nlp)
+
+    results = validator.validate_form({
+        'business_name': 'Bumpz Auto Accessories Shop',
+        'owner_name': 'Juan Dela Cruz',
+        'address': '12 Rizal Street, Barangay Poblacion',
+        'owner_address': ('address', '12 Rizal Street, Barangay Poblacion'),
+    })
+
+    assert len(nlp.calls) == 1
+    # The repeated address is only analysed once
+    assert len(nlp.calls[0]) == 3
+    assert all(result['is_valid'] for result in results.values())
+    assert results['owner_name']['confidence'] == 0.95
+    assert results['owner_name']['entities'] == [('Juan Dela Cruz', 'PERSON')]
+
+
+def test_results_cached_per_normalised_string():
+    """Whitespace variants hit the cache instead of the pipeline"""
+    nlp = FakePipeline()
+    validator = NLPValidator(nlp=nlp)
+
+    validator.validate('business_name', 'Bumpz  Auto Shop')
+    validator.validate('business_name', ' Bumpz Auto Shop ')
+
+    assert nlp.calls == [['Bumpz Auto Shop']]
+    assert normalize_text('Ｂumpz\tAuto') == 'Bumpz Auto'
+
+
+def test_batch_crossing_cache_limit(monkeypatch):
+    """A batch that overflows the cache still returns its earlier hits"""
+    monkeypatch.setattr('documents.utils.nlp_validation.CACHE_SIZE', 3)
+    nlp = FakePipeline()
+    validator = NLPValidator(nlp=nlp)
+    validator.validate('business_name', 'Alpha Shop')
+
+    names = ['Alpha Shop', 'Beta Shop', 'Gamma Shop', 'Delta Shop', 'Epsilon Shop']
+    results = validator.validate_many([('business_name', name) for name in names])
+
+    assert [result['is_valid'] for result in results] == [True] * 5
+    assert nlp.calls[-1] == names[1:]
+    assert len(validator._cache) <= 3
+
+
+@pytest.mark.parametrize('field_type, text, message', [
+    ('business_name', 'ab', "Business name is too short"),
+    ('business_name', 'Fake Permits Inc.', "Business name contains prohibited word: fake"),
+    ('business_name', 'Bumpz <Shop>', "Business name contains invalid characters"),
+    ('owner_name', 'Juan', "Owner name should include a first and last name"),
+    ('owner_name', 'Juan 2nd Cruz', "Owner name contains invalid characters"),
+    ('address', 'Rizal Street', "Address should include a number"),
+])
+def test_rule_checks(field_type, text, message):
+    result = NLPValidator(nlp=FakePipeline()).validate(field_type, text)
+
+    assert result == {'is_valid': False, 'message': message, 'confidence': 0.0, 'entities': []}
+
+
+def test_address_validation_is_deterministic():
+    """The address check no longer depends on a random draw"""
+    results = {validate_address('12 Rizal Street, Barangay Poblacion') for _ in range(5)}
+
+    assert results == {(True, "Address validation confidence: 0.95")}
+
+
+def test_spacy_pipeline_batches_texts():
+    """The real pipeline, when installed, finds the entities"""
+    spacy = pytest.importorskip('spacy')
+    try:
+        nlp = spacy.load('en_core_web_sm', exclude=['parser', 'lemmatizer'])
+    except OSError:
+        pytest.skip("en_core_web_sm is not installed")
+
+    results = NLPValidator(nlp=nlp).validate_many([
+        ('owner_name', 'Juan Dela Cruz'),
+        ('address', '12 Rizal Street, Quezon City'),
+    ])
+
+    assert all(result['is_valid'] for result in results)
@@ -0,0 +1,189 @@
+# documents/utils/tests/test_ocr_engine.py
+import re
+import sys
+import types
+import pytest
+from pathlib import Path
+from PIL import Image, ImageDraw
+
+from documents.utils import ocr, ocr_pool
+from documents.models import Document
+from documents.utils.ocr import (
+    extract_text_from_document, extract_fields_from_text,
+    classify_filename, classify_filenames, is_valid_document_format
+)
+from documents.utils.ocr_pool import (
+    TesseractPool, TesserocrEngine, PytesseractEngine, create_engine, crop_region,
+    parse_tesseract_config, tesseract_available
+)
+
+requires_tesseract = pytest.mark.skipif(not tesseract_available(), reason="Tesseract is not installed")
+
+# One conforming filename per document type
+SAMPLE_FILENAMES = {
+    'dti_sec': 'DTI_REG123456_2025-01-15.pdf',
+    'lease': 'LEASE_2025-01-15_Bumpz.pdf',
+    'title': 'TCT445566_Bumpz.pdf',
+    'consent': 'CONSENT_Bumpz_2025-01-15.pdf',
+    'signage': 'SIGNAGE_Bumpz.jpg',
+    'fire_cert': 'FIRE_CERT_2025-01-15.pdf',
+    'zoning': 'ZONING_Bumpz.pdf',
+    'hoa': 'HOA_PERMIT_Bumpz.pdf',
+    'occupancy': 'OCCUPANCY_Bumpz.pdf',
+    'sanitary': 'SANITARY_Bumpz_2025.pdf',
+    'barangay': 'BRGY_CLEARANCE_Bumpz.pdf',
+    'gross_receipt': 'GROSS_RECEIPT_2024.pdf',
+    'sale_deed': 'DEED_SALE_Bumpz.pdf',
+    'transfer': 'TRANSFER_Bumpz_2025-01-15.pdf',
+    'closure': 'CLOSURE_Bumpz_2025-01-15.pdf',
+    'board_resolution': 'BOARD_RES_Bumpz_2025-01-15.pdf',
+}
+
+
+def search_fields(filename):
+    """Field extraction as separate searches, the way it ran before the combined classifier"""
+    fields = {}
+    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
+    if date_match:
+        fields['date'] = date_match.group(1)
+    name_match = re.search(r'([A-Za-z]+)_', filename)
+    if name_match:
+        fields['business_name'] = name_match.group(1)
+    reg_match = re.search(r'(REG\d+)', filename)
+    if reg_match:
+        fields['registration_number'] = reg_match.group(1)
+    return fields
+
+
+def test_filename_mode_parses_filename():
+    """The fast fallback keeps the filename simulation"""
+    result = extract_text_from_document('/media/DTI_REG123456_2025-01-15.pdf', mode='filename')
+
+    assert result['text'] == "Extracted content from DTI_REG123456_2025-01-15.pdf"
+    assert result['extracted_fields'] == {
+        'date': '2025-01-15',
+        'business_name': 'DTI',
+        'registration_number': 'REG123456',
+    }
+
+
+def test_falls_back_to_filename_without_tesseract(monkeypatch):
+    """Real OCR mode degrades to the simulator when tesseract is missing"""
+    monkeypatch.setattr(ocr, 'tesseract_available', lambda: False)
+    result = extract_text_from_document('/media/BRGY_CLEARANCE_Bumpz.pdf', mode='tesseract')
+
+    assert result['text'] == "Extracted content from BRGY_CLEARANCE_Bumpz.pdf"
+
+
+def test_fields_extracted_from_ocr_text():
+    """Key fields are found in recognised text"""
+    text = (
+        "Certificate of Business Name Registration\n"
+        "Business Name No. 6559081\n"
+        "Business Trade Name: BUMPZ AUTO ACCESSORIES SHOP\n"
+        "Issued on March 14, 2025\n"
+    )
+
+    assert extract_fields_from_text(text) == {
+        'date': 'March 14, 2025',
+        'registration_number': '6559081',
+        'business_name': 'BUMPZ AUTO ACCESSORIES SHOP',
+    }
+
+
+def test_classifier_covers_every_document_type():
+    """Each type's naming convention is recognised, and only that type's"""
+    for document_type, _ in Document.DOCUMENT_TYPES:
+        filename = SAMPLE_FILENAMES[document_type]
+        assert classify_filename(filename)['document_type'] == document_type
+        assert is_valid_document_format(filename, document_type)
+        assert not is_valid_document_format(filename, 'unknown_type')
+
+
+def test_classifier_matches_separate_searches():
+    """The single match extracts the same fields as separate searches"""
+    filenames = list(SAMPLE_FILENAMES.values()) + ['scan.pdf', 'REG2025-01-15_x.pdf', 'abc1_Shop_REG9_x.pdf']
+    results = classify_filenames(filenames)
+
+    assert len(results) == len(filenames)
+    for filename, result in zip(filenames, results):
+        assert result['extracted_fields'] == search_fields(filename)
+    assert results[len(SAMPLE_FILENAMES)]['document_type'] is None
+
+
+def test_region_cropped_in_percent():
+    """Regions of interest use the same percent rectangles as fraud_areas"""
+    image = Image.new('RGB', (1000, 500))
+    region = crop_region(image, {'x': 10, 'y': 20, 'width': 50, 'height': 90})
+
+    assert region.size == (500, 400)
+
+
+def test_tesserocr_engine_reads_pages_like_the_cli(monkeypatch):
+    """psm, oem and -c variables from the config reach the persistent API"""
+    calls = {}
+
+    class FakeAPI:
+        def __init__(self, **kwargs):
+            calls['init'] = kwargs
+            calls['variables'] = {}
+
+        def SetVariable(self, name, value):
+            calls['variables'][name] = value
+            return True
+
+    monkeypatch.setitem(sys.modules, 'tesserocr', types.SimpleNamespace(PyTessBaseAPI=FakeAPI))
+    config = '--psm 6 --oem=1 -c tessedit_char_whitelist=0123456789'
+    assert parse_tesseract_config(config)['psm'] == 6
+
+    engine = create_engine('eng', config)
+    assert isinstance(engine, TesserocrEngine)
+    assert calls == {'init': {'lang': 'eng', 'psm': 6, 'oem': 1},
+                     'variables': {'tessedit_char_whitelist': '0123456789'}}
+
+    # Options only the CLI understands keep the CLI engine, so results do not silently differ
+    assert isinstance(create_engine('eng', '--dpi 300'), PytesseractEngine)
+
+
+@requires_tesseract
+def test_pool_reads_regions_of_interest(tmp_path):
+    """Pool workers OCR only the requested region of the page"""
+    img = Image.new('RGB', (1200, 600), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.text((50, 50), "HEADER TEXT", fill='black')
+    draw.text((50, 400), "Business Name No. 6559081", fill='black')
+    path = tmp_path / 'page.png'
+    img.save(path)
+
+    pool = TesseractPool(size=1)
+    try:
+        text = pool.extract_text(str(path), regions={1: [{'x': 0, 'y': 50, 'width': 100, 'height': 50}]})
+    finally:
+        pool.shutdown()
+
+    assert 'HEADER' not in text
+
+
+def test_pool_uses_threads_inside_daemonic_worker(monkeypatch, tmp_path):
+    """Celery's prefork children may not start processes, so the pool runs threads with an engine each"""
+    engines = []
+
+    class FakeEngine:
+        def __init__(self, lang, config):
+            engines.append(self)
+
+        def recognize(self, image):
+            return f"page {image.size[0]}x{image.size[1]}"
+
+    monkeypatch.setattr(ocr_pool.multiprocessing, 'current_process', lambda: types.SimpleNamespace(daemon=True))
+    monkeypatch.setattr(ocr_pool, 'create_engine', FakeEngine)
+    monkeypatch.setattr(ocr_pool, '_pool', None)
+    path = tmp_path / 'page.png'
+    Image.new('RGB', (120, 80), 'white').save(path)
+
+    pool = ocr_pool.get_ocr_pool()
+    try:
+        assert pool.extract_many([str(path)] * 8) == ['page 120x80'] * 8
+    finally:
+        pool.shutdown()
+    assert 1 <= len(engines) <= pool.size
@@ -0,0 +1,62 @@
+# documents/utils/tests/test_pdf_pages.py
+import shutil
+import pytest
+from pathlib import Path
+
+from documents.utils import pdf_pages
+from documents.utils.pdf_pages import dpi_within_budget, raster_bytes, iter_pdf_pages, get_page_sizes
+
+TEST_FILES_DIR = Path(__file__).parent / 'test_files'
+
+requires_poppler = pytest.mark.skipif(
+    shutil.which('pdftoppm') is None, reason="Poppler is not installed"
+)
+
+
+def test_dpi_kept_when_page_fits_budget():
+    """A4 at 200 dpi is about 11 MB, well inside 64 MB"""
+    assert dpi_within_budget(595, 842, 200, 64 * 1024 * 1024) == 200
+
+
+def test_dpi_lowered_to_fit_budget():
+    """Oversized pages are rendered at the highest DPI that fits"""
+    budget = 8 * 1024 * 1024
+    dpi = dpi_within_budget(595, 842, 300, budget)
+
+    assert dpi < 300
+    assert raster_bytes(595 / 72 * dpi, 842 / 72 * dpi) <= budget
+    assert raster_bytes(595 / 72 * (dpi + 1), 842 / 72 * (dpi + 1)) > budget
+
+
+def test_page_sizes_parsed_from_pdfinfo(monkeypatch):
+    """Per-page sizes come from pdfinfo's page-range output"""
+    def fake_pdfinfo(pdf_path, first_page=None, last_page=None):
+        info = {'Pages': 2, 'Page size': '612 x 792 pts (letter)'}
+        if first_page:
+            info = {
+                'Pages': 2,
+                'Page    1 size': '612 x 792 pts (letter)',
+                'Page    2 size': '595.276 x 841.89 pts (A4)',
+            }
+        return info
+
+    monkeypatch.setattr(pdf_pages, 'pdfinfo_from_path', fake_pdfinfo)
+    sizes, page_count = get_page_sizes('lease_contract.pdf')
+
+    assert page_count == 2
+    assert sizes == {1: (612.0, 792.0), 2: (595.276, 841.89)}
+
+
+@requires_poppler
+def test_pages_streamed_one_at_a_time():
+    """Each page is released before the next one is rendered"""
+    report = {}
+    previous = None
+    for page_number, page in iter_pdf_pages(TEST_FILES_DIR / 'dti_registration.pdf', report=report):
+        if previous is not None:
+            with pytest.raises(ValueError):
+                previous.load()
+        previous = page
+
+    assert report['pages'] >= 1
+    assert 0 < report['peak_page_bytes'] <= report['memory_budget']
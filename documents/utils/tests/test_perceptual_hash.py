@@ -0,0 +1,68 @@
+# documents/utils/tests/test_perceptual_hash.py
+import io
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from documents.utils.perceptual_hash import BKTree, hamming, hash_file, hash_image
+
+
+def make_document(text):
+    image = Image.new('RGB', (800, 600), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((40, 40, 760, 140), fill='navy')
+    for y in range(180, 560, 40):
+        draw.text((60, y), text, fill='black')
+    return image
+
+
+def test_hashes_survive_reencoding_and_rescaling():
+    original = make_document("Barangay Clearance for Business Permit")
+    buffer = io.BytesIO()
+    original.resize((400, 300)).save(buffer, format='JPEG', quality=60)
+    buffer.seek(0)
+
+    hashes = hash_image(original)
+    copy = hash_file(buffer)
+
+    assert len(hashes['phash']) == len(hashes['dhash']) == 16
+    assert hamming(hashes['phash'], copy['phash']) <= 6
+    assert hamming(hashes['dhash'], copy['dhash']) <= 6
+
+
+def test_different_documents_are_far_apart():
+    noise = np.random.default_rng(0).integers(0, 255, (600, 800), dtype=np.uint8)
+    assert hamming(
+        hash_image(make_document("Barangay Clearance"))['phash'],
+        hash_image(Image.fromarray(noise))['phash'],
+    ) > 16
+
+
+def test_bk_tree_search_matches_linear_scan():
+    rng = random.Random(7)
+    hashes = {key: f'{rng.getrandbits(64):016x}' for key in range(500)}
+    query = hashes[0]
+    # A few close variants of the query
+    for key, bits in enumerate((1, 3, 5), start=500):
+        hashes[key] = f'{int(query, 16) ^ ((1 << bits) - 1):016x}'
+    tree = BKTree()
+    for key, value in hashes.items():
+        tree.add(key, value)
+
+    for radius in (0, 5, 20):
+        expected = {key for key, value in hashes.items() if hamming(query, value) <= radius}
+        assert {key for key, _ in tree.search(query, radius)} == expected
+
+
+def test_bk_tree_keys_replaced_and_removed():
+    tree = BKTree()
+    tree.add('a', '00000000000000ff')
+    tree.add('b', '00000000000000ff')
+    tree.add('a', 'ffffffffffffffff')
+    assert tree.search('00000000000000ff', 0) == [('b', 0)]
+
+    tree.remove('b')
+    assert tree.search('00000000000000ff', 0) == []
+    assert tree.search('fffffffffffffffe', 1) == [('a', 1)]
+    assert len(tree) == 1
@@ -0,0 +1,30 @@
+# documents/utils/tests/test_result_archive.py
+import json
+
+import numpy as np
+
+from documents.utils.result_archive import pack, unpack
+
+
+def test_archive_round_trip_is_smaller_than_json():
+    rng = np.random.default_rng(0)
+    heatmap = {
+        'tile_size': 32,
+        'grid': [38, 50],
+        'ela': np.round(rng.gamma(2.0, 3.0, (38, 50)), 2).tolist(),
+        'noise': np.round(rng.gamma(2.0, 1.5, (38, 50)), 2).tolist(),
+    }
+    ocr = {'text': 'Barangay Clearance ' * 200, 'extracted_fields': {'date': '2025-03-14'}}
+
+    data = pack([heatmap], ocr)
+    restored = unpack(data)
+
+    assert len(data) < len(json.dumps({'heatmaps': [heatmap], 'ocr': ocr})) / 3
+    assert restored['ocr'] == ocr
+    assert restored['heatmaps'][0]['grid'] == [38, 50]
+    # float16 keeps about three significant digits
+    assert np.allclose(restored['heatmaps'][0]['ela'], heatmap['ela'], rtol=1e-3, atol=0.01)
+
+
+def test_empty_archive():
+    assert unpack(pack()) == {'heatmaps': [], 'ocr': None}
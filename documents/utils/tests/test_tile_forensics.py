@@ -0,0 +1,57 @@
+# documents/utils/tests/test_tile_forensics.py
+import numpy as np
+
+from documents.utils.tile_forensics import block_view, tile_statistics, locate_fraud_areas
+
+
+def create_page(tampered=True):
+    """White page with text-like strokes and, optionally, a pasted noisy patch"""
+    page = np.full((400, 800), 255, dtype=np.uint8)
+    page[::8, ::3] = 0
+    if tampered:
+        rng = np.random.default_rng(0)
+        page[128:224, 320:416] = rng.integers(0, 255, (96, 96), dtype=np.uint8)
+    return page
+
+
+def test_block_view_is_zero_copy():
+    """Tiles are strided views over the original buffer"""
+    image = np.arange(70 * 100 * 3, dtype=np.uint8).reshape(70, 100, 3)
+    blocks = block_view(image, 32)
+
+    assert blocks.shape == (2, 3, 32, 32, 3)
+    assert np.shares_memory(blocks, image)
+    assert np.array_equal(blocks[1, 2], image[32:64, 64:96])
+
+
+def test_tile_statistics_match_per_tile_loop():
+    """Vectorised reduction gives the per-tile mean and std"""
+    rng = np.random.default_rng(1)
+    ela = rng.integers(0, 50, (96, 128, 3), dtype=np.uint8)
+    noise = rng.integers(0, 50, (96, 128), dtype=np.uint8)
+
+    stats = tile_statistics(ela, noise, tile=32)
+
+    assert stats['ela'].shape == (3, 4)
+    assert np.isclose(stats['ela'][2, 1], ela[64:96, 32:64].mean())
+    assert np.isclose(stats['noise'][1, 3], noise[32:64, 96:128].std())
+
+
+def test_outlier_tiles_become_fraud_areas():
+    """The pasted patch is reported in percent of the page"""
+    page = create_page()
+    heatmap, areas = locate_fraud_areas(page, page, tile=32)
+
+    assert heatmap['grid'] == [12, 25]
+    assert len(areas) == 1
+    assert areas[0]['x'] == 40.0 and areas[0]['y'] == 32.0
+    assert areas[0]['width'] == 12.0 and areas[0]['height'] == 24.0
+    assert 0.5 < areas[0]['confidence'] <= 0.99
+
+
+def test_uniform_page_has_no_fraud_areas():
+    """No tile stands out on an untouched page"""
+    page = create_page(tampered=False)
+    _, areas = locate_fraud_areas(page, page, tile=32)
+
+    assert areas == []
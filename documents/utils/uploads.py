@@ -0,0 +1,78 @@
+# documents/utils/uploads.py
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+# Leading bytes of each accepted file type
+MAGIC_NUMBERS = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+DEFAULT_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+
+def sniff_content_type(head):
+    """Content type from a file's first bytes, or None if it is not an accepted type"""
+    for magic, content_type in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return content_type
+    return None
+
+
+class SniffingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploads to a temporary file while checking them.
+    The type is taken from the magic bytes of the first chunk, not the
+    client's Content-Type, and the size is checked as chunks arrive, so a
+    bad file is dropped before the rest of it is stored. The SHA-256 is
+    computed on the way through; the finished file carries it as
+    content_hash along with the sniffed content_type.
+
+    Rejected files are left out of request.FILES and the reason is put
+    in request.upload_errors under the field name.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = getattr(settings, 'DOCUMENT_UPLOAD_MAX_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+        if request is not None and not hasattr(request, 'upload_errors'):
+            request.upload_errors = {}
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.sniffed_type = None
+
+    def _record_error(self, message):
+        if self.request is not None:
+            self.request.upload_errors[self.field_name] = message
+
+    def _reject(self, message):
+        self._record_error(message)
+        raise SkipFile(message)
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            self.sniffed_type = sniff_content_type(raw_data)
+            if self.sniffed_type is None:
+                self._reject('Invalid file type. Only PDF and images are allowed.')
+        if start + len(raw_data) > self.max_size:
+            self._reject(f'File size must not exceed {self.max_size // (1024 * 1024)}MB')
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if file_size == 0:
+            # No chunk arrived to sniff; leave the file out of request.FILES
+            self._record_error('The uploaded file is empty.')
+            self.file.close()
+            return None
+        file = super().file_complete(file_size)
+        file.content_type = self.sniffed_type
+        file.content_hash = self.hasher.hexdigest()
+        return file
@@ -2,7 +2,9 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, FileResponse, Http404
+from django.conf import settings
+from django.utils.cache import patch_cache_control
 from django.urls import reverse
 from django.db.models import Q
 from django.core.paginator import Paginator
@@ -13,7 +15,9 @@ from .forms import DocumentUploadForm, DocumentFilterForm
 from .services.document_verification import DocumentVerificationService
 from .services.document_workflow import DocumentWorkflowService
 from .services.notification_service import NotificationService
-from applications.models import BusinessApplication
+from .services.verification_cache import VerificationCache
+from .services.renditions import RenditionService
+from applications.models import BusinessApplication, ApplicationRequirement
 
 
 @login_required
@@ -34,19 +38,13 @@ def document_upload(request, application_id):
         if form.is_valid():
             document = form.save()
 
-            # Process document through workflow (verification + notifications)
-            workflow_result = DocumentWorkflowService.process_new_document(document.id)
+            # Queue document for the workflow (verification + notifications)
+            workflow_result = DocumentWorkflowService.queue_verification(document.id)
 
-            if workflow_result['success']:
-                messages.success(
-                    request,
-                    f"Document uploaded and verification {document.verification_status}."
-                )
-            else:
-                messages.error(
-                    request,
-                    f"Document uploaded but verification failed: {workflow_result['error']}"
-                )
+            messages.success(
+                request,
+                f"Document uploaded and verification {workflow_result['verification_status']}."
+            )
 
             return redirect('applications:application_detail', pk=application_id)
     else:
@@ -118,6 +116,90 @@ def document_detail(request, document_id):
     })
 
 
+@login_required
+def verification_status(request, document_id):
+    """
+    JSON endpoint for polling the progress and result of a queued verification
+    """
+    document = get_object_or_404(Document, id=document_id)
+    if document.user != request.user and not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+
+    data = {
+        'success': True,
+        'document_id': str(document.id),
+        'verification_status': document.verification_status,
+        'progress': document.verification_progress,
+        'task_id': document.verification_task_id,
+        'result': None,
+    }
+
+    if document.verification_status != 'pending':
+        try:
+            verification = document.result
+            data['result'] = {
+                'is_valid': verification.is_valid,
+                'confidence_score': verification.confidence_score,
+                'fraud_probability': verification.fraud_probability,
+                'fraud_areas': verification.fraud_areas,
+                'processed_at': verification.processed_at.isoformat(),
+            }
+        except VerificationResult.DoesNotExist:
+            pass
+
+    return JsonResponse(data)
+
+
+def _rendition_response(field_file, rendition):
+    if rendition not in RenditionService.RENDITIONS or not field_file:
+        raise Http404("No such rendition")
+    try:
+        path = RenditionService.get(field_file, rendition)
+    except Exception:
+        raise Http404("Rendition could not be generated")
+
+    response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+    # URLs carry the original's version, so browsers may keep renditions indefinitely
+    patch_cache_control(
+        response, private=True, immutable=True,
+        max_age=getattr(settings, 'RENDITION_CACHE_SECONDS', 31536000)
+    )
+    return response
+
+
+@login_required
+def document_rendition(request, document_id, rendition):
+    """
+    Thumbnail or preview JPEG of a document's first page
+    """
+    document = get_object_or_404(Document, id=document_id)
+    if document.user != request.user and not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+    return _rendition_response(document.file, rendition)
+
+
+@login_required
+def requirement_rendition(request, requirement_id, rendition):
+    """
+    Thumbnail or preview JPEG of an uploaded application requirement
+    """
+    requirement = get_object_or_404(ApplicationRequirement, id=requirement_id)
+    if requirement.application.applicant != request.user and not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+    return _rendition_response(requirement.document, rendition)
+
+
+@login_required
+def verification_cache_stats(request):
+    """
+    JSON endpoint (staff only) with hit and miss counters of the verification cache
+    """
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+
+    return JsonResponse({'success': True, **VerificationCache.stats()})
+
+
 @login_required
 def manual_verification(request, document_id):
     """
@@ -193,7 +275,7 @@ def resubmit_document(request, document_id):
             if workflow_result['success']:
                 messages.success(
                     request,
-                    f"Document resubmitted and verification {new_document.verification_status}."
+                    f"Document resubmitted and verification {workflow_result['verification_status']}."
                 )
             else:
                 messages.error(
@@ -42,13 +42,14 @@ def application_activity_saved(sender, instance, created, **kwargs):
 @receiver(post_save, sender=VerificationResult)
 def document_verified(sender, instance, created, **kwargs):
     """Create notification when document is verified or rejected"""
-    if created or instance.tracker.has_changed('is_authentic'):
-        status = 'verified' if instance.is_authentic else 'rejected'
+    if created:
+        status = 'verified' if instance.is_valid else 'rejected'
 
         # Get the application and user
         document = instance.document
         if document.application and document.application.applicant:
             send_document_notification(
+                request=None,
                 user=document.application.applicant,
                 document=document,
                 status=status
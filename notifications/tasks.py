@@ -1,7 +1,5 @@
 # notifications/tasks.py
-from celery.schedules import crontab
-
-from celery import shared_task, app
+from celery import shared_task
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
@@ -27,11 +25,3 @@ def send_template_email(subject, template_name, context, recipient_list):
 def send_deadline_reminders():
     from django.core.management import call_command
     call_command('send_deadline_reminders')
-
-# In your Celery beat schedule (celery.py)
-app.conf.beat_schedule = {
-    'send-deadline-reminders-daily': {
-        'task': 'your_app.tasks.send_deadline_reminders',
-        'schedule': crontab(hour=9, minute=0),  # Run daily at 9:00 AM
-    },
-}
\ No newline at end of file
@@ -18,7 +18,7 @@ def create_notification(user, title, message, notification_type='info', link=Non
 
     try:
         notification = Notification.objects.create(
-            user=user,
+            recipient=user,
             title=title,
             message=message,
             notification_type=notification_type,
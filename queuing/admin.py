@@ -3,6 +3,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
 from .models import QueueSlot, QueueAppointment, QueueCounter, QueueStats
+from .services.availability import AvailabilityService
 
 
 @admin.register(QueueSlot)
@@ -13,6 +14,10 @@ class QueueSlotAdmin(admin.ModelAdmin):
     date_hierarchy = 'date'
     ordering = ['date', 'time_slot']
 
+    def get_queryset(self, request):
+        # Count each listed slot's bookings in the list query, not one query per row
+        return QueueSlot.with_booked_counts(super().get_queryset(request))
+
     def available_slots(self, obj):
         available = obj.get_available_count()
         total = obj.max_appointments
@@ -31,12 +36,14 @@ class QueueSlotAdmin(admin.ModelAdmin):
 
     def mark_as_available(self, request, queryset):
         updated = queryset.update(is_available=True)
+        AvailabilityService.invalidate()
         self.message_user(request, f"{updated} slots marked as available.")
 
     mark_as_available.short_description = "Mark selected slots as available"
 
     def mark_as_unavailable(self, request, queryset):
         updated = queryset.update(is_available=False)
+        AvailabilityService.invalidate()
         self.message_user(request, f"{updated} slots marked as unavailable.")
 
     mark_as_unavailable.short_description = "Mark selected slots as unavailable"
@@ -125,18 +132,21 @@ class QueueAppointmentAdmin(admin.ModelAdmin):
             status='completed',
             completion_time=now
         )
+        AvailabilityService.invalidate()
         self.message_user(request, f"{updated} appointments marked as completed.")
 
     mark_as_completed.short_description = "Mark selected appointments as completed"
 
     def mark_as_no_show(self, request, queryset):
         updated = queryset.filter(status='confirmed').update(status='no_show')
+        AvailabilityService.invalidate()
         self.message_user(request, f"{updated} appointments marked as no show.")
 
     mark_as_no_show.short_description = "Mark selected appointments as no show"
 
     def mark_as_cancelled(self, request, queryset):
         updated = queryset.filter(status='confirmed').update(status='cancelled')
+        AvailabilityService.invalidate()
         self.message_user(request, f"{updated} appointments marked as cancelled.")
 
     mark_as_cancelled.short_description = "Mark selected appointments as cancelled"
@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class QueuingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'queuing'
+
+    def ready(self):
+        check_shared_cache()
+        import queuing.signals
+
+
+def check_shared_cache():
+    """
+    Refuse to start outside development and tests on a per-process cache:
+    the version keys that keep each process's queue, display snapshot and
+    indexes current would never reach the other processes.
+    """
+    backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+    if backend in ('LocMemCache', 'DummyCache') and not settings.DEBUG and not getattr(settings, 'TESTING', False):
+        raise ImproperlyConfigured(
+            f"The default cache is {backend}, which is not shared between processes, and DEBUG is off. "
+            "Set CACHE_URL to a cache shared by every web, ASGI and Celery process, e.g. redis://localhost:6379/1."
+        )
@@ -0,0 +1,27 @@
+# queuing/consumers.py
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .services.queue_display import QueueDisplayService
+
+
+class QueueDisplayConsumer(AsyncJsonWebsocketConsumer):
+    """Pushes the lobby queue board to a display screen as it changes"""
+
+    async def connect(self):
+        if not self.scope['user'].is_authenticated:
+            await self.close()
+            return
+
+        await self.channel_layer.group_add(QueueDisplayService.GROUP, self.channel_name)
+        await self.accept()
+        snapshot = await database_sync_to_async(QueueDisplayService.get_snapshot)()
+        await self.send_json({'type': 'snapshot', 'board': snapshot})
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(QueueDisplayService.GROUP, self.channel_name)
+
+    async def queue_update(self, event):
+        if 'snapshot' in event:
+            await self.send_json({'type': 'snapshot', 'board': event['snapshot']})
+        else:
+            await self.send_json({'type': 'changes', 'changes': event['changes']})
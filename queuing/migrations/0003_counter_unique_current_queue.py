@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+def release_double_calls(apps, schema_editor):
+    """Leave each appointment called to one counter only, the first one"""
+    QueueCounter = apps.get_model('queuing', 'QueueCounter')
+    seen = set()
+    for counter in QueueCounter.objects.filter(current_queue__isnull=False).order_by('id'):
+        if counter.current_queue_id in seen:
+            counter.current_queue = None
+            counter.save(update_fields=['current_queue'])
+        seen.add(counter.current_queue_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('queuing', '0002_auto_20250401_1325'),
+    ]
+
+    operations = [
+        migrations.RunPython(release_double_calls, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='queuecounter',
+            constraint=models.UniqueConstraint(fields=('current_queue',), name='unique_counter_current_queue'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 # queuing/models.py
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
-from applications.models import BusinessApplication
+from applications.models import BusinessApplication, NumberSequence
 import uuid
 from datetime import datetime, timedelta
 
@@ -17,14 +18,24 @@ class QueueSlot(models.Model):
         unique_together = ('date', 'time_slot')
         ordering = ['date', 'time_slot']
 
+    @staticmethod
+    def with_booked_counts(queryset):
+        """Annotate booked_count on each slot in the same query, for lists of slots"""
+        booked = QueueAppointment.objects.filter(
+            slot_date=models.OuterRef('date'), slot_time=models.OuterRef('time_slot'), status='confirmed'
+        ).values('slot_date').annotate(count=models.Count('id')).values('count')
+        return queryset.annotate(booked_count=Coalesce(models.Subquery(booked), 0))
+
     def get_available_count(self):
         """Returns the number of available appointments in this slot"""
-        booked = QueueAppointment.objects.filter(slot_date=self.date, slot_time=self.time_slot,
-                                                 status='confirmed').count()
+        booked = getattr(self, 'booked_count', None)
+        if booked is None:
+            booked = QueueAppointment.objects.filter(slot_date=self.date, slot_time=self.time_slot,
+                                                     status='confirmed').count()
         return max(0, self.max_appointments - booked)
 
     def __str__(self):
-        return f"{self.date.strftime('%Y-%m-%d')} {self.time_slot.strftime('%H:%M')} ({self.get_available_count()} slots available)"
+        return f"{self.date.strftime('%Y-%m-%d')} {self.time_slot.strftime('%H:%M')} ({self.max_appointments} slots)"
 
 
 class QueueAppointment(models.Model):
@@ -67,19 +78,34 @@ class QueueAppointment(models.Model):
     class Meta:
         ordering = ['slot_date', 'slot_time', 'created_at']
 
+    def _number_sequence(self):
+        # Queue number: P for payment, R for release + date + sequential number
+        prefix = f"{'P' if self.appointment_type == 'payment' else 'R'}{self.slot_date.strftime('%m%d')}"
+
+        def seed():
+            # Continue after the numbers given out before the sequence existed
+            numbers = QueueAppointment.objects.filter(
+                appointment_type=self.appointment_type, slot_date=self.slot_date
+            ).values_list('queue_number', flat=True)
+            return max((int(number[len(prefix):]) for number in numbers if number[len(prefix):].isdigit()), default=0)
+
+        return f'queue:{self.appointment_type}:{self.slot_date.isoformat()}', prefix, seed
+
+    @classmethod
+    def allocate_queue_numbers(cls, appointments):
+        """Give unnumbered appointments, e.g. before bulk_create, numbers from one block per type and date"""
+        groups = {}
+        for appointment in appointments:
+            if not appointment.queue_number:
+                groups.setdefault((appointment.appointment_type, appointment.slot_date), []).append(appointment)
+        for group in groups.values():
+            key, prefix, seed = group[0]._number_sequence()
+            for appointment, number in zip(group, NumberSequence.reserve(key, len(group), seed)):
+                appointment.queue_number = f"{prefix}{number:03d}"
+
     def save(self, *args, **kwargs):
         if not self.queue_number:
-            # Generate queue number: P for payment, R for release + date + sequential number
-            prefix = 'P' if self.appointment_type == 'payment' else 'R'
-            date_str = self.slot_date.strftime('%m%d')
-
-            # Get the count of appointments for this type on this date
-            count = QueueAppointment.objects.filter(
-                appointment_type=self.appointment_type,
-                slot_date=self.slot_date
-            ).count() + 1
-
-            self.queue_number = f"{prefix}{date_str}{count:03d}"
+            QueueAppointment.allocate_queue_numbers([self])
 
         super().save(*args, **kwargs)
 
@@ -114,6 +140,12 @@ class QueueCounter(models.Model):
     current_queue = models.ForeignKey(QueueAppointment, null=True, blank=True, on_delete=models.SET_NULL,
                                       related_name='current_counter')
 
+    class Meta:
+        constraints = [
+            # Backstop for CounterService: one person is never at two counters
+            models.UniqueConstraint(fields=['current_queue'], name='unique_counter_current_queue'),
+        ]
+
     def __str__(self):
         status = "Active" if self.is_active else "Inactive"
         return f"Counter {self.counter_number} ({self.get_counter_type_display()}) - {status}"
@@ -0,0 +1,7 @@
+# queuing/routing.py
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    path('ws/queue/display/', consumers.QueueDisplayConsumer.as_asgi()),
+]
@@ -0,0 +1,135 @@
+from datetime import time, timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from ..models import QueueAppointment, QueueSlot
+
+
+class AvailabilityService:
+    """
+    Service for the appointment booking grid: how many places are left
+    in each slot of the booking window, and booking one without
+    overfilling it.
+
+    The grid is built from one grouped count of confirmed appointments
+    and the QueueSlot rows of the window, and cached until a booking,
+    cancellation or slot change bumps the version.
+    """
+
+    # Places in a slot that has no QueueSlot row, as QueueSlot.max_appointments defaults to
+    DEFAULT_CAPACITY = 5
+
+    # Days ahead, from today, that can be booked
+    WINDOW_DAYS = 7
+
+    VERSION_KEY = 'queuing:availability:version'
+
+    # Safety net for changes that bypass save(), e.g. queryset updates
+    GRID_TIMEOUT = 300
+
+    @staticmethod
+    def booking_dates(today=None):
+        """Working days in the booking window"""
+        today = today or timezone.now().date()
+        dates = (today + timedelta(days=i) for i in range(AvailabilityService.WINDOW_DAYS))
+        # Skip weekends
+        return [date for date in dates if date.weekday() < 5]
+
+    @staticmethod
+    def time_slots():
+        """Half-hour slots from 8 AM to 4 PM, without the lunch hour"""
+        return [
+            time(hour, minute)
+            for hour in range(8, 17) if hour != 12
+            for minute in (0, 30) if not (hour == 16 and minute == 30)
+        ]
+
+    @staticmethod
+    def version():
+        return cache.get_or_set(AvailabilityService.VERSION_KEY, 0, timeout=None)
+
+    @staticmethod
+    def invalidate():
+        """Make the next request rebuild the grid"""
+        cache.add(AvailabilityService.VERSION_KEY, 0, timeout=None)
+        try:
+            cache.incr(AvailabilityService.VERSION_KEY)
+        except ValueError:
+            cache.set(AvailabilityService.VERSION_KEY, 1, timeout=None)
+
+    @staticmethod
+    def build_grid(dates, time_slots):
+        """
+        {(date, time): {'booked', 'capacity', 'available'}} for every slot,
+        from one grouped count and one QueueSlot query
+        """
+        booked = {
+            (row['slot_date'], row['slot_time']): row['booked']
+            for row in QueueAppointment.objects.filter(
+                slot_date__in=dates, status='confirmed'
+            ).values('slot_date', 'slot_time').annotate(booked=Count('id'))
+        }
+        slots = {
+            (slot['date'], slot['time_slot']): slot
+            for slot in QueueSlot.objects.filter(date__in=dates).values('date', 'time_slot', 'max_appointments', 'is_available')
+        }
+
+        grid = {}
+        for date in dates:
+            for slot_time in time_slots:
+                slot = slots.get((date, slot_time))
+                capacity = slot['max_appointments'] if slot else AvailabilityService.DEFAULT_CAPACITY
+                count = booked.get((date, slot_time), 0)
+                is_open = slot['is_available'] if slot else True
+                grid[(date, slot_time)] = {
+                    'booked': count,
+                    'capacity': capacity,
+                    'available': max(0, capacity - count) if is_open else 0,
+                }
+        return grid
+
+    @staticmethod
+    def get_grid(today=None):
+        """The booking window's grid, cached per day and version"""
+        today = today or timezone.now().date()
+        key = f'queuing:availability:{today.isoformat()}:{AvailabilityService.version()}'
+        grid = cache.get(key)
+        if grid is None:
+            grid = AvailabilityService.build_grid(AvailabilityService.booking_dates(today), AvailabilityService.time_slots())
+            cache.set(key, grid, AvailabilityService.GRID_TIMEOUT)
+        return grid
+
+    @staticmethod
+    def book(application, user, appointment_type, slot_date, slot_time):
+        """
+        Book an appointment if the slot still has a place. The slot's row
+        is locked while its bookings are counted and the appointment is
+        created, so concurrent bookings cannot overfill it.
+        """
+        if (slot_date, slot_time) not in AvailabilityService.get_grid():
+            return {'success': False, 'error': "This time slot is not open for booking."}
+
+        with transaction.atomic():
+            slot, _ = QueueSlot.objects.get_or_create(
+                date=slot_date, time_slot=slot_time,
+                defaults={'max_appointments': AvailabilityService.DEFAULT_CAPACITY}
+            )
+            slot = QueueSlot.objects.select_for_update().get(pk=slot.pk)
+            booked = QueueAppointment.objects.filter(
+                slot_date=slot_date, slot_time=slot_time, status='confirmed'
+            ).count()
+            if not slot.is_available or booked >= slot.max_appointments:
+                return {'success': False, 'error': "This time slot is already fully booked. Please choose another."}
+
+            appointment = QueueAppointment.objects.create(
+                application=application,
+                applicant=user,
+                appointment_type=appointment_type,
+                slot_date=slot_date,
+                slot_time=slot_time,
+                estimated_duration=15,  # Default to 15 minutes
+                status='confirmed'
+            )
+
+        return {'success': True, 'appointment': appointment}
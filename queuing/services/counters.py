@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.utils import timezone
+from ..models import QueueAppointment, QueueCounter
+from .queue_engine import QueueEngine
+
+
+class CounterService:
+    """
+    Service for calling appointments to counters without two counters
+    ever calling the same person.
+
+    Each call runs in one transaction that locks its counter row. The
+    appointment to call is claimed by locking its row with SKIP LOCKED,
+    so counters calling at the same moment pass over each other's picks
+    instead of queueing behind one lock, and whether it is still free is
+    checked only once the lock is held.
+    """
+
+    @staticmethod
+    def _is_served(appointment):
+        # Only read once the appointment is locked: a counter that called it before has committed by now
+        return QueueCounter.objects.filter(current_queue=appointment).exists()
+
+    @staticmethod
+    def _claim_next(appointment_type):
+        # Enough candidates for every counter of this type to be calling at once
+        limit = len(QueueEngine.counters(counter_type=appointment_type, is_active=True)) + 1
+        for attempt in range(2):
+            for appointment_id in QueueEngine.waiting(appointment_type, limit):
+                appointment = QueueAppointment.objects.select_for_update(
+                    skip_locked=True, of=('self',)
+                ).select_related('application').filter(id=appointment_id, status='confirmed').first()
+                if appointment is not None and not CounterService._is_served(appointment):
+                    return appointment
+            if attempt == 0:
+                # Every candidate was taken: reload the queue in case it changed elsewhere
+                QueueEngine.invalidate()
+        return None
+
+    @staticmethod
+    def call_next(counter_id):
+        """
+        Complete the appointment at the counter and call the next one in
+        line, atomically. The result's 'appointment' is None when nobody
+        is waiting.
+        """
+        try:
+            with transaction.atomic():
+                # Calls at one counter go one at a time
+                counter = QueueCounter.objects.select_for_update().get(id=counter_id)
+
+                # Mark current appointment as completed if there is one
+                if counter.current_queue_id:
+                    current = QueueAppointment.objects.select_for_update().get(id=counter.current_queue_id)
+                    current.status = 'completed'
+                    current.completion_time = timezone.now()
+                    current.save(update_fields=['status', 'completion_time'])
+
+                appointment = CounterService._claim_next(counter.counter_type)
+                counter.current_queue = appointment
+                counter.save(update_fields=['current_queue'])
+        except QueueCounter.DoesNotExist:
+            return {
+                'success': False,
+                'error': f"Counter with ID {counter_id} not found"
+            }
+
+        return {
+            'success': True,
+            'counter': counter,
+            'appointment': appointment
+        }
+
+    @staticmethod
+    def call_specific(counter_id, appointment_id):
+        """Call a chosen appointment to a free counter, atomically"""
+        with transaction.atomic():
+            counter = QueueCounter.objects.select_for_update().filter(id=counter_id).first()
+            if counter is None:
+                return {'success': False, 'error': 'Counter not found'}
+            if counter.current_queue_id:
+                return {'success': False, 'error': 'This counter is already serving another appointment'}
+
+            appointment = QueueAppointment.objects.select_for_update().filter(id=appointment_id).first()
+            if appointment is None:
+                return {'success': False, 'error': 'Appointment not found'}
+            if CounterService._is_served(appointment):
+                return {'success': False, 'error': 'This appointment is already being served at another counter'}
+
+            counter.current_queue = appointment
+            counter.save(update_fields=['current_queue'])
+
+        return {
+            'success': True,
+            'counter': counter,
+            'appointment': appointment
+        }
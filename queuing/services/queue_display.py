@@ -0,0 +1,138 @@
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from ..models import QueueAppointment, QueueCounter
+
+logger = logging.getLogger(__name__)
+
+
+class QueueDisplayService:
+    """
+    Service behind the lobby queue screens.
+
+    Screens keep a WebSocket open in GROUP and are sent the changes to
+    the board after each queue action, instead of polling the database
+    every few seconds each. The last board sent is kept in the cache,
+    so a screen that connects is given it without a query, and the board
+    is only rebuilt when a counter or the waiting line has changed.
+    """
+
+    GROUP = 'queue_display'
+    SNAPSHOT_KEY = 'queuing:display:snapshot'
+
+    # Appointments shown under "Next in Line"
+    NEXT_IN_LINE_LIMIT = 10
+
+    ANNOUNCEMENTS = [
+        "Please be ready with your documents when your queue number is called.",
+        "Ensure you have checked in at the reception desk upon arrival.",
+        "Payment counters accept cash, checks, and bank transfers."
+    ]
+
+    @staticmethod
+    def build_snapshot():
+        """Current board: active counters keyed by id and the waiting line in order"""
+        counters = {}
+        active_counters = QueueCounter.objects.filter(
+            is_active=True
+        ).select_related('current_queue__application').order_by('id')
+
+        for counter in active_counters:
+            current = counter.current_queue
+            counters[str(counter.id)] = {
+                'counter_number': counter.counter_number,
+                'counter_type': counter.counter_type,
+                'current_queue': {
+                    'id': str(current.id),
+                    'queue_number': current.queue_number,
+                    'business_name': current.application.business_name,
+                    'check_in_time': current.check_in_time.isoformat() if current.check_in_time else None,
+                } if current else None
+            }
+
+        next_in_line = QueueAppointment.objects.filter(
+            slot_date=timezone.now().date(),
+            status='confirmed',
+            checked_in=True,
+            current_counter__isnull=True
+        ).select_related('application').order_by('check_in_time')[:QueueDisplayService.NEXT_IN_LINE_LIMIT]
+
+        return {
+            'date': timezone.now().date().isoformat(),
+            'counters': counters,
+            'next_in_line': [{
+                'id': str(appointment.id),
+                'queue_number': appointment.queue_number,
+                'business_name': appointment.application.business_name,
+                'appointment_type': appointment.appointment_type,
+                'checked_in': appointment.checked_in,
+                'check_in_time': appointment.check_in_time.isoformat() if appointment.check_in_time else None,
+            } for appointment in next_in_line],
+            'announcements': QueueDisplayService.ANNOUNCEMENTS,
+        }
+
+    @staticmethod
+    def get_snapshot():
+        """The board as last sent to the screens, building it if none was sent yet"""
+        snapshot = cache.get(QueueDisplayService.SNAPSHOT_KEY)
+        if snapshot is None or snapshot['date'] != timezone.now().date().isoformat():
+            # Yesterday's waiting line is not today's
+            snapshot = QueueDisplayService.build_snapshot()
+            cache.set(QueueDisplayService.SNAPSHOT_KEY, snapshot, None)
+        return snapshot
+
+    @staticmethod
+    def diff(old, new):
+        """
+        Changes that turn board old into board new: the counters whose
+        entry changed (None for a counter no longer active) and the
+        waiting line when it changed. Empty when the boards are equal.
+        """
+        changes = {}
+        counters = {
+            counter_id: entry
+            for counter_id, entry in new['counters'].items()
+            if old['counters'].get(counter_id) != entry
+        }
+        counters.update({
+            counter_id: None for counter_id in old['counters'] if counter_id not in new['counters']
+        })
+        if counters:
+            changes['counters'] = counters
+        if old['next_in_line'] != new['next_in_line'] or old['date'] != new['date']:
+            changes['next_in_line'] = new['next_in_line']
+        return changes
+
+    @staticmethod
+    def publish():
+        """Rebuild the board and send what changed to every connected screen"""
+        old = cache.get(QueueDisplayService.SNAPSHOT_KEY)
+        new = QueueDisplayService.build_snapshot()
+        cache.set(QueueDisplayService.SNAPSHOT_KEY, new, None)
+
+        if old is None:
+            # Nothing to compare with, e.g. after the cache was cleared: resend the whole board
+            message = {'type': 'queue.update', 'snapshot': new}
+        else:
+            changes = QueueDisplayService.diff(old, new)
+            if not changes:
+                return None
+            message = {'type': 'queue.update', 'changes': changes}
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return message
+        try:
+            async_to_sync(channel_layer.group_send)(QueueDisplayService.GROUP, message)
+        except Exception as e:
+            # Screens catch up on their next reconnect; the queue action itself succeeded
+            logger.warning(f"Could not publish queue display update: {e}")
+        return message
+
+    @staticmethod
+    def queue_changed():
+        """Publish the board once the current transaction commits"""
+        transaction.on_commit(QueueDisplayService.publish)
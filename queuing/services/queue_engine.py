@@ -0,0 +1,301 @@
+import heapq
+import threading
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from ..models import QueueAppointment, QueueCounter
+
+
+class DayQueue:
+    """
+    The queue of one service day: every confirmed appointment, the
+    counters and whom each is serving.
+
+    Each appointment type waits in two heaps, checked-in appointments by
+    (slot time, check-in time) and those not yet checked in by (slot
+    time, booking time), so the next one to call is read off a heap top.
+    Appointments that stop waiting are left in their heap and dropped
+    when they reach the top, which keeps every change O(log n).
+    """
+
+    LINES = ('checked_in', 'booked')
+
+    def __init__(self, date):
+        self.date = date
+        self.appointments = {}
+        self.counters = {}
+        # Appointment id -> id of the counter serving it
+        self._serving = {}
+        self._heaps = {}
+
+    @staticmethod
+    def _position(entry):
+        """The line an appointment waits in and its key there"""
+        if entry['checked_in']:
+            return 'checked_in', (entry['slot_time'], entry['check_in_time'] or entry['created_at'], entry['id'])
+        return 'booked', (entry['slot_time'], entry['created_at'], entry['id'])
+
+    def _is_current(self, appointment_type, line, item):
+        key, appointment_id = item
+        entry = self.appointments.get(appointment_id)
+        return (
+            entry is not None
+            and appointment_id not in self._serving
+            and entry['appointment_type'] == appointment_type
+            and self._position(entry) == (line, key)
+        )
+
+    def _push(self, entry):
+        line, key = self._position(entry)
+        heap_key = (entry['appointment_type'], line)
+        heap = self._heaps.setdefault(heap_key, [])
+        heapq.heappush(heap, (key, entry['id']))
+        if len(heap) > 2 * len(self.appointments) + 32:
+            # Mostly stale entries: rebuild the heap from the ones still waiting
+            self._heaps[heap_key] = heap = list({
+                item for item in heap if self._is_current(entry['appointment_type'], line, item)
+            })
+            heapq.heapify(heap)
+
+    def counter_of(self, appointment_id):
+        counter_id = self._serving.get(appointment_id)
+        return self.counters.get(counter_id) if counter_id is not None else None
+
+    def update_appointment(self, entry):
+        """Add, move or drop an appointment after it was saved"""
+        if entry['status'] != 'confirmed' or entry['slot_date'] != self.date:
+            self.appointments.pop(entry['id'], None)
+            return
+        previous = self.appointments.get(entry['id'])
+        self.appointments[entry['id']] = entry
+        moved = previous is None or (previous['appointment_type'], self._position(previous)) != (
+            entry['appointment_type'], self._position(entry)
+        )
+        if moved and entry['id'] not in self._serving:
+            self._push(entry)
+
+    def remove_appointment(self, appointment_id):
+        self.appointments.pop(appointment_id, None)
+
+    def update_counter(self, counter):
+        """Record a counter and a change of the appointment it serves"""
+        previous = self.counters.get(counter['id'])
+        self.counters[counter['id']] = counter
+        previous_id = previous['current_queue_id'] if previous else None
+        if previous_id == counter['current_queue_id']:
+            return
+        if previous_id and self._serving.get(previous_id) == counter['id']:
+            # Cleared or replaced: a still-confirmed appointment goes back in line
+            del self._serving[previous_id]
+            if previous_id in self.appointments:
+                self._push(self.appointments[previous_id])
+        if counter['current_queue_id']:
+            self._serving[counter['current_queue_id']] = counter['id']
+
+    def remove_counter(self, counter_id):
+        counter = self.counters.get(counter_id)
+        if counter:
+            self.update_counter(dict(counter, current_queue_id=None))
+            del self.counters[counter_id]
+
+    def next_waiting(self, appointment_type):
+        """The appointment to call next to a counter of this type, or None"""
+        for line in self.LINES:
+            heap = self._heaps.get((appointment_type, line))
+            while heap and not self._is_current(appointment_type, line, heap[0]):
+                heapq.heappop(heap)
+            if heap:
+                return self.appointments[heap[0][1]]
+        return None
+
+    def waiting(self, appointment_type, limit):
+        """The first limit appointments in the order they will be called"""
+        waiting = []
+        for line in self.LINES:
+            if len(waiting) >= limit:
+                break
+            current = {
+                item for item in self._heaps.get((appointment_type, line), ())
+                if self._is_current(appointment_type, line, item)
+            }
+            waiting += [self.appointments[item[1]] for item in heapq.nsmallest(limit - len(waiting), current)]
+        return waiting
+
+    def select(self, appointment_type=None, checked_in=None, at_counter=None, order_by='slot_time'):
+        """Confirmed appointments matching the filters, sorted by an entry field"""
+        entries = [
+            entry for entry in self.appointments.values()
+            if (appointment_type is None or entry['appointment_type'] == appointment_type)
+            and (checked_in is None or entry['checked_in'] == checked_in)
+            and (at_counter is None or (entry['id'] in self._serving) == at_counter)
+        ]
+        return sorted(entries, key=lambda entry: (entry[order_by] or entry['created_at'], entry['created_at']))
+
+
+class QueueEngine:
+    """
+    Process-wide, in-memory state of today's queue.
+
+    The database stays the durable record: the engine is loaded from it
+    once per day and then kept current write-through, every saved
+    appointment and counter being applied to it after commit (see
+    queuing.signals). Reads, such as who is next for a counter type, no
+    longer query and sort the appointments table. A version counter in
+    the cache tells processes apart: when another process changed the
+    queue, the local copy is reloaded on next use, as with the document
+    indexes. This needs a cache shared by all processes (CACHE_URL),
+    which queuing.apps checks for at startup.
+    """
+
+    VERSION_KEY = 'queuing:engine:version'
+
+    _day = None
+    _day_version = None
+    _lock = threading.RLock()
+
+    @staticmethod
+    def appointment_entry(appointment, application=None):
+        """The fields of an appointment the engine keeps"""
+        if application is None:
+            application = {
+                'id': str(appointment.application.id),
+                'business_name': appointment.application.business_name,
+                'application_number': appointment.application.application_number,
+            }
+        return {
+            'id': str(appointment.id),
+            'queue_number': appointment.queue_number,
+            'appointment_type': appointment.appointment_type,
+            'status': appointment.status,
+            'slot_date': appointment.slot_date,
+            'slot_time': appointment.slot_time,
+            'checked_in': appointment.checked_in,
+            'check_in_time': appointment.check_in_time,
+            'created_at': appointment.created_at,
+            'application': application,
+        }
+
+    @staticmethod
+    def counter_entry(counter):
+        return {
+            'id': counter.id,
+            'counter_number': counter.counter_number,
+            'counter_type': counter.counter_type,
+            'is_active': counter.is_active,
+            'current_queue_id': str(counter.current_queue_id) if counter.current_queue_id else None,
+        }
+
+    @staticmethod
+    def _load(date):
+        day = DayQueue(date)
+        for counter in QueueCounter.objects.all():
+            day.update_counter(QueueEngine.counter_entry(counter))
+        appointments = QueueAppointment.objects.filter(slot_date=date, status='confirmed').select_related('application')
+        for appointment in appointments:
+            day.update_appointment(QueueEngine.appointment_entry(appointment))
+        return day
+
+    @staticmethod
+    def get_day():
+        """Today's queue, loaded on first use, after midnight and after changes made elsewhere"""
+        version = cache.get(QueueEngine.VERSION_KEY, 0)
+        today = timezone.now().date()
+        with QueueEngine._lock:
+            day = QueueEngine._day
+            if day is None or day.date != today or QueueEngine._day_version != version:
+                QueueEngine._day = day = QueueEngine._load(today)
+                QueueEngine._day_version = version
+            return day
+
+    @staticmethod
+    def waiting(appointment_type, limit):
+        """Ids of the next appointments to call to a counter of this type, in order"""
+        with QueueEngine._lock:
+            return [entry['id'] for entry in QueueEngine.get_day().waiting(appointment_type, limit)]
+
+    @staticmethod
+    def select(**filters):
+        """Copies of today's confirmed appointments, see DayQueue.select, with the serving counter added"""
+        with QueueEngine._lock:
+            day = QueueEngine.get_day()
+            return [
+                dict(entry, current_counter=day.counter_of(entry['id']))
+                for entry in day.select(**filters)
+            ]
+
+    @staticmethod
+    def counters(**filters):
+        """Copies of the counters whose fields equal the given values, by id"""
+        with QueueEngine._lock:
+            counters = QueueEngine.get_day().counters.values()
+            return sorted(
+                (dict(counter) for counter in counters if all(counter[k] == v for k, v in filters.items())),
+                key=lambda counter: counter['id']
+            )
+
+    @staticmethod
+    def _apply(change):
+        """Run change(day) on the local queue if it is current, and announce a new version"""
+        cache.add(QueueEngine.VERSION_KEY, 0, timeout=None)
+        try:
+            version = cache.incr(QueueEngine.VERSION_KEY)
+        except ValueError:
+            # Key was evicted between add and incr; everyone reloads
+            cache.set(QueueEngine.VERSION_KEY, 1, timeout=None)
+            version = None
+
+        with QueueEngine._lock:
+            if QueueEngine._day is None:
+                return
+            if version is None or version != QueueEngine._day_version + 1:
+                # Another process changed the queue too; reload on next use
+                QueueEngine._day = None
+                return
+            change(QueueEngine._day)
+            QueueEngine._day_version = version
+
+    @staticmethod
+    def appointment_changed(appointment, deleted=False):
+        """Apply a saved or deleted appointment once the transaction commits"""
+        appointment_id = str(appointment.id)
+        day = QueueEngine._day
+        known = day.appointments.get(appointment_id) if day is not None else None
+        joining = not deleted and appointment.status == 'confirmed' and appointment.slot_date == timezone.now().date()
+        if known is None and not joining and (day is not None or appointment.slot_date != timezone.now().date()):
+            # Neither in today's queue nor joining it
+            return
+
+        if deleted:
+            transaction.on_commit(lambda: QueueEngine._apply(lambda d: d.remove_appointment(appointment_id)))
+            return
+
+        # Leaving the queue needs no application details; joining it loads them once
+        application = known['application'] if known else (None if joining else {})
+        entry = QueueEngine.appointment_entry(appointment, application)
+        transaction.on_commit(lambda: QueueEngine._apply(lambda d: d.update_appointment(entry)))
+
+    @staticmethod
+    def counter_changed(counter, deleted=False):
+        """Apply a saved or deleted counter once the transaction commits"""
+        if deleted:
+            counter_id = counter.id
+            transaction.on_commit(lambda: QueueEngine._apply(lambda d: d.remove_counter(counter_id)))
+            return
+        entry = QueueEngine.counter_entry(counter)
+        transaction.on_commit(lambda: QueueEngine._apply(lambda d: d.update_counter(entry)))
+
+    @staticmethod
+    def invalidate():
+        """Make every process reload the queue, after changes that bypass save()"""
+        cache.add(QueueEngine.VERSION_KEY, 0, timeout=None)
+        try:
+            cache.incr(QueueEngine.VERSION_KEY)
+        except ValueError:
+            cache.set(QueueEngine.VERSION_KEY, 1, timeout=None)
+        QueueEngine.reset()
+
+    @staticmethod
+    def reset():
+        with QueueEngine._lock:
+            QueueEngine._day = None
+            QueueEngine._day_version = None
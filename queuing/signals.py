@@ -0,0 +1,51 @@
+# queuing/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from .models import QueueAppointment, QueueCounter, QueueSlot
+from .services.availability import AvailabilityService
+from .services.queue_engine import QueueEngine
+
+QUEUE_FIELDS = {'status', 'slot_date', 'slot_time', 'appointment_type', 'checked_in', 'check_in_time', 'queue_number'}
+COUNTER_FIELDS = {'counter_number', 'counter_type', 'is_active', 'current_queue'}
+BOOKING_FIELDS = {'status', 'slot_date', 'slot_time'}
+
+
+@receiver(post_save, sender=QueueAppointment)
+def track_appointment(sender, instance, update_fields=None, **kwargs):
+    """Write appointment changes through to the in-memory queue"""
+    if update_fields is not None and not QUEUE_FIELDS.intersection(update_fields):
+        return
+    QueueEngine.appointment_changed(instance)
+
+
+@receiver(post_delete, sender=QueueAppointment)
+def untrack_appointment(sender, instance, **kwargs):
+    QueueEngine.appointment_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=QueueCounter)
+def track_counter(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not COUNTER_FIELDS.intersection(update_fields):
+        return
+    QueueEngine.counter_changed(instance)
+
+
+@receiver(post_delete, sender=QueueCounter)
+def untrack_counter(sender, instance, **kwargs):
+    QueueEngine.counter_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=QueueAppointment)
+def track_booking(sender, instance, update_fields=None, **kwargs):
+    """Rebuild the availability grid after a booking, cancellation or move"""
+    if update_fields is not None and not BOOKING_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(AvailabilityService.invalidate)
+
+
+@receiver(post_delete, sender=QueueAppointment)
+@receiver(post_save, sender=QueueSlot)
+@receiver(post_delete, sender=QueueSlot)
+def untrack_booking(sender, **kwargs):
+    transaction.on_commit(AvailabilityService.invalidate)
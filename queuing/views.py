@@ -9,6 +9,10 @@ from django.utils import timezone
 from django.db.models import Count, Avg, F, Q
 from datetime import datetime, timedelta
 from .models import QueueSlot, QueueAppointment, QueueCounter, QueueStats
+from .services.availability import AvailabilityService
+from .services.counters import CounterService
+from .services.queue_display import QueueDisplayService
+from .services.queue_engine import QueueEngine
 from applications.models import BusinessApplication, ApplicationAssessment
 from notifications.utils import create_notification
 from django.urls import reverse
@@ -85,55 +89,31 @@ def book_appointment(request, application_id, appointment_type):
                          f"You already have a {appointment_type} appointment scheduled on {existing.slot_date} at {existing.slot_time.strftime('%I:%M %p')}")
         return redirect('queuing:appointment_detail', appointment_id=existing.id)
 
-    # Get available dates for the next 7 days
+    # Working days of the next week, with the places left in each slot
     today = timezone.now().date()
-    slot_dates = []
+    slot_dates = AvailabilityService.booking_dates(today)
+    availability = AvailabilityService.get_grid(today)
 
-    # Generate dates (exclude weekends)
-    for i in range(7):
-        check_date = today + timedelta(days=i)
-        # Skip weekends
-        if check_date.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-            continue
-        slot_dates.append(check_date)
-
-    # Manually create time slots
     time_slots = []
     all_available_slots = []
+    for slot_time in AvailabilityService.time_slots():
+        # Format for display
+        display_hour = slot_time.hour if slot_time.hour <= 12 else slot_time.hour - 12
+        am_pm = "AM" if slot_time.hour < 12 else "PM"
+
+        time_slots.append({
+            'value': slot_time.strftime('%H:%M'),
+            'display': f"{display_hour}:{slot_time.minute:02d} {am_pm}"
+        })
 
-    # Create time slots from 8 AM to 4:30 PM
-    for hour in range(8, 17):  # 8 AM to 4 PM
-        # Skip lunch hour (12 PM)
-        if hour == 12:
-            continue
-
-        for minute in [0, 30]:
-            # Skip 4:30 PM
-            if hour == 16 and minute == 30:
-                continue
-
-            # Format for display
-            display_hour = hour if hour <= 12 else hour - 12
-            am_pm = "AM" if hour < 12 else "PM"
-
-            time_slots.append({
-                'value': f"{hour:02d}:{minute:02d}",
-                'display': f"{display_hour}:{minute:02d} {am_pm}"
+        for date in slot_dates:
+            all_available_slots.append({
+                'date': date.strftime('%Y-%m-%d'),
+                'time': slot_time.strftime('%H:%M'),
+                'available': availability[(date, slot_time)]['available'],
+                'datetime_str': f"{date.strftime('%Y-%m-%d')} {slot_time.strftime('%H:%M')}"
             })
 
-            # Create available slots for each date and time
-            for date in slot_dates:
-                # For now, assume 5 slots are available for each time
-                available_count = 5
-
-                # Add to available slots list
-                all_available_slots.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'time': f"{hour:02d}:{minute:02d}",
-                    'available': available_count,
-                    'datetime_str': f"{date.strftime('%Y-%m-%d')} {hour:02d}:{minute:02d}"
-                })
-
     if request.method == 'POST':
         selected_date = request.POST.get('date')
         selected_time = request.POST.get('time')
@@ -148,19 +128,15 @@ def book_appointment(request, application_id, appointment_type):
             selected_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
             selected_time = datetime.strptime(selected_time, '%H:%M').time()
 
-            # Create queue appointment
-            appointment = QueueAppointment.objects.create(
-                application=application,
-                applicant=request.user,
-                appointment_type=appointment_type,
-                slot_date=selected_date,
-                slot_time=selected_time,
-                estimated_duration=15,  # Default to 15 minutes
-                status='confirmed'
-            )
+            # Create queue appointment, if the slot still has a place
+            result = AvailabilityService.book(application, request.user, appointment_type, selected_date, selected_time)
+            if not result['success']:
+                messages.error(request, result['error'])
+                return redirect('queuing:book_appointment', application_id=application.id,
+                                appointment_type=appointment_type)
 
             messages.success(request, "Appointment booked successfully!")
-            return redirect('queuing:appointment_detail', appointment_id=appointment.id)
+            return redirect('queuing:appointment_detail', appointment_id=result['appointment'].id)
 
         except Exception as e:
             print(f"Error booking appointment: {str(e)}")
@@ -338,42 +314,17 @@ def call_next(request, counter_id):
     if not request.user.is_staff:
         return JsonResponse({'error': 'Permission denied'}, status=403)
 
-    counter = get_object_or_404(QueueCounter, id=counter_id)
-
-    # Mark current appointment as completed if there is one
-    if counter.current_queue:
-        current = counter.current_queue
-        current.status = 'completed'
-        current.completion_time = timezone.now()
-        current.save()
-
-    # Get next appointment from queue
-    next_appointment = QueueAppointment.objects.filter(
-        slot_date=timezone.now().date(),
-        appointment_type=counter.counter_type,
-        status='confirmed',
-        checked_in=True,
-        current_counter__isnull=True
-    ).order_by('slot_time', 'check_in_time').first()
+    # Complete the current appointment and take the next one from the queue in one step:
+    # checked in first, then anyone who hasn't checked in yet
+    result = CounterService.call_next(counter_id)
+    if not result['success']:
+        return JsonResponse({'error': result['error']}, status=404)
+    QueueDisplayService.queue_changed()
 
+    counter = result['counter']
+    next_appointment = result['appointment']
     if not next_appointment:
-        # Try to find any appointment that hasn't checked in yet
-        next_appointment = QueueAppointment.objects.filter(
-            slot_date=timezone.now().date(),
-            appointment_type=counter.counter_type,
-            status='confirmed',
-            checked_in=False,
-            current_counter__isnull=True
-        ).order_by('slot_time', 'created_at').first()
-
-        if not next_appointment:
-            counter.current_queue = None
-            counter.save()
-            return JsonResponse({'message': 'No more appointments in queue'})
-
-    # Assign appointment to counter
-    counter.current_queue = next_appointment
-    counter.save()
+        return JsonResponse({'message': 'No more appointments in queue'})
 
     # Create notification
     create_notification(
@@ -426,6 +377,7 @@ def check_in(request, appointment_id):
     appointment.checked_in = True
     appointment.check_in_time = timezone.now()
     appointment.save(update_fields=['checked_in', 'check_in_time'])  # Only update these specific fields
+    QueueDisplayService.queue_changed()
 
     # Create notification for the applicant
     try:
@@ -616,6 +568,7 @@ def check_in_by_queue(request):
         appointment.checked_in = True
         appointment.check_in_time = timezone.now()
         appointment.save(update_fields=['checked_in', 'check_in_time'])  # Only update these specific fields
+        QueueDisplayService.queue_changed()
 
         # Create notification for the applicant
         try:
@@ -693,76 +646,38 @@ def queue_display(request):
 
 @login_required
 def queue_display_data(request):
-    """API endpoint to get current queue data for the display"""
+    """
+    API endpoint to get current queue data for the display. Screens
+    normally get updates over the queue WebSocket; this serves the same
+    board, without touching the database, to screens that fall back to
+    polling.
+    """
     if request.headers.get('x-requested-with') != 'XMLHttpRequest':
         return JsonResponse({'error': 'AJAX request required'}, status=400)
 
-    # Get active counters with current appointments
-    active_counters_data = []
-    active_counters = QueueCounter.objects.filter(
-        is_active=True
-    ).select_related('current_queue__application')
-
-    for counter in active_counters:
-        counter_data = {
-            'counter_number': counter.counter_number,
-            'counter_type': counter.counter_type,
-            'current_queue': None
-        }
-
-        if counter.current_queue:
-            # Check if this appointment was called within the last minute (for blinking effect)
-            recently_called = False
-            if counter.current_queue.check_in_time:
-                time_difference = timezone.now() - counter.current_queue.check_in_time
-                recently_called = time_difference.total_seconds() < 60
-
-            counter_data['current_queue'] = {
-                'id': str(counter.current_queue.id),
-                'queue_number': counter.current_queue.queue_number,
-                'business_name': counter.current_queue.application.business_name,
-                'recently_called': recently_called
-            }
+    board = QueueDisplayService.get_snapshot()
+    now = timezone.now()
 
-        active_counters_data.append(counter_data)
+    def is_recent(check_in_time):
+        # Called or checked in within the last minute (for the blinking and highlight effects)
+        return bool(check_in_time) and (now - datetime.fromisoformat(check_in_time)).total_seconds() < 60
 
-    # Get next in line appointments (checked in but not yet called)
-    today = timezone.now().date()
-    next_in_line_data = []
-    next_in_line = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed',
-        checked_in=True,
-        current_counter__isnull=True
-    ).select_related('application').order_by('check_in_time')[:10]  # Show top 10
-
-    for appointment in next_in_line:
-        # Check if this appointment was checked in within the last minute (for highlight effect)
-        recently_added = False
-        if appointment.check_in_time:
-            time_difference = timezone.now() - appointment.check_in_time
-            recently_added = time_difference.total_seconds() < 60
-
-        next_in_line_data.append({
-            'id': str(appointment.id),
-            'queue_number': appointment.queue_number,
-            'business_name': appointment.application.business_name,
-            'appointment_type': appointment.appointment_type,
-            'checked_in': appointment.checked_in,
-            'recently_added': recently_added
-        })
-
-    # Add any announcements if needed
-    announcements = [
-        "Please be ready with your documents when your queue number is called.",
-        "Ensure you have checked in at the reception desk upon arrival.",
-        "Payment counters accept cash, checks, and bank transfers."
+    active_counters_data = []
+    for counter in board['counters'].values():
+        current = counter['current_queue']
+        active_counters_data.append(dict(counter, current_queue=dict(
+            current, recently_called=is_recent(current['check_in_time'])
+        ) if current else None))
+
+    next_in_line_data = [
+        dict(appointment, recently_added=is_recent(appointment['check_in_time']))
+        for appointment in board['next_in_line']
     ]
 
     return JsonResponse({
         'active_counters': active_counters_data,
         'next_in_line': next_in_line_data,
-        'announcements': announcements
+        'announcements': board['announcements']
     })
 
 
@@ -773,52 +688,20 @@ def queue_management(request):
         messages.error(request, "You don't have permission to access this page")
         return redirect('home')
 
-    today = timezone.now().date()
-
     # Get active counters
     counters = QueueCounter.objects.filter(
         is_active=True
     ).select_related('current_queue__application')
 
-    # Get waiting queue
-    waiting_queue = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed',
-        checked_in=True,
-        current_counter__isnull=True
-    ).select_related('application').order_by('check_in_time')
-
-    # Statistics
-    total_appointments = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed'
-    ).count()
-
-    checked_in_count = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed',
-        checked_in=True
-    ).count()
-
-    now_serving_count = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed',
-        checked_in=True,
-        current_counter__isnull=False
-    ).count()
-
-    waiting_count = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed',
-        checked_in=True,
-        current_counter__isnull=True
-    ).count()
+    # Get waiting queue and statistics from today's queue
+    waiting_queue = QueueEngine.select(checked_in=True, at_counter=False, order_by='check_in_time')
+    checked_in = QueueEngine.select(checked_in=True)
 
     stats = {
-        'total_appointments': total_appointments,
-        'checked_in_count': checked_in_count,
-        'now_serving_count': now_serving_count,
-        'waiting_count': waiting_count
+        'total_appointments': len(QueueEngine.select()),
+        'checked_in_count': len(checked_in),
+        'now_serving_count': len(checked_in) - len(waiting_queue),
+        'waiting_count': len(waiting_queue)
     }
 
     context = {
@@ -873,26 +756,20 @@ def get_waiting_queue(request):
     if request.headers.get('x-requested-with') != 'XMLHttpRequest':
         return JsonResponse({'error': 'AJAX request required'}, status=400)
 
-    today = timezone.now().date()
     waiting_queue_data = []
-
-    waiting_queue = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed',
-        checked_in=True
-    ).select_related('application', 'current_counter').order_by('check_in_time')
+    waiting_queue = QueueEngine.select(checked_in=True, order_by='check_in_time')
 
     for appointment in waiting_queue:
         appointment_data = {
-            'id': str(appointment.id),
-            'queue_number': appointment.queue_number,
-            'business_name': appointment.application.business_name,
-            'application_id': str(appointment.application.id),
-            'application_number': appointment.application.application_number,
-            'appointment_type': appointment.appointment_type,
-            'checked_in': appointment.checked_in,
-            'check_in_time': appointment.check_in_time.strftime('%I:%M %p') if appointment.check_in_time else None,
-            'current_counter': appointment.current_counter.counter_number if appointment.current_counter else None
+            'id': appointment['id'],
+            'queue_number': appointment['queue_number'],
+            'business_name': appointment['application']['business_name'],
+            'application_id': appointment['application']['id'],
+            'application_number': appointment['application']['application_number'],
+            'appointment_type': appointment['appointment_type'],
+            'checked_in': appointment['checked_in'],
+            'check_in_time': appointment['check_in_time'].strftime('%I:%M %p') if appointment['check_in_time'] else None,
+            'current_counter': appointment['current_counter']['counter_number'] if appointment['current_counter'] else None
         }
 
         waiting_queue_data.append(appointment_data)
@@ -1002,6 +879,7 @@ def complete_appointment(request):
         # Clear the counter
         counter.current_queue = None
         counter.save(update_fields=['current_queue'])
+        QueueDisplayService.queue_changed()
 
         # Handle appointment type specific actions
         if appointment.appointment_type == 'payment':
@@ -1078,6 +956,7 @@ def return_to_queue(request):
         # Return appointment to queue
         counter.current_queue = None
         counter.save(update_fields=['current_queue'])
+        QueueDisplayService.queue_changed()
 
         # Create notification for the applicant
         create_notification(
@@ -1115,17 +994,11 @@ def call_specific(request):
         counter = get_object_or_404(QueueCounter, id=counter_id)
         appointment = get_object_or_404(QueueAppointment, id=appointment_id)
 
-        # Check if counter is available
-        if counter.current_queue:
-            return JsonResponse({'error': 'This counter is already serving another appointment'}, status=400)
-
-        # Check if appointment is already at a counter
-        if appointment.current_counter:
-            return JsonResponse({'error': 'This appointment is already being served at another counter'}, status=400)
-
-        # Call appointment to counter
-        counter.current_queue = appointment
-        counter.save(update_fields=['current_queue'])
+        # Call appointment to counter, if both the counter and the appointment are free
+        result = CounterService.call_specific(counter.id, appointment.id)
+        if not result['success']:
+            return JsonResponse({'error': result['error']}, status=400)
+        QueueDisplayService.queue_changed()
 
         # Create notification for the applicant
         create_notification(
@@ -1156,36 +1029,27 @@ def get_queue(request):
     if queue_type not in ['payment', 'release']:
         return JsonResponse({'error': 'Invalid queue type'}, status=400)
 
-    today = timezone.now().date()
-    appointments = QueueAppointment.objects.filter(
-        slot_date=today,
-        status='confirmed',
-        appointment_type=queue_type
-    ).select_related('application', 'current_counter').order_by('slot_time')
-
-    counters = QueueCounter.objects.filter(
-        counter_type=queue_type,
-        is_active=True
-    )
+    appointments = QueueEngine.select(appointment_type=queue_type, order_by='slot_time')
+    counters = QueueEngine.counters(counter_type=queue_type, is_active=True)
 
     appointments_data = []
     for appointment in appointments:
         appointments_data.append({
-            'id': str(appointment.id),
-            'queue_number': appointment.queue_number,
-            'business_name': appointment.application.business_name,
-            'application_id': str(appointment.application.id),
-            'slot_time': appointment.slot_time.strftime('%I:%M %p'),
-            'checked_in': appointment.checked_in,
-            'current_counter': appointment.current_counter.counter_number if appointment.current_counter else None
+            'id': appointment['id'],
+            'queue_number': appointment['queue_number'],
+            'business_name': appointment['application']['business_name'],
+            'application_id': appointment['application']['id'],
+            'slot_time': appointment['slot_time'].strftime('%I:%M %p'),
+            'checked_in': appointment['checked_in'],
+            'current_counter': appointment['current_counter']['counter_number'] if appointment['current_counter'] else None
         })
 
     counters_data = []
     for counter in counters:
         counters_data.append({
-            'id': counter.id,
-            'counter_number': counter.counter_number,
-            'counter_type': counter.counter_type
+            'id': counter['id'],
+            'counter_number': counter['counter_number'],
+            'counter_type': counter['counter_type']
         })
 
     return JsonResponse({
@@ -1219,6 +1083,8 @@ def mark_no_shows(request):
 
         # Mark them as no_show
         no_show_appointments.update(status='no_show')
+        QueueEngine.invalidate()
+        AvailabilityService.invalidate()
 
         # Get total no-shows count
         total_no_shows = QueueAppointment.objects.filter(
@@ -1,6 +1,6 @@
 # reviewer/urls.py
 from django.urls import path
-from . import views
+from . import views, views_document
 
 app_name = 'reviewer'
 
@@ -14,7 +14,8 @@ urlpatterns = [
          views.verify_requirement, name='verify_requirement'),
     path('create-assessment/<uuid:application_id>/',
          views.create_assessment, name='create_assessment'),
-    path('document-analysis/<uuid:requirement_id>/', views.document_analysis, name='document_analysis'),
+    path('document-analysis/<int:requirement_id>/', views.document_analysis, name='document_analysis'),
+    path('documents/<uuid:document_id>/', views_document.document_detail, name='document_detail'),
     path('quarantined-documents/', views.quarantined_documents, name='quarantined_documents'),
     path('document-ai-analysis/<uuid:document_id>/', views.document_ai_analysis, name='document_ai_analysis'),
     path('release-document/<uuid:document_id>/', views.release_document, name='release_document'),
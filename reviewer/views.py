@@ -4,13 +4,15 @@ from django.utils import timezone
 from django.views.decorators.http import require_POST
 from documents.models import Document, VerificationResult
 from documents.services.document_workflow import DocumentWorkflowService
+from documents.services.duplicate_detection import DuplicateDetectionService
+from documents.services.renditions import RenditionService
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import user_passes_test, login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
 import logging
-from django.db.models import Q
+from django.db.models import F, Q
 from applications.models import (
     BusinessApplication, ApplicationRequirement,
     ApplicationRevision, ApplicationAssessment, ApplicationActivity
@@ -365,29 +367,26 @@ def document_analysis(request, requirement_id):
             verification_result = VerificationResult.objects.get(document=document)
 
             # Prepare results for frontend
+            scores = (document.verification_details or {}).get('image_validation', {}).get('scores') or {}
             validation_results = {
-                'ela_score': verification_result.fraud_score * 100,  # Convert to percentage
-                'noise_score': verification_result.verification_details.get('noise_score', 5.0),
-                'text_quality': verification_result.verification_details.get('text_quality', 100.0),
-                'resolution_score': verification_result.verification_details.get('resolution_score', 100.0)
+                'ela_score': scores.get('ela_score', verification_result.fraud_probability * 100),
+                'noise_score': scores.get('noise_score', 5.0),
+                'text_quality': scores.get('text_quality', 100.0),
+                'resolution_score': scores.get('resolution_score', 100.0)
             }
 
-            # Get suspicious regions for highlighting
-            suspicious_regions = verification_result.verification_details.get(
-                'fraud_detection_results', {}).get('suspicious_regions', [])
-
             logger.info("Document analysis retrieved successfully")
             return JsonResponse({
                 'success': True,
                 'results': {
                     'document_url': requirement.document.url,
+                    **RenditionService.urls('documents:requirement_rendition', requirement.id, requirement.document),
                     'is_quarantined': document.is_quarantined,
-                    'quarantine_reason': document.get_quarantine_reason_display() if document.is_quarantined else None,
                     'validation_results': validation_results,
                     'validation_message': 'Document appears to be authentic and of good quality.'
-                    if verification_result.is_authentic else 'Document shows signs of tampering or manipulation.',
-                    'extracted_text': verification_result.extracted_text,
-                    'suspicious_regions': suspicious_regions
+                    if verification_result.is_valid else 'Document shows signs of tampering or manipulation.',
+                    'extracted_text': verification_result.ocr_text,
+                    'suspicious_regions': verification_result.fraud_areas or []
                 }
             })
 
@@ -407,6 +406,7 @@ def document_analysis(request, requirement_id):
                 'success': True,
                 'results': {
                     'document_url': requirement.document.url,
+                    **RenditionService.urls('documents:requirement_rendition', requirement.id, requirement.document),
                     'is_quarantined': False,
                     'validation_results': validation_results,
                     'validation_message': 'Basic analysis only. Full AI analysis not available.',
@@ -422,31 +422,55 @@ def document_analysis(request, requirement_id):
         })
 
 
-@user_passes_test(is_reviewer)
-def quarantined_documents(request):
-    """View for listing all quarantined documents"""
-    quarantined_docs = Document.objects.filter(is_quarantined=True).order_by('-quarantine_date')
+# Orderings offered by the reviewer document lists, all on indexed result columns
+SCORE_ORDERINGS = {
+    'fraud': 'result__fraud_probability',
+    'ela': 'result__ela_score',
+    'noise': 'result__noise_score',
+}
 
-    # Get verification results for each document
-    documents_with_results = []
-    for doc in quarantined_docs:
+
+def documents_by_score(documents, params):
+    """
+    Join each document's result and order by the score named in ?sort=,
+    worst first, optionally keeping only ?min_fraud= and above.
+    The verification_details JSON is not loaded.
+    """
+    documents = documents.select_related('result', 'application').defer('verification_details')
+    min_fraud = params.get('min_fraud')
+    if min_fraud:
         try:
-            verification = VerificationResult.objects.get(document=doc)
-            documents_with_results.append({
-                'document': doc,
-                'verification': verification,
-                'application': doc.application
-            })
+            documents = documents.filter(result__fraud_probability__gte=float(min_fraud))
+        except ValueError:
+            pass
+    ordering = SCORE_ORDERINGS.get(params.get('sort'), SCORE_ORDERINGS['fraud'])
+    return documents.order_by(F(ordering).desc(nulls_last=True), '-verification_timestamp')
+
+
+def with_results(documents):
+    items = []
+    for doc in documents:
+        try:
+            verification = doc.result
         except VerificationResult.DoesNotExist:
-            documents_with_results.append({
-                'document': doc,
-                'verification': None,
-                'application': doc.application
-            })
+            verification = None
+        items.append({
+            'document': doc,
+            'verification': verification,
+            'application': doc.application
+        })
+    return items
+
+
+@user_passes_test(is_reviewer)
+def quarantined_documents(request):
+    """View for listing all quarantined documents, highest scores first"""
+    quarantined_docs = documents_by_score(Document.objects.filter(verification_status='fraud'), request.GET)
 
     context = {
-        'documents': documents_with_results,
-        'quarantined_count': quarantined_docs.count()
+        'documents': with_results(quarantined_docs),
+        'quarantined_count': quarantined_docs.count(),
+        'sort': request.GET.get('sort', 'fraud'),
     }
 
     return render(request, 'reviewer/quarantined_documents.html', context)
@@ -463,27 +487,30 @@ def document_ai_analysis(request, document_id):
             verification_result = VerificationResult.objects.get(document=document)
 
             # Prepare results for frontend
+            details = document.verification_details or {}
+            image_validation = details.get('image_validation', {})
+            scores = image_validation.get('scores') or {}
             validation_results = {
-                'ela_score': verification_result.fraud_score * 100,  # Convert to percentage
-                'noise_score': verification_result.verification_details.get('noise_score', 5.0),
-                'text_quality': verification_result.verification_details.get('text_quality', 100.0),
-                'resolution_score': verification_result.verification_details.get('resolution_score', 100.0)
+                'ela_score': scores.get('ela_score', verification_result.fraud_probability * 100),
+                'noise_score': scores.get('noise_score', 5.0),
+                'text_quality': scores.get('text_quality', 100.0),
+                'resolution_score': scores.get('resolution_score', 100.0)
             }
-
-            # Get suspicious regions for highlighting
-            suspicious_regions = verification_result.verification_details.get(
-                'fraud_detection_results', {}).get('suspicious_regions', [])
-
             return JsonResponse({
                 'success': True,
                 'results': {
                     'document_url': document.file.url,
+                    **RenditionService.urls('documents:document_rendition', document.id, document.file),
                     'is_quarantined': document.is_quarantined,
-                    'quarantine_reason': document.get_quarantine_reason_display() if document.is_quarantined else None,
+                    'quarantine_reason': document.quarantine_reason,
                     'validation_results': validation_results,
-                    'validation_message': 'Document appears to be tampered or manipulated.',
-                    'extracted_text': verification_result.extracted_text,
-                    'suspicious_regions': suspicious_regions
+                    'validation_message': image_validation.get(
+                        'message', 'Document appears to be tampered or manipulated.'
+                    ),
+                    'extracted_text': verification_result.ocr_text,
+                    'suspicious_regions': verification_result.fraud_areas or [],
+                    # Looked up now rather than at upload, so later copies show too
+                    'duplicates': DuplicateDetectionService.find_near_duplicates(document)
                 }
             })
 
@@ -516,20 +543,16 @@ def release_document(request, document_id):
         # Get notes from request
         notes = request.POST.get('notes', '')
 
-        # Release document
-        document.is_quarantined = False
-        document.release_date = timezone.now()
-        document.released_by = request.user
+        # Release document; the status is what holds it in quarantine
         document.verification_status = 'verified'
-        document.save()
+        document.save(update_fields=['verification_status'])
 
         # Log activity
-        from documents.models import DocumentActivity
-        DocumentActivity.objects.create(
-            document=document,
-            activity_type='release',
+        ApplicationActivity.objects.create(
+            application=document.application,
+            activity_type='review',
             performed_by=request.user,
-            details=f'Released from quarantine: {notes}'
+            description=f'Released {document.filename} from quarantine: {notes}'
         )
 
         # Send notification to applicant
@@ -7,8 +7,10 @@ from django.views.decorators.http import require_POST
 
 from documents.models import Document, VerificationResult
 from documents.services.document_workflow import DocumentWorkflowService
+from documents.services.renditions import RenditionService
 from applications.models import BusinessApplication, ApplicationRequirement
 from .forms import AssessmentForm, RevisionRequestForm
+from .views import documents_by_score, with_results
 from notifications.models import Notification
 
 
@@ -83,6 +85,7 @@ def document_detail(request, document_id):
     context = {
         'document': document,
         'verification_result': verification_result,
+        'renditions': RenditionService.urls('documents:document_rendition', document.id, document.file),
     }
     return render(request, 'reviewer/document_review.html', context)
 
@@ -173,8 +176,9 @@ def document_analysis_api(request, document_id):
                 'success': True,
                 'results': {
                     'document_url': document.file.url,
-                    'is_quarantined': document.verification_status == 'fraud',
-                    'quarantine_reason': "Potential fraud detected by AI verification system" if document.verification_status == 'fraud' else None,
+                    **RenditionService.urls('documents:document_rendition', document.id, document.file),
+                    'is_quarantined': document.is_quarantined,
+                    'quarantine_reason': "Potential fraud detected by AI verification system" if document.is_quarantined else None,
                     'validation_results': validation_results,
                     'validation_message': 'Document appears to be authentic and of good quality.'
                     if verification_result.is_valid
@@ -189,6 +193,7 @@ def document_analysis_api(request, document_id):
                 'success': True,
                 'results': {
                     'document_url': document.file.url,
+                    **RenditionService.urls('documents:document_rendition', document.id, document.file),
                     'is_quarantined': False,
                     'validation_results': {
                         'ela_score': 0,
@@ -211,28 +216,12 @@ def document_analysis_api(request, document_id):
 @user_passes_test(is_reviewer)
 def fraudulent_documents(request):
     """View for listing all documents flagged as potential fraud"""
-    fraud_documents = Document.objects.filter(verification_status='fraud').order_by('-verification_timestamp')
-
-    # Get verification results for each document
-    documents_with_results = []
-    for doc in fraud_documents:
-        try:
-            verification = VerificationResult.objects.get(document=doc)
-            documents_with_results.append({
-                'document': doc,
-                'verification': verification,
-                'application': doc.application
-            })
-        except VerificationResult.DoesNotExist:
-            documents_with_results.append({
-                'document': doc,
-                'verification': None,
-                'application': doc.application
-            })
+    fraud_documents = documents_by_score(Document.objects.filter(verification_status='fraud'), request.GET)
 
     context = {
-        'documents': documents_with_results,
-        'fraud_count': fraud_documents.count()
+        'documents': with_results(fraud_documents),
+        'fraud_count': fraud_documents.count(),
+        'sort': request.GET.get('sort', 'fraud'),
     }
 
     return render(request, 'reviewer/fraudulent_documents.html', context)
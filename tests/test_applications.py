@@ -1,10 +1,14 @@
 import pytest
 import json
 import base64
+import threading
+import time
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from applications.models import BusinessApplication, ApplicationRequirement, ApplicationActivity
+from django.db import OperationalError, connection
+from django.utils import timezone
+from applications.models import BusinessApplication, ApplicationRequirement, ApplicationActivity, NumberSequence
 
 User = get_user_model()
 
@@ -420,4 +424,61 @@ def test_camera_functionality(authenticated_client, user, test_files):
     assert camera_requirements.first().is_submitted is True
     assert camera_requirements.first().document is not None
 
-    print("Camera functionality test passed successfully!")
\ No newline at end of file
+    print("Camera functionality test passed successfully!")
+
+
+@pytest.mark.django_db
+def test_application_numbers_continue_existing_sequence(user):
+    year = timezone.now().year
+    BusinessApplication.objects.create(
+        applicant=user, application_type='new', payment_mode='annually',
+        business_name='Numbered Before', application_number=f'BP-{year}-00041'
+    )
+
+    first = BusinessApplication.objects.create(
+        applicant=user, application_type='new', payment_mode='annually', business_name='First'
+    )
+    assert first.application_number == f'BP-{year}-00042'
+
+    batch = [
+        BusinessApplication(applicant=user, application_type='new', payment_mode='annually', business_name=f'Bulk {i}')
+        for i in range(3)
+    ]
+    BusinessApplication.allocate_application_numbers(batch)
+    assert [a.application_number for a in batch] == [f'BP-{year}-{n:05d}' for n in (43, 44, 45)]
+    assert NumberSequence.objects.get(key=f'application:{year}').last_value == 45
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_applications_get_distinct_numbers(user):
+    numbers, errors = [], []
+    start = threading.Barrier(6)
+
+    def create_applications(worker):
+        try:
+            start.wait()
+            for index in range(5):
+                while True:
+                    try:
+                        application = BusinessApplication.objects.create(
+                            applicant=user, application_type='new', payment_mode='annually',
+                            business_name=f'Worker {worker} #{index}'
+                        )
+                        break
+                    except OperationalError:
+                        # SQLite refuses concurrent writers; PostgreSQL never gets here
+                        time.sleep(0.005)
+                numbers.append(application.application_number)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=create_applications, args=(worker,)) for worker in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(numbers) == len(set(numbers)) == 30
@@ -0,0 +1,754 @@
+# tests/test_documents.py
+import hashlib
+import io
+import json
+import os
+import pytest
+from PIL import Image, ImageDraw
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from applications.models import BusinessApplication, ApplicationRequirement, NumberSequence
+from documents.models import Document, VerificationResult
+from documents.services.document_verification import DocumentVerificationService
+from documents.services.verification_cache import VerificationCache
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username='testuser',
+        email='test@example.com',
+        password='testpassword123'
+    )
+
+
+@pytest.fixture
+def authenticated_client(client, user):
+    client.login(username='testuser', password='testpassword123')
+    return client
+
+
+@pytest.fixture
+def application(user):
+    return BusinessApplication.objects.create(
+        applicant=user,
+        application_type='new',
+        payment_mode='annually',
+        business_name='Bumpz Auto Accessories Shop'
+    )
+
+
+@pytest.fixture
+def scan_file():
+    img = Image.new('RGB', (800, 400), 'white')
+    draw = ImageDraw.Draw(img)
+    for y in range(20, 380, 30):
+        draw.text((30, y), "Barangay Clearance for Business Permit", fill='black')
+    output = io.BytesIO()
+    img.save(output, format='PNG')
+    return SimpleUploadedFile('barangay_clearance.png', output.getvalue(), content_type='image/png')
+
+
+def test_requirement_upload_queues_verification(authenticated_client, application, scan_file):
+    """Upload returns right away and the eager worker fills in the result"""
+    requirement = ApplicationRequirement.objects.create(
+        application=application,
+        requirement_name='Barangay Clearance'
+    )
+
+    response = authenticated_client.post(
+        reverse('applications:requirement_upload', args=[application.id, requirement.id]),
+        {'document': scan_file}
+    )
+    data = response.json()
+    assert data['success'], data
+
+    document = Document.objects.get(id=data['verification']['document_id'])
+    assert document.verification_task_id
+    assert document.verification_progress == 100
+    assert document.verification_status in ('verified', 'fraud')
+    assert 'image_validation' in document.verification_details
+
+    status = authenticated_client.get(data['verification']['status_url']).json()
+    assert status['verification_status'] == document.verification_status
+    assert status['progress'] == 100
+    assert status['result']['is_valid'] == (document.verification_status == 'verified')
+
+
+def test_flagged_upload_reported_as_quarantined(authenticated_client, application, scan_file, user, monkeypatch):
+    """A quarantined upload is not announced as a success, and reviewers can release it"""
+    from django.contrib.auth.models import Group
+    from documents.utils.document_validator import analyze_document_file
+    from notifications.models import Notification
+
+    def flagged(path):
+        return dict(analyze_document_file(path), is_valid=False, quarantine_reason='ela')
+    monkeypatch.setattr('documents.services.document_verification.analyze_document_file', flagged)
+    requirement = ApplicationRequirement.objects.create(
+        application=application,
+        requirement_name='Barangay Clearance'
+    )
+
+    data = authenticated_client.post(
+        reverse('applications:requirement_upload', args=[application.id, requirement.id]),
+        {'document': scan_file}
+    ).json()
+
+    assert data['verification']['status'] == 'fraud'
+    assert data['verification']['message'] == 'Document uploaded and flagged for review.'
+    titles = list(Notification.objects.filter(recipient=user).values_list('title', flat=True))
+    assert 'Document Requires Review' in titles
+    assert 'Document Uploaded' not in titles
+
+    document = Document.objects.get(id=data['verification']['document_id'])
+    assert document.is_quarantined
+    assert document.quarantine_reason == 'ela'
+
+    reviewer = get_user_model().objects.create_user(
+        username='reviewer', email='reviewer@example.com', password='reviewerpass123', is_staff=True
+    )
+    reviewer.groups.add(Group.objects.get_or_create(name='Reviewers')[0])
+    authenticated_client.force_login(reviewer)
+    response = authenticated_client.post(reverse('reviewer:release_document', args=[document.id]))
+
+    assert response.json() == {'success': True}
+    document.refresh_from_db()
+    assert not document.is_quarantined
+    assert document.quarantine_reason is None
+
+
+def test_requirement_upload_streams_and_stores_once(authenticated_client, application, scan_file):
+    """The file is sniffed and hashed on the way in and stored once for the requirement and its Document"""
+    requirement = ApplicationRequirement.objects.create(
+        application=application,
+        requirement_name='Barangay Clearance'
+    )
+    url = reverse('applications:requirement_upload', args=[application.id, requirement.id])
+    content = scan_file.read()
+
+    # A text file claiming to be a PNG is turned away on its first bytes
+    disguised = SimpleUploadedFile('clearance.png', b'<html>not an image</html>', content_type='image/png')
+    data = authenticated_client.post(url, {'document': disguised}).json()
+    assert not data['success']
+    assert 'Invalid file type' in data['error']
+
+    # The client's content type is ignored in favour of the sniffed one
+    upload = SimpleUploadedFile('clearance.png', content, content_type='application/octet-stream')
+    data = authenticated_client.post(url, {'document': upload}).json()
+    assert data['success'], data
+
+    requirement.refresh_from_db()
+    document = Document.objects.get(id=data['verification']['document_id'])
+    # Two names, one copy of the bytes on disk
+    assert document.file.name != requirement.document.name
+    assert os.path.samefile(document.file.path, requirement.document.path)
+    assert document.filename == os.path.basename(requirement.document.name)
+    assert document.original_filename == 'clearance.png'
+    assert document.content_hash == hashlib.sha256(content).hexdigest()
+    assert Document.objects.filter(application=application).count() == 1
+
+    # Deleting the requirement's file leaves the analysed Document's in place
+    response = authenticated_client.post(
+        reverse('applications:delete_requirement', args=[application.id, requirement.id])
+    )
+    assert response.json()['success']
+    requirement.refresh_from_db()
+    assert not requirement.document
+    with document.file.open('rb') as stored:
+        assert hashlib.sha256(stored.read()).hexdigest() == document.content_hash
+
+
+def test_oversized_upload_rejected_while_streaming(authenticated_client, application, settings):
+    settings.DOCUMENT_UPLOAD_MAX_SIZE = 1024
+    requirement = ApplicationRequirement.objects.create(
+        application=application,
+        requirement_name='Barangay Clearance'
+    )
+    upload = SimpleUploadedFile('scan.pdf', b'%PDF-1.4\n' + b'0' * 4096)
+
+    data = authenticated_client.post(
+        reverse('applications:requirement_upload', args=[application.id, requirement.id]),
+        {'document': upload}
+    ).json()
+
+    assert not data['success']
+    assert 'must not exceed' in data['error']
+    requirement.refresh_from_db()
+    assert not requirement.document
+
+
+def test_verification_status_is_private(client, application, scan_file, db):
+    """Other applicants cannot read the verification result"""
+    document = Document.objects.create(
+        application=application,
+        user=application.applicant,
+        document_type='barangay',
+        file=scan_file,
+        filename='barangay_clearance.png',
+        original_filename='barangay_clearance.png'
+    )
+    User.objects.create_user(username='other', email='other@example.com', password='otherpassword123')
+    client.login(username='other', password='otherpassword123')
+
+    response = client.get(reverse('documents:verification_status', args=[document.id]))
+    assert response.status_code == 403
+
+
+def test_reverify_documents_bulk_updates_and_resumes(application, scan_file, tmp_path):
+    """Bulk re-scan writes results once per chunk and resumes from the checkpoint"""
+    for index in range(3):
+        scan_file.seek(0)
+        Document.objects.create(
+            application=application,
+            user=application.applicant,
+            document_type='barangay',
+            file=SimpleUploadedFile(f'scan_{index}.png', scan_file.read()),
+            filename=f'scan_{index}.png',
+            original_filename=f'scan_{index}.png'
+        )
+    checkpoint = tmp_path / 'checkpoint.json'
+
+    call_command('reverify_documents', chunk_size=2, workers=2, checkpoint=str(checkpoint), stdout=io.StringIO())
+
+    assert VerificationResult.objects.count() == 3
+    assert not Document.objects.filter(verification_status='pending').exists()
+    assert json.loads(checkpoint.read_text())['stats']['processed'] == 3
+
+    output = io.StringIO()
+    call_command('reverify_documents', checkpoint=str(checkpoint), resume=True, stdout=output)
+    assert 'Processed 0 documents' in output.getvalue()
+
+
+def test_reverify_documents_resumes_only_with_same_filters(application, scan_file, tmp_path):
+    """A checkpoint taken under one filter does not skip documents under another"""
+    for index, document_type in enumerate(['barangay', 'barangay', 'dti_sec']):
+        scan_file.seek(0)
+        Document.objects.create(
+            application=application,
+            user=application.applicant,
+            document_type=document_type,
+            file=SimpleUploadedFile(f'scan_{index}.png', scan_file.read()),
+            filename=f'scan_{index}.png',
+            original_filename=f'scan_{index}.png'
+        )
+    checkpoint = tmp_path / 'checkpoint.json'
+
+    call_command('reverify_documents', document_type='dti_sec', checkpoint=str(checkpoint), stdout=io.StringIO())
+    assert json.loads(checkpoint.read_text())['filters'] == {'document_type': 'dti_sec'}
+
+    output = io.StringIO()
+    call_command('reverify_documents', document_type='barangay', checkpoint=str(checkpoint), resume=True, stdout=output)
+    assert 'Processed 2 documents' in output.getvalue()
+
+    output = io.StringIO()
+    call_command('reverify_documents', document_type='barangay', checkpoint=str(checkpoint), resume=True, stdout=output)
+    assert 'Processed 0 documents' in output.getvalue()
+
+
+def test_identical_upload_reuses_verification_result(application, scan_file, monkeypatch):
+    """Byte-identical uploads hit the content-hash cache until the analyzer version changes"""
+    VerificationCache.reset_stats()
+    content = scan_file.read()
+
+    def upload(name):
+        return Document.objects.create(
+            application=application,
+            user=application.applicant,
+            document_type='barangay',
+            file=SimpleUploadedFile(name, content),
+            filename=name,
+            original_filename=name
+        )
+
+    first = upload('clearance.png')
+    assert first.content_hash == hashlib.sha256(content).hexdigest()
+    DocumentVerificationService.validate_document_image(first.id)
+
+    renewal = upload('clearance_renewal.png')
+    DocumentVerificationService.validate_document_image(renewal.id)
+    renewal.refresh_from_db()
+    assert renewal.verification_details['cache']['source_document'] == str(first.id)
+    assert renewal.result.is_valid == first.result.is_valid
+    assert VerificationCache.stats()['hits'] == 1
+
+    monkeypatch.setattr(DocumentVerificationService, 'IMAGE_ANALYZER_VERSION', 'image-validator-test')
+    resubmission = upload('clearance_resubmission.png')
+    DocumentVerificationService.validate_document_image(resubmission.id)
+    resubmission.refresh_from_db()
+    assert 'cache' not in resubmission.verification_details
+    assert VerificationCache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3}
+    # Counted in the shared cache, not in the application number table
+    assert not NumberSequence.objects.filter(key__startswith='documents:').exists()
+
+
+def test_filename_dependent_result_not_reused_under_another_name(application, scan_file):
+    """detect_fraud reads the name, so the same bytes renamed are analysed again"""
+    VerificationCache.reset_stats()
+    content = scan_file.read()
+
+    def upload(name):
+        return Document.objects.create(
+            application=application, user=application.applicant, document_type='dti',
+            file=SimpleUploadedFile(name, content), filename=name, original_filename=name
+        )
+
+    original = upload('DTI_REG6559081_2024-01-05.png')
+    DocumentVerificationService.process_document(original.id)
+    renamed = upload('scan.png')
+    DocumentVerificationService.process_document(renamed.id)
+    renamed.refresh_from_db()
+
+    assert 'cache' not in renamed.verification_details
+    assert renamed.verification_details['fraud_detection']['filename'].endswith('scan.png')
+    # Counted in the database, where every process adds to the same totals
+    assert VerificationCache.stats() == {'hits': 0, 'misses': 2, 'hit_rate': 0.0}
+
+
+def test_cached_result_cross_validated_against_own_application(application, scan_file, fresh_business_index):
+    """A cache hit from another application is checked against this application's form"""
+    content = scan_file.read()
+    name = 'DTI_REG6559081_2024-01-05.png'
+    other = BusinessApplication.objects.create(
+        applicant=User.objects.create_user(username='baker', password='testpassword123'),
+        application_type='new', payment_mode='annually', business_name='Golden Bakery'
+    )
+
+    def upload(target):
+        return Document.objects.create(
+            application=target, user=target.applicant, document_type='dti',
+            file=SimpleUploadedFile(name, content), filename=name, original_filename=name
+        )
+
+    original = upload(application)
+    DocumentVerificationService.process_document(original.id)
+    copy = upload(other)
+    DocumentVerificationService.process_document(copy.id)
+    copy.refresh_from_db()
+
+    assert copy.verification_details['cache']['source_document'] == str(original.id)
+    cross_validation = copy.verification_details['cross_validation']
+    form_values = [item['form_value'] for item in cross_validation['matches'] + cross_validation['discrepancies']]
+    assert form_values == ['Golden Bakery']
+    assert application.business_name not in json.dumps(copy.verification_details)
+
+
+def test_revalidate_applications_reports_invalid_fields(application):
+    """Bulk NLP re-validation lists the fields that fail"""
+    application.owner_name = 'Juan'
+    application.business_address = '12 Rizal Street, Barangay Poblacion'
+    application.save()
+
+    output = io.StringIO()
+    call_command('revalidate_applications', stdout=output)
+
+    assert f"{application.application_number} owner_name: Owner name should include a first and last name" in output.getvalue()
+    assert 'Validated 3 fields of 1 applications' in output.getvalue()
+
+
+@pytest.fixture
+def fresh_business_index():
+    from documents.services.cross_validation import CrossValidationService
+    CrossValidationService.reset_index()
+    yield CrossValidationService
+    CrossValidationService.reset_index()
+
+
+def test_cross_validation_fuzzy_matches_form_and_document(fresh_business_index):
+    """Formatting differences match; different values are discrepancies"""
+    results = fresh_business_index.cross_validate(
+        {
+            'business_name': 'Bumpz Auto Accessories Shop',
+            'registration_number': 'REG-6559081',
+            'owner_name': 'Juan Dela Cruz',
+            'business_address': '12 Rizal Street, Poblacion',
+        },
+        {'dti': {
+            'business_name': 'BUMPZ AUTO ACCESSORIES SHOP, INC.',
+            'registration_number': 'reg6559081',
+            'owner_name': 'Dela Cruz, Juan',
+            'business_address': '99 Mabini Avenue, San Isidro',
+        }}
+    )
+
+    assert [match['field'] for match in results['matches']] == ['business_name', 'registration_number', 'owner_name']
+    assert [d['field'] for d in results['discrepancies']] == ['business_address']
+    assert results['is_valid'] is False
+
+
+def test_registration_reuse_detected_across_businesses(application, fresh_business_index):
+    """A registration number used by a different business is flagged"""
+    application.registration_number = 'REG6559081'
+    application.save()
+    renewal = BusinessApplication.objects.create(
+        applicant=application.applicant, application_type='renewal', payment_mode='annually',
+        business_name='Bumpz Auto Accessories Shop Inc.', registration_number='REG-6559081'
+    )
+
+    assert fresh_business_index.find_registration_reuse('REG6559081', renewal.business_name, renewal.id) == []
+
+    # Index already built: the next save updates it in place
+    other = BusinessApplication.objects.create(
+        applicant=application.applicant, application_type='new', payment_mode='annually',
+        business_name='Golden Bakery', registration_number='reg 6559081'
+    )
+    reuse = fresh_business_index.find_registration_reuse('REG6559081', other.business_name, other.id)
+
+    assert {item['application_id'] for item in reuse} == {str(application.id), str(renewal.id)}
+    assert list(fresh_business_index.find_reused_registrations()) == ['REG6559081']
+    similar = fresh_business_index.find_similar_businesses('Bumpz Auto Accesories', exclude_id=renewal.id)
+    assert similar[0]['application_id'] == str(application.id)
+
+
+def test_business_index_only_shares_indexed_changes(application, fresh_business_index):
+    """Status saves leave the shared index alone; a renamed business is applied without a rebuild"""
+    index = fresh_business_index.get_index()
+    version = fresh_business_index.changes.version()
+
+    application = BusinessApplication.objects.get(id=application.id)
+    application.status = 'under_review'
+    application.save()
+    assert fresh_business_index.changes.version() == version
+
+    application.business_name = 'Golden Bakery'
+    application.save()
+    assert fresh_business_index.changes.version() == version + 1
+    assert fresh_business_index.get_index() is index
+    similar = fresh_business_index.find_similar_businesses('Golden Bakery')
+    assert similar[0]['application_id'] == str(application.id)
+
+
+@pytest.fixture
+def fresh_duplicate_index():
+    from documents.services.duplicate_detection import DuplicateDetectionService
+    DuplicateDetectionService.reset_index()
+    yield DuplicateDetectionService
+    DuplicateDetectionService.reset_index()
+
+
+def test_near_duplicate_upload_flagged_for_reviewer(client, application, scan_file, fresh_duplicate_index):
+    """A re-encoded copy in another application is found and shown to reviewers, but analysed afresh"""
+    from django.contrib.auth.models import Group
+
+    def upload(target, name, content):
+        return Document.objects.create(
+            application=target,
+            user=target.applicant,
+            document_type='barangay',
+            file=SimpleUploadedFile(name, content),
+            filename=name,
+            original_filename=name
+        )
+
+    original = upload(application, 'clearance.png', scan_file.read())
+    assert original.phash and original.dhash
+    DocumentVerificationService.validate_document_image(original.id)
+
+    other = BusinessApplication.objects.create(
+        applicant=application.applicant, application_type='new', payment_mode='annually',
+        business_name='Golden Bakery'
+    )
+    # Same pixels, different bytes: the content-hash cache misses
+    scan_file.seek(0)
+    copy = io.BytesIO()
+    Image.open(scan_file).save(copy, format='PNG', compress_level=1)
+    duplicate = upload(other, 'scan.png', copy.getvalue())
+    assert duplicate.content_hash != original.content_hash
+    assert duplicate.phash == original.phash
+
+    DocumentVerificationService.validate_document_image(duplicate.id)
+    duplicate.refresh_from_db()
+    assert 'cache' not in duplicate.verification_details
+    assert 'image_validation' in duplicate.verification_details
+    assert duplicate.verification_details['duplicates'][0]['document_id'] == str(original.id)
+    assert duplicate.verification_details['duplicates'][0]['other_application']
+
+    reviewer = User.objects.create_user(username='reviewer', password='testpassword123', is_staff=True)
+    reviewer.groups.add(Group.objects.get_or_create(name='Reviewers')[0])
+    client.login(username='reviewer', password='testpassword123')
+    response = client.get(reverse('reviewer:document_ai_analysis', args=[original.id]))
+
+    results = response.json()['results']
+    assert [item['document_id'] for item in results['duplicates']] == [str(duplicate.id)]
+    assert results['duplicates'][0]['distance'] == 0
+
+
+def test_duplicate_index_applies_other_processes_changes(application, scan_file, fresh_duplicate_index):
+    """Hashes added elsewhere are applied from the change log; a lost entry forces a rebuild"""
+    from django.core.cache import cache
+
+    content = scan_file.read()
+    first = Document.objects.create(
+        application=application, user=application.applicant, document_type='barangay',
+        file=SimpleUploadedFile('first.png', content), filename='first.png', original_filename='first.png'
+    )
+    index = fresh_duplicate_index.get_index()
+    assert first.id in index
+
+    # As if another process uploaded these: only the shared log carries them
+    fresh_duplicate_index.changes.publish(('other-upload', first.phash))
+    fresh_duplicate_index.changes.publish((first.id, None))
+
+    assert fresh_duplicate_index.get_index() is index
+    assert 'other-upload' in index and first.id not in index
+
+    version = fresh_duplicate_index.changes.publish(('lost-upload', first.phash))
+    cache.delete(fresh_duplicate_index.changes._entry_key(version))
+    rebuilt = fresh_duplicate_index.get_index()
+    assert rebuilt is not index and first.id in rebuilt
+
+
+def test_edited_copy_of_verified_scan_reanalysed(application, scan_file, fresh_duplicate_index):
+    """An edit that leaves the perceptual hashes alike does not inherit the original's verdict"""
+    content = scan_file.read()
+    original = Document.objects.create(
+        application=application, user=application.applicant, document_type='barangay',
+        file=SimpleUploadedFile('clearance.png', content), filename='clearance.png',
+        original_filename='clearance.png'
+    )
+    DocumentVerificationService.validate_document_image(original.id)
+    VerificationResult.objects.filter(document=original).update(is_valid=True)
+    Document.objects.filter(id=original.id).update(verification_status='verified')
+
+    # Overwrite a few characters, as when a registration number is changed
+    image = Image.open(io.BytesIO(content))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((30, 20, 80, 30), fill='white')
+    draw.text((30, 20), "Brgy 0042", fill='black')
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    forged = Document.objects.create(
+        application=application, user=application.applicant, document_type='barangay',
+        file=SimpleUploadedFile('clearance.png', output.getvalue()), filename='clearance.png',
+        original_filename='clearance.png'
+    )
+    assert (forged.phash, forged.dhash) == (original.phash, original.dhash)
+
+    result = DocumentVerificationService.validate_document_image(forged.id)
+    assert result['success'], result
+    forged.refresh_from_db()
+    assert 'cache' not in forged.verification_details
+    assert 'image_validation' in forged.verification_details
+    assert forged.verification_details['duplicates'][0]['document_id'] == str(original.id)
+
+
+def test_reviewer_preview_rendition_cached(client, application, user, fresh_duplicate_index):
+    """Previews are generated once next to the original and served with long cache headers"""
+    from django.contrib.auth.models import Group
+    from documents.services.renditions import RenditionService
+
+    image = Image.effect_noise((3000, 2000), 60).convert('RGB')
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    document = Document.objects.create(
+        application=application, user=user, document_type='signage',
+        file=SimpleUploadedFile('storefront.png', output.getvalue()),
+        filename='storefront.png', original_filename='storefront.png'
+    )
+
+    reviewer = User.objects.create_user(username='reviewer', password='testpassword123', is_staff=True)
+    reviewer.groups.add(Group.objects.get_or_create(name='Reviewers')[0])
+    client.login(username='reviewer', password='testpassword123')
+    DocumentVerificationService.validate_document_image(document.id)
+    results = client.get(reverse('reviewer:document_ai_analysis', args=[document.id])).json()['results']
+    response = client.get(results['preview_url'])
+
+    assert response['Content-Type'] == 'image/jpeg'
+    assert 'immutable' in response['Cache-Control']
+    preview = b''.join(response.streaming_content)
+    assert len(preview) < document.file.size / 4
+    assert max(Image.open(io.BytesIO(preview)).size) == RenditionService.RENDITIONS['preview']['size']
+
+    # Stored next to the original and reused on the next request
+    path = RenditionService.get(document.file, 'preview')
+    assert os.path.dirname(os.path.dirname(path)) == os.path.dirname(document.file.path)
+    mtime = os.path.getmtime(path)
+    client.get(results['thumbnail_url'])
+    client.get(results['preview_url'])
+    assert os.path.getmtime(path) == mtime
+
+    client.login(username='testuser', password='testpassword123')
+    assert client.get(results['thumbnail_url']).status_code == 200
+    client.force_login(User.objects.create_user(
+        username='someone', email='someone@example.com', password='testpassword123'
+    ))
+    assert client.get(results['thumbnail_url']).status_code == 403
+
+
+def test_identical_uploads_share_one_blob(application, scan_file, settings):
+    """Each distinct file is stored once; the last delete removes the blob"""
+    from django.core.files.storage import default_storage
+    content = scan_file.read()
+
+    first, second = (
+        Document.objects.create(
+            application=application, user=application.applicant, document_type='barangay',
+            file=SimpleUploadedFile(name, content), filename=name, original_filename=name
+        )
+        for name in ('clearance.png', 'clearance_copy.png')
+    )
+
+    assert first.file.name != second.file.name
+    assert os.path.samefile(first.file.path, second.file.path)
+    assert default_storage.refcount(first.file.name) == 2
+    assert first.file.url.startswith(settings.MEDIA_URL)
+    with first.file.open('rb') as stored:
+        assert stored.read() == content
+
+    blob = default_storage.blob_path(first.content_hash)
+    first.file.delete(save=False)
+    assert os.path.exists(blob) and default_storage.refcount(second.file.name) == 1
+    second.file.delete(save=False)
+    assert not os.path.exists(blob)
+
+
+def test_upload_survives_blob_deleted_before_link(application, scan_file, monkeypatch):
+    """A blob removed by a concurrent delete is written again instead of failing the upload"""
+    from django.core.files.storage import default_storage
+    content = scan_file.read()
+
+    def upload(name):
+        return Document.objects.create(
+            application=application, user=application.applicant, document_type='barangay',
+            file=SimpleUploadedFile(name, content), filename=name, original_filename=name
+        )
+
+    first = upload('clearance.png')
+    blob = default_storage.blob_path(first.content_hash)
+    link = os.link
+
+    def delete_first_then_link(source, target):
+        if source == blob and first.file:
+            # The only other name goes, and the blob with it
+            first.file.delete(save=False)
+        return link(source, target)
+    monkeypatch.setattr(os, 'link', delete_first_then_link)
+
+    second = upload('clearance_copy.png')
+    assert not first.file
+    with second.file.open('rb') as stored:
+        assert stored.read() == content
+    assert os.path.samefile(second.file.path, blob)
+
+
+def test_delete_finds_blob_without_rehashing(application, scan_file, monkeypatch):
+    """The blob's hash is read from the file's inode, not from its bytes"""
+    from django.core.files.storage import default_storage
+    from documents import storage
+
+    name = 'clearance.png'
+    document = Document.objects.create(
+        application=application, user=application.applicant, document_type='barangay',
+        file=SimpleUploadedFile(name, scan_file.read()), filename=name, original_filename=name
+    )
+    blob = default_storage.blob_path(document.content_hash)
+    monkeypatch.setattr(storage, 'hash_path', lambda path: pytest.fail('file re-hashed on delete'))
+
+    document.file.delete(save=False)
+    assert not os.path.exists(blob)
+
+
+def test_dedupe_media_links_existing_copies(settings):
+    content = b'%PDF-1.4 business permit' * 1000
+    paths = []
+    for relative in ('requirements/2025/03/05/permit.pdf', 'documents/user_1/dti_sec/permit.pdf'):
+        path = os.path.join(settings.MEDIA_ROOT, relative)
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as file:
+            file.write(content)
+        paths.append(path)
+
+    output = io.StringIO()
+    call_command('dedupe_media', stdout=output)
+    assert '1 duplicates, 1 newly stored' in output.getvalue()
+    assert os.path.samefile(*paths)
+    assert os.stat(paths[0]).st_nlink == 3
+
+    output = io.StringIO()
+    call_command('dedupe_media', stdout=output)
+    assert '0 duplicates, 0 newly stored' in output.getvalue()
+
+    for path in paths:
+        os.remove(path)
+    output = io.StringIO()
+    call_command('dedupe_media', '--prune', stdout=output)
+    assert '1 orphaned blobs pruned' in output.getvalue()
+
+
+def test_verification_result_compacted(client, application, scan_file, settings):
+    """Scores become columns, heatmaps move to the archive, and reviewer lists sort on them"""
+    from django.contrib.auth.models import Group
+    # Render templates without a collected static manifest
+    settings.STORAGES = dict(
+        settings.STORAGES, staticfiles={'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+    )
+    content = scan_file.read()
+    documents = []
+    for name in ('clearance.png', 'permit.png'):
+        document = Document.objects.create(
+            application=application, user=application.applicant, document_type='barangay',
+            file=SimpleUploadedFile(name, content), filename=name, original_filename=name
+        )
+        DocumentVerificationService.validate_document_image(document.id)
+        documents.append(document)
+
+    first = documents[0]
+    first.refresh_from_db()
+    result = first.result
+    image_validation = first.verification_details['image_validation']
+    assert result.ela_score == image_validation['scores']['ela_score']
+    assert 'heatmaps' not in image_validation and 'fraud_areas' not in image_validation
+    assert result.archive.name == f'verification/{first.id}.npz'
+    assert result.heatmaps[0]['grid'] == VerificationResult.objects.get(pk=result.pk).heatmaps[0]['grid']
+
+    # Re-verifying replaces the archive rather than adding another file
+    DocumentVerificationService.validate_document_image(first.id)
+    assert VerificationResult.objects.get(pk=result.pk).archive.name == result.archive.name
+
+    Document.objects.filter(pk__in=[d.pk for d in documents]).update(verification_status='fraud')
+    VerificationResult.objects.filter(document=documents[1]).update(ela_score=99.0)
+    reviewer = User.objects.create_user(username='reviewer', password='testpassword123', is_staff=True)
+    reviewer.groups.add(Group.objects.get_or_create(name='Reviewers')[0])
+    client.login(username='reviewer', password='testpassword123')
+
+    response = client.get(reverse('reviewer:quarantined_documents'), {'sort': 'ela'})
+    assert [item['document'].id for item in response.context['documents']] == [documents[1].id, first.id]
+
+
+def test_verification_without_broker_refused_outside_eager_mode(settings):
+    """Tasks only run in the request when eager mode is on; otherwise a broker is required"""
+    from django.core.exceptions import ImproperlyConfigured
+    from documents.apps import check_task_broker
+
+    settings.CELERY_TASK_ALWAYS_EAGER, settings.CELERY_BROKER_URL = False, ''
+    with pytest.raises(ImproperlyConfigured):
+        check_task_broker()
+
+    settings.CELERY_BROKER_URL = 'redis://localhost:6379/1'
+    check_task_broker()
+
+
+def test_verification_result_written_once(application, scan_file):
+    """The archive is stored before the row, which is inserted or updated in one statement"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    name = 'clearance.png'
+    document = Document.objects.create(
+        application=application, user=application.applicant, document_type='barangay',
+        file=SimpleUploadedFile(name, scan_file.read()), filename=name, original_filename=name
+    )
+    table = VerificationResult._meta.db_table
+
+    for statement in ('INSERT', 'UPDATE'):
+        with CaptureQueriesContext(connection) as queries:
+            DocumentVerificationService.validate_document_image(document.id)
+        writes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith((f'INSERT INTO "{table}"', f'UPDATE "{table}"'))
+        ]
+        assert len(writes) == 1 and writes[0].startswith(statement), writes
+    assert VerificationResult.objects.get(document=document).heatmaps
@@ -0,0 +1,403 @@
+import json
+import threading
+import time as clock
+from datetime import time, timedelta
+import pytest
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection
+from django.urls import reverse
+from django.utils import timezone
+from applications.models import BusinessApplication
+from queuing.apps import check_shared_cache
+from queuing.models import QueueAppointment, QueueCounter, QueueSlot
+from queuing.routing import websocket_urlpatterns
+from queuing.services.availability import AvailabilityService
+from queuing.services.counters import CounterService
+from queuing.services.queue_display import QueueDisplayService
+from queuing.services.queue_engine import DayQueue, QueueEngine
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def fresh_display_snapshot():
+    cache.delete(QueueDisplayService.SNAPSHOT_KEY)
+    yield
+    cache.delete(QueueDisplayService.SNAPSHOT_KEY)
+
+
+@pytest.fixture(autouse=True)
+def fresh_queue_engine():
+    QueueEngine.reset()
+    yield
+    QueueEngine.reset()
+
+
+@pytest.fixture(autouse=True)
+def fresh_availability():
+    AvailabilityService.invalidate()
+    yield
+
+
+@pytest.fixture
+def staff_user(db):
+    return User.objects.create_user(
+        username='queue-staff', email='queue-staff@example.com', password='testpassword123', is_staff=True
+    )
+
+
+@pytest.fixture
+def waiting_appointment(staff_user):
+    application = BusinessApplication.objects.create(
+        applicant=staff_user, application_type='new', payment_mode='annually', business_name='Bumpz Auto'
+    )
+    now = timezone.now()
+    return QueueAppointment.objects.create(
+        application=application, applicant=staff_user, appointment_type='payment',
+        slot_date=now.date(), slot_time=now.time(), checked_in=True, check_in_time=now
+    )
+
+
+def display_communicator(user):
+    communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/ws/queue/display/')
+    communicator.scope['user'] = user
+    return communicator
+
+
+@pytest.mark.django_db
+def test_queue_display_pushes_changes(client, staff_user, waiting_appointment, django_capture_on_commit_callbacks):
+    """A screen gets the board on connect, then only the parts a queue action changed"""
+    counter = QueueCounter.objects.create(counter_number='1', counter_type='payment')
+    idle_counter = QueueCounter.objects.create(counter_number='2', counter_type='release')
+    client.force_login(staff_user)
+
+    def call_specific():
+        with django_capture_on_commit_callbacks(execute=True):
+            return client.post(
+                reverse('queuing:call_specific'),
+                json.dumps({'counter_id': counter.id, 'appointment_id': str(waiting_appointment.id)}),
+                content_type='application/json'
+            )
+
+    async def scenario():
+        communicator = display_communicator(staff_user)
+        connected, _ = await communicator.connect()
+        assert connected
+
+        message = await communicator.receive_json_from()
+        assert message['type'] == 'snapshot'
+        assert [a['queue_number'] for a in message['board']['next_in_line']] == [waiting_appointment.queue_number]
+        assert message['board']['counters'][str(counter.id)]['current_queue'] is None
+
+        response = await database_sync_to_async(call_specific)()
+        assert response.status_code == 200
+
+        message = await communicator.receive_json_from()
+        assert message['type'] == 'changes'
+        # The idle counter did not change, so it is not sent again
+        assert list(message['changes']['counters']) == [str(counter.id)]
+        current = message['changes']['counters'][str(counter.id)]['current_queue']
+        assert current['queue_number'] == waiting_appointment.queue_number
+        assert message['changes']['next_in_line'] == []
+        assert await communicator.receive_nothing()
+
+        await communicator.disconnect()
+
+    async_to_sync(scenario)()
+    assert str(idle_counter.id) in cache.get(QueueDisplayService.SNAPSHOT_KEY)['counters']
+
+
+@pytest.mark.django_db
+def test_queue_display_requires_login():
+    async def scenario():
+        connected, _ = await display_communicator(AnonymousUser()).connect()
+        assert not connected
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_queue_display_publish_skips_unchanged_board(waiting_appointment):
+    QueueCounter.objects.create(counter_number='1', counter_type='payment')
+
+    assert 'snapshot' in QueueDisplayService.publish()
+    assert QueueDisplayService.publish() is None
+
+    waiting_appointment.checked_in = False
+    waiting_appointment.save()
+    assert QueueDisplayService.publish()['changes'] == {'next_in_line': []}
+
+
+@pytest.mark.django_db
+def test_queue_display_data_served_from_snapshot(client, staff_user, waiting_appointment, django_assert_num_queries):
+    """Polling screens get the cached board in the original format without querying the queue"""
+    QueueCounter.objects.create(counter_number='1', counter_type='payment', current_queue=waiting_appointment)
+    QueueDisplayService.get_snapshot()
+    client.force_login(staff_user)
+
+    # Session and user lookups only
+    with django_assert_num_queries(2):
+        response = client.get(reverse('queuing:queue_display_data'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    data = response.json()
+    assert data['active_counters'][0]['counter_number'] == '1'
+    assert data['active_counters'][0]['current_queue']['recently_called'] is True
+    assert data['next_in_line'] == []
+    assert data['announcements'] == QueueDisplayService.ANNOUNCEMENTS
+
+
+def queue_entry(number, appointment_type='payment', slot=9, checked_in_minute=None, booked_minute=0):
+    start = timezone.now().replace(hour=7, minute=0, second=0, microsecond=0)
+    return {
+        'id': f'apt-{number}', 'queue_number': number, 'appointment_type': appointment_type,
+        'status': 'confirmed', 'slot_date': start.date(), 'slot_time': time(slot),
+        'checked_in': checked_in_minute is not None,
+        'check_in_time': start + timedelta(minutes=checked_in_minute) if checked_in_minute is not None else None,
+        'created_at': start - timedelta(days=1, minutes=-booked_minute), 'application': {},
+    }
+
+
+def test_day_queue_calls_in_order():
+    day = DayQueue(timezone.now().date())
+    day.update_counter({'id': 1, 'counter_number': '1', 'counter_type': 'payment',
+                        'is_active': True, 'current_queue_id': None})
+    for entry in (
+        queue_entry('late-slot', slot=10, checked_in_minute=1),
+        queue_entry('second', checked_in_minute=30),
+        queue_entry('first', checked_in_minute=5),
+        queue_entry('not-here', booked_minute=0),
+        queue_entry('release', appointment_type='release', checked_in_minute=0),
+    ):
+        day.update_appointment(entry)
+
+    called = []
+    while (entry := day.next_waiting('payment')) is not None:
+        called.append(entry['queue_number'])
+        # As call_next: complete the current appointment, then serve the next
+        current = day.counters[1]['current_queue_id']
+        if current:
+            day.update_appointment(dict(day.appointments[current], status='completed'))
+        day.update_counter(dict(day.counters[1], current_queue_id=entry['id']))
+    # Checked in by slot then arrival, then those not checked in yet
+    assert called == ['first', 'second', 'late-slot', 'not-here']
+
+    # Returned to the queue: it waits again in its old place
+    day.update_appointment(queue_entry('first', checked_in_minute=5))
+    day.update_counter(dict(day.counters[1], current_queue_id='apt-first'))
+    day.update_counter(dict(day.counters[1], current_queue_id=None))
+    assert day.next_waiting('payment')['queue_number'] == 'first'
+    assert [e['queue_number'] for e in day.select(checked_in=True, order_by='check_in_time')] == [
+        'release', 'first'
+    ]
+
+
+@pytest.mark.django_db
+def test_queue_engine_writes_through(client, staff_user, waiting_appointment, django_capture_on_commit_callbacks):
+    counter = QueueCounter.objects.create(counter_number='1', counter_type='payment')
+    day = QueueEngine.get_day()
+    assert day.next_waiting('payment')['id'] == str(waiting_appointment.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        later = QueueAppointment.objects.create(
+            application=waiting_appointment.application, applicant=staff_user, appointment_type='payment',
+            slot_date=waiting_appointment.slot_date, slot_time=waiting_appointment.slot_time,
+            checked_in=True, check_in_time=timezone.now()
+        )
+        client.force_login(staff_user)
+        response = client.get(reverse('queuing:call_next', args=[counter.id]))
+    assert response.json()['appointment']['queue_number'] == waiting_appointment.queue_number
+
+    # Kept current in place, without reloading from the database
+    assert QueueEngine.get_day() is day
+    assert day.next_waiting('payment')['id'] == str(later.id)
+    assert day.counter_of(str(waiting_appointment.id))['counter_number'] == '1'
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.get(reverse('queuing:call_next', args=[counter.id]))
+    assert response.json()['appointment']['queue_number'] == later.queue_number
+    assert str(waiting_appointment.id) not in day.appointments
+
+    response = client.get(
+        reverse('queuing:get_waiting_queue'), HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+    )
+    assert [(a['queue_number'], a['current_counter']) for a in response.json()['waiting_queue']] == [
+        (later.queue_number, '1')
+    ]
+
+
+@pytest.mark.django_db
+def test_queue_engine_reloads_after_changes_elsewhere(waiting_appointment):
+    day = QueueEngine.get_day()
+    assert QueueEngine.get_day() is day
+
+    # Another process saved an appointment
+    cache.add(QueueEngine.VERSION_KEY, 0, timeout=None)
+    cache.incr(QueueEngine.VERSION_KEY)
+    QueueAppointment.objects.filter(id=waiting_appointment.id).update(status='cancelled')
+
+    assert QueueEngine.get_day() is not day
+    assert QueueEngine.waiting('payment', 5) == []
+
+
+def test_per_process_cache_refused_in_production(settings, tmp_path):
+    """Version keys in a LocMem cache never reach the other processes"""
+    settings.DEBUG, settings.TESTING = False, False
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    with pytest.raises(ImproperlyConfigured):
+        check_shared_cache()
+
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                   'LOCATION': str(tmp_path)}}
+    check_shared_cache()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_call_next_never_calls_twice(staff_user):
+    """Many counters calling at once each get a different person, and everyone is called"""
+    application = BusinessApplication.objects.create(
+        applicant=staff_user, application_type='new', payment_mode='annually', business_name='Bumpz Auto'
+    )
+    now = timezone.now()
+    appointments = {
+        str(QueueAppointment.objects.create(
+            application=application, applicant=staff_user, appointment_type='payment', slot_date=now.date(),
+            slot_time=time(9), checked_in=index % 3 != 0, check_in_time=now if index % 3 else None
+        ).id)
+        for index in range(40)
+    }
+    counters = [QueueCounter.objects.create(counter_number=str(n), counter_type='payment') for n in range(8)]
+
+    called, errors = [], []
+    start = threading.Barrier(len(counters))
+
+    def run_counter(counter):
+        try:
+            start.wait()
+            while True:
+                try:
+                    result = CounterService.call_next(counter.id)
+                except OperationalError:
+                    # SQLite has no row locks and refuses concurrent writers; PostgreSQL never gets here
+                    clock.sleep(0.005)
+                    continue
+                if result['appointment'] is None:
+                    return
+                called.append(str(result['appointment'].id))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run_counter, args=(counter,)) for counter in counters]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(called) == len(set(called))
+    assert set(called) == appointments
+    assert QueueAppointment.objects.filter(status='completed').count() == len(appointments)
+
+
+@pytest.mark.django_db
+def test_queue_numbers_per_type_and_day(staff_user, waiting_appointment):
+    today = waiting_appointment.slot_date
+    prefix = today.strftime('%m%d')
+    assert waiting_appointment.queue_number == f'P{prefix}001'
+
+    def appointment(appointment_type, slot_date):
+        return QueueAppointment(
+            application=waiting_appointment.application, applicant=staff_user,
+            appointment_type=appointment_type, slot_date=slot_date, slot_time=time(9)
+        )
+
+    tomorrow = today + timedelta(days=1)
+    batch = [appointment('payment', today), appointment('release', today),
+             appointment('payment', today), appointment('payment', tomorrow)]
+    QueueAppointment.allocate_queue_numbers(batch)
+    QueueAppointment.objects.bulk_create(batch)
+
+    assert [a.queue_number for a in batch] == [
+        f'P{prefix}002', f'R{prefix}001', f'P{prefix}003', f"P{tomorrow.strftime('%m%d')}001"
+    ]
+    # Cancelled appointments keep their number; the next booking does not reuse it
+    waiting_appointment.status = 'cancelled'
+    waiting_appointment.save()
+    booked = appointment('payment', today)
+    booked.save()
+    assert booked.queue_number == f'P{prefix}004'
+
+
+@pytest.mark.django_db
+def test_availability_grid_counts_bookings(staff_user, waiting_appointment, django_assert_num_queries,
+                                           django_capture_on_commit_callbacks):
+    today = waiting_appointment.slot_date
+    slot_date = AvailabilityService.booking_dates(today)[-1]
+    QueueSlot.objects.create(date=slot_date, time_slot=time(10), max_appointments=2)
+    QueueSlot.objects.create(date=slot_date, time_slot=time(11), is_available=False)
+    with django_capture_on_commit_callbacks(execute=True):
+        QueueAppointment.objects.create(
+            application=waiting_appointment.application, applicant=staff_user, appointment_type='payment',
+            slot_date=slot_date, slot_time=time(10)
+        )
+
+    # One grouped count and one slot query for the whole window, then served from the cache
+    with django_assert_num_queries(2):
+        grid = AvailabilityService.get_grid(today)
+    with django_assert_num_queries(0):
+        assert AvailabilityService.get_grid(today) == grid
+
+    assert grid[(slot_date, time(10))] == {'booked': 1, 'capacity': 2, 'available': 1}
+    assert grid[(slot_date, time(11))]['available'] == 0
+    assert grid[(slot_date, time(9))] == {'booked': 0, 'capacity': AvailabilityService.DEFAULT_CAPACITY,
+                                          'available': AvailabilityService.DEFAULT_CAPACITY}
+    assert (slot_date, time(12)) not in grid
+
+
+@pytest.mark.django_db
+def test_book_enforces_slot_capacity(staff_user, waiting_appointment, django_capture_on_commit_callbacks):
+    today = timezone.now().date()
+    slot_date = AvailabilityService.booking_dates(today)[-1]
+    QueueSlot.objects.create(date=slot_date, time_slot=time(9), max_appointments=1)
+    application = waiting_appointment.application
+
+    with django_capture_on_commit_callbacks(execute=True):
+        result = AvailabilityService.book(application, staff_user, 'payment', slot_date, time(9))
+    assert result['success']
+    assert AvailabilityService.get_grid(today)[(slot_date, time(9))]['available'] == 0
+
+    result = AvailabilityService.book(application, staff_user, 'payment', slot_date, time(9))
+    assert result == {'success': False, 'error': "This time slot is already fully booked. Please choose another."}
+    assert not AvailabilityService.book(application, staff_user, 'payment', slot_date, time(12, 30))['success']
+
+    # A cancellation frees the place again
+    with django_capture_on_commit_callbacks(execute=True):
+        appointment = QueueAppointment.objects.get(slot_date=slot_date, slot_time=time(9))
+        appointment.status = 'cancelled'
+        appointment.save(update_fields=['status'])
+    assert AvailabilityService.get_grid(today)[(slot_date, time(9))]['available'] == 1
+    assert AvailabilityService.book(application, staff_user, 'payment', slot_date, time(9))['success']
+
+
+@pytest.mark.django_db
+def test_slot_booked_counts_in_one_query(staff_user, waiting_appointment, django_assert_num_queries):
+    slot_date = waiting_appointment.slot_date
+    for hour in (9, 10, 11):
+        QueueSlot.objects.create(date=slot_date, time_slot=time(hour), max_appointments=3)
+    QueueAppointment.objects.create(
+        application=waiting_appointment.application, applicant=staff_user, appointment_type='payment',
+        slot_date=slot_date, slot_time=time(10)
+    )
+
+    with django_assert_num_queries(1):
+        slots = QueueSlot.with_booked_counts(QueueSlot.objects.all())
+        counts = {slot.time_slot: slot.get_available_count() for slot in slots}
+    assert counts == {time(9): 3, time(10): 2, time(11): 3}